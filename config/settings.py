@@ -63,8 +63,45 @@ DB_SETTINGS = {
     'timeout': 10,  # Bağlantı timeout (saniye)
     'check_same_thread': False,  # Thread kontrolü
     'isolation_level': None,  # Otomatik commit
+    'pool_readers': 4,  # Bağlantı havuzunda veritabanı başına en fazla okuyucu
+    'query_timeout': 0,  # Varsayılan süre sınırı (saniye, 0 = sınırsız); sorgu sekmesinden sorgu başına seçilir
+    'progress_steps': 10000,  # Zaman aşımı/iptal kontrolü kaç VM adımında bir yapılsın
 }
 
+# Bağlantı Profilleri (bağlantı açılırken uygulanan PRAGMA ayarları)
+# cache_size negatifse KiB cinsindendir; mmap_size byte; busy_timeout milisaniye
+CONNECTION_PROFILES = {
+    'interactive': {
+        'label': '⚡ Etkileşimli',
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,  # 64 MB
+        'mmap_size': 268435456,  # 256 MB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'bulk-load': {
+        'label': '📥 Toplu Yükleme',
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',  # Çökmede son işlemler kaybolabilir, dosya bozulmaz
+        'cache_size': -262144,  # 256 MB
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+    },
+    'read-only analytics': {
+        'label': '📊 Salt Okunur Analiz',
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -262144,
+        'mmap_size': 1073741824,  # 1 GB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+        'query_only': True,  # Yazma ifadeleri reddedilir
+    },
+}
+DEFAULT_CONNECTION_PROFILE = 'interactive'
+
 # Treeview Ayarları
 TREEVIEW_SETTINGS = {
     'row_height': 25,
@@ -72,11 +109,49 @@ TREEVIEW_SETTINGS = {
     'show_lines': True,
 }
 
+# Sorgu Sonuç Önbelleği (isteğe bağlı; SQL sekmesinden açılıp kapatılabilir)
+QUERY_CACHE = {
+    'enabled': False,
+    'max_size_mb': 64,  # Önbellek bellek bütçesi (LRU ile tahliye)
+}
+
+# Sorgu Geçmişi (kalıcı; yazma arka planda toplu yapılır)
+HISTORY_SETTINGS = {
+    'storage_file': 'query_history.db',  # Çalışma dizininde (saved_queries.json gibi)
+    'max_entries': 10000,  # Saklanan en fazla geçmiş kaydı (parmak izi toplamları kırpılmaz)
+    'batch_size': 256,  # Tek transaction'da yazılan en fazla kayıt
+}
+
+# Metrik Dökümü (Prometheus metin biçimi + JSON lines, yerel dosya; dışarı gönderilmez)
+METRICS_SETTINGS = {
+    'enabled': True,
+    'directory': 'metrics',  # Çalışma dizininde
+    'interval': 60,  # Döküm aralığı (saniye)
+    'prometheus_file': 'metrics.prom',  # Her dökümde yeniden yazılır
+    'jsonl_file': 'metrics.jsonl',  # Her dökümde bir satır eklenir
+    'max_jsonl_mb': 10,  # Aşılınca metrics.jsonl.1'e döndürülür
+    'slow_queries': 5,  # Dökümdeki en yavaş sorgu kalıbı sayısı
+}
+
+# Tanılama: örnekleyici profil aracı (menüden açılıp kapatılır)
+PROFILER_SETTINGS = {
+    'interval_ms': 5,  # Yığın örnekleme aralığı
+    'max_depth': 64,  # Örnek başına en fazla çerçeve
+    'directory': 'profiles',  # Collapsed stack dosyaları (çalışma dizininde)
+}
+
 # Veri Önizleme Limitleri
 DATA_LIMITS = {
     'preview_rows': 50,  # Tablo önizlemesinde gösterilecek satır
     'large_table_threshold': 1000,  # Büyük tablo uyarı limiti
     'max_export_rows': 100000,  # Excel export limiti
+    'exact_count_rows': 200000,  # max(rowid) bunun altındaysa kesin COUNT(*) yapılır
+    'analysis_limit': 1000,  # ANALYZE'da indeks başına örneklenen satır (PRAGMA analysis_limit)
+    'analyze_interval': 600,  # Otomatik ANALYZE aralığı (saniye)
+    'stream_rows': 10000,  # Tahmini sonuç bunun üstündeyse SQL sekmesi akış modunda getirir
+    'paginate_rows': 100000,  # Bunun üstünde LIMIT ile ilk sayfa önerilir
+    'max_result_rows': 10000,  # Önerilen LIMIT (ilk sayfa)
+    'full_scan_rows': 100000,  # Bu boyuttaki tabloda tam tarama uyarısı
 }
 
 # Dosya Ayarları
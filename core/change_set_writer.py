@@ -0,0 +1,225 @@
+"""
+Değişiklik Kümesi Yazıcı
+Düzenleyicideki UPDATE/DELETE/INSERT değişikliklerini tek transaction'da toplu yazar
+"""
+
+import sqlite3
+from itertools import islice
+from typing import List, Dict, Tuple, Any, Hashable, Sequence, Iterable, Callable, Optional
+
+# UPDATE ... FROM SQLite 3.33 ile geldi; öncesinde ilişkili alt sorgu kullanılır
+_HAS_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
+
+
+class ChangeSetWriter:
+    """
+    Bekleyen değişiklikleri gruplayıp executemany ile uygulayan sınıf
+
+    UPDATE'ler değiştirilen sütun kümesine, INSERT'ler sütun listesine göre
+    gruplanır; her grup tek bir hazırlanmış ifade ile çalışır. Tüm iş bir
+    SAVEPOINT içinde yapılır ve sonda tek commit edilir. Bir grupta hata
+    olursa yalnızca o grup satır satır (satır başına savepoint ile) yeniden
+    denenir; hatalı satırlar raporlanır, kalanlar kaydedilir.
+
+    Satırlar çağıranın verdiği ref ile anılır (ör. sayfa içi satır indeksi).
+    """
+
+    SAVEPOINT = "change_set"
+
+    def __init__(self, conn: sqlite3.Connection, table_name: str, key_column: str = "rowid"):
+        self.conn = conn
+        self.table_name = table_name
+        self.key_column = key_column
+
+    def apply(self, updates: Sequence[Tuple[Hashable, Any, Dict[str, Any]]] = (),
+              deletes: Sequence[Tuple[Hashable, Any]] = (),
+              inserts: Sequence[Tuple[Hashable, Dict[str, Any]]] = ()) -> Tuple[bool, Dict]:
+        """
+        Değişiklikleri uygula
+
+        Args:
+            updates: (ref, anahtar, {sütun: değer}) listesi
+            deletes: (ref, anahtar) listesi
+            inserts: (ref, {sütun: değer}) listesi
+
+        Returns:
+            (başarılı_mı, {'updated', 'deleted', 'inserted', 'failed': [(tür, ref, hata)]})
+        """
+        summary = {'updated': 0, 'deleted': 0, 'inserted': 0, 'failed': []}
+        cursor = self.conn.cursor()
+
+        try:
+            cursor.execute(f"SAVEPOINT {self.SAVEPOINT}")
+        except sqlite3.Error as e:
+            return False, {**summary, 'error': str(e)}
+
+        try:
+            for sql, rows in self._group_updates(updates):
+                summary['updated'] += self._run_group(cursor, 'update', sql, rows, summary)
+
+            if deletes:
+                sql = f"DELETE FROM `{self.table_name}` WHERE {self.key_column} = ?"
+                rows = [(ref, (key,)) for ref, key in deletes]
+                summary['deleted'] += self._run_group(cursor, 'delete', sql, rows, summary)
+
+            for sql, rows in self._group_inserts(inserts):
+                summary['inserted'] += self._run_group(cursor, 'insert', sql, rows, summary)
+
+            cursor.execute(f"RELEASE {self.SAVEPOINT}")
+            if self.conn.in_transaction:
+                self.conn.commit()
+            return True, summary
+
+        except sqlite3.Error as e:
+            cursor.execute(f"ROLLBACK TO {self.SAVEPOINT}")
+            cursor.execute(f"RELEASE {self.SAVEPOINT}")
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            return False, {**summary, 'updated': 0, 'deleted': 0, 'inserted': 0, 'error': str(e)}
+
+    def bulk_update(self, key_column: str, columns: Sequence[str],
+                    rows: Iterable[Sequence[Any]], chunk_size: int = 5000,
+                    on_chunk: Optional[Callable[[int], None]] = None,
+                    cancel_check: Optional[Callable[[], bool]] = None) -> Tuple[bool, Dict]:
+        """
+        Dış kaynaktan (Excel vb.) gelen satırlarla küme tabanlı güncelleme
+
+        Satırlar (anahtar, değer1, değer2, ...) biçimindedir. Önce TEMP bir
+        hazırlık tablosuna parça parça executemany ile yazılır (aynı anahtar
+        tekrar ederse son satır geçerlidir), sonra tek bir UPDATE ... FROM ile
+        tabloya uygulanır. Eşleşen/eşleşmeyen sayıları SQL ile hesaplanır.
+        rows tembel bir iterator olabilir (ör. read_only Excel okuyucusu).
+
+        Args:
+            on_chunk: her parçadan sonra o ana kadar okunan satır sayısı ile çağrılır
+            cancel_check: True dönerse hazırlık bırakılır, tabloya dokunulmaz
+
+        Returns:
+            (başarılı_mı, {'staged', 'matched', 'unmatched', 'cancelled'} veya {'error'})
+        """
+        stage = "_bulk_update_stage"
+        key_col = f"`{key_column}`"
+        stage_cols = ", ".join(f"`{col}`" for col in columns)
+        placeholders = ", ".join(["?"] * (len(columns) + 1))
+        cursor = self.conn.cursor()
+
+        try:
+            cursor.execute(f"SAVEPOINT {self.SAVEPOINT}")
+        except sqlite3.Error as e:
+            return False, {'error': str(e)}
+
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+            cursor.execute(f"CREATE TEMP TABLE {stage} "
+                           f"(stage_key PRIMARY KEY, {stage_cols}) WITHOUT ROWID")
+
+            insert_sql = f"INSERT OR REPLACE INTO temp.{stage} VALUES ({placeholders})"
+            iterator = iter(rows)
+            read = 0
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                if cancel_check and cancel_check():
+                    cursor.execute(f"ROLLBACK TO {self.SAVEPOINT}")
+                    cursor.execute(f"RELEASE {self.SAVEPOINT}")
+                    if self.conn.in_transaction:
+                        self.conn.rollback()
+                    return True, {'staged': 0, 'matched': 0, 'unmatched': 0, 'cancelled': True}
+                cursor.executemany(insert_sql, chunk)
+                read += len(chunk)
+                if on_chunk:
+                    on_chunk(read)
+
+            staged = cursor.execute(f"SELECT COUNT(*) FROM temp.{stage}").fetchone()[0]
+            matched = cursor.execute(
+                f"SELECT COUNT(*) FROM temp.{stage} "
+                f"WHERE stage_key IN (SELECT {key_col} FROM `{self.table_name}`)"
+            ).fetchone()[0]
+
+            if _HAS_UPDATE_FROM:
+                set_clause = ", ".join(f"`{col}` = s.`{col}`" for col in columns)
+                cursor.execute(f"UPDATE `{self.table_name}` SET {set_clause} "
+                               f"FROM temp.{stage} AS s "
+                               f"WHERE `{self.table_name}`.{key_col} = s.stage_key")
+            else:
+                cursor.execute(f"UPDATE `{self.table_name}` SET ({stage_cols}) = "
+                               f"(SELECT {stage_cols} FROM temp.{stage} s "
+                               f"WHERE s.stage_key = `{self.table_name}`.{key_col}) "
+                               f"WHERE {key_col} IN (SELECT stage_key FROM temp.{stage})")
+
+            cursor.execute(f"DROP TABLE temp.{stage}")
+            cursor.execute(f"RELEASE {self.SAVEPOINT}")
+            if self.conn.in_transaction:
+                self.conn.commit()
+            return True, {'staged': staged, 'matched': matched, 'unmatched': staged - matched,
+                          'cancelled': False}
+
+        except sqlite3.Error as e:
+            cursor.execute(f"ROLLBACK TO {self.SAVEPOINT}")
+            cursor.execute(f"RELEASE {self.SAVEPOINT}")
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            return False, {'error': str(e)}
+
+    def _group_updates(self, updates) -> List[Tuple[str, List]]:
+        """UPDATE'leri değiştirilen sütun kümesine göre grupla"""
+        groups: Dict[Tuple[str, ...], List] = {}
+        for ref, key, changes in updates:
+            columns = tuple(changes.keys())
+            groups.setdefault(columns, []).append((ref, tuple(changes.values()) + (key,)))
+
+        statements = []
+        for columns, rows in groups.items():
+            set_clause = ", ".join(f"`{col}` = ?" for col in columns)
+            sql = f"UPDATE `{self.table_name}` SET {set_clause} WHERE {self.key_column} = ?"
+            statements.append((sql, rows))
+        return statements
+
+    def _group_inserts(self, inserts) -> List[Tuple[str, List]]:
+        """INSERT'leri sütun listesine göre grupla"""
+        groups: Dict[Tuple[str, ...], List] = {}
+        for ref, values in inserts:
+            columns = tuple(values.keys())
+            groups.setdefault(columns, []).append((ref, tuple(values.values())))
+
+        statements = []
+        for columns, rows in groups.items():
+            cols_str = ", ".join(f"`{col}`" for col in columns)
+            placeholders = ", ".join(["?"] * len(columns))
+            sql = f"INSERT INTO `{self.table_name}` ({cols_str}) VALUES ({placeholders})"
+            statements.append((sql, rows))
+        return statements
+
+    def _run_group(self, cursor: sqlite3.Cursor, kind: str, sql: str,
+                   rows: List[Tuple[Hashable, tuple]], summary: Dict) -> int:
+        """
+        Grubu executemany ile çalıştır; hata olursa satır satır dene
+        Returns: başarılı satır sayısı
+        """
+        cursor.execute("SAVEPOINT change_group")
+        try:
+            cursor.executemany(sql, [params for _, params in rows])
+            cursor.execute("RELEASE change_group")
+            return len(rows)
+        except (sqlite3.IntegrityError, sqlite3.InterfaceError,
+                sqlite3.ProgrammingError, sqlite3.DataError) as e:
+            cursor.execute("ROLLBACK TO change_group")
+            cursor.execute("RELEASE change_group")
+            if len(rows) == 1:
+                summary['failed'].append((kind, rows[0][0], str(e)))
+                return 0
+
+        succeeded = 0
+        for ref, params in rows:
+            cursor.execute("SAVEPOINT change_row")
+            try:
+                cursor.execute(sql, params)
+                cursor.execute("RELEASE change_row")
+                succeeded += 1
+            except (sqlite3.IntegrityError, sqlite3.InterfaceError,
+                    sqlite3.ProgrammingError, sqlite3.DataError) as e:
+                cursor.execute("ROLLBACK TO change_row")
+                cursor.execute("RELEASE change_row")
+                summary['failed'].append((kind, ref, str(e)))
+        return succeeded
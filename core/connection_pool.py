@@ -0,0 +1,204 @@
+"""
+Bağlantı Havuzu
+Arka plan işleri için veritabanı başına bir yazıcı + N salt okunur bağlantı
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class ConnectionPool:
+    """
+    Bir veritabanı için thread bazlı bağlantı havuzu
+
+    Okuyucular 'file:...?mode=ro' URI'si ile açılır; WAL modunda UI'ın
+    yazmalarını beklemeden kendi anlık görüntülerini okurlar. Bir thread
+    okuyucu aldığında bırakana kadar bağlantı yalnızca ona aittir; aynı
+    thread tekrar isterse aynı bağlantı verilir (iç içe kullanım).
+    Yazıcı tek bağlantıdır ve bir kilitle sırayla kullanılır.
+
+    Kullanım:
+        with pool.reader() as conn:
+            conn.execute(...)
+    """
+
+    def __init__(self, db_path: str, configure: Callable[[sqlite3.Connection, bool], None],
+                 attached: Optional[Dict[str, str]] = None, max_readers: int = 4,
+                 timeout: float = 10.0):
+        """
+        Args:
+            configure: configure(conn, salt_okunur_mu) - PRAGMA/profil ayarlarını uygular
+            attached: {alias: yol} - her bağlantıya yeniden ATTACH edilir
+        """
+        self.db_path = db_path
+        self.configure = configure
+        self.attached = dict(attached or {})
+        self.max_readers = max_readers
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._idle: List[sqlite3.Connection] = []
+        self._reader_count = 0
+        self._held: Dict[int, Tuple[sqlite3.Connection, int]] = {}  # thread id -> (bağlantı, derinlik)
+        self._closed = False
+
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+
+        # Hiç yazmayan gözlem bağlantısı: data_version her commit'te (UI dahil) artar
+        self._probe: Optional[sqlite3.Connection] = None
+        self._probe_lock = threading.Lock()
+
+    @staticmethod
+    def supports(db_path: str) -> bool:
+        """Havuz yalnızca dosya veritabanlarında anlamlıdır (:memory: paylaşılamaz)"""
+        return bool(db_path) and db_path != ':memory:' and not db_path.startswith('file::memory:')
+
+    def _uri(self, path: str, readonly: bool) -> str:
+        uri = Path(path).absolute().as_uri()
+        return f"{uri}?mode=ro" if readonly else uri
+
+    def _open(self, readonly: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri(self.db_path, readonly), uri=True,
+                               timeout=self.timeout, check_same_thread=False)
+        try:
+            for alias, path in self.attached.items():
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (self._uri(path, readonly),))
+            self.configure(conn, readonly)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    # ---------- Okuyucular
+    def acquire_reader(self) -> sqlite3.Connection:
+        """Çağıran thread'e bir okuyucu ver (gerekirse boşalmasını bekle)"""
+        thread_id = threading.get_ident()
+        with self._condition:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Bağlantı havuzu kapatıldı")
+
+            if thread_id in self._held:
+                conn, depth = self._held[thread_id]
+                self._held[thread_id] = (conn, depth + 1)
+                return conn
+
+            while not self._idle and self._reader_count >= self.max_readers:
+                if not self._condition.wait(self.timeout):
+                    raise sqlite3.OperationalError("Bağlantı havuzunda boş okuyucu yok (zaman aşımı)")
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Bağlantı havuzu kapatıldı")
+
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self._reader_count += 1
+                conn = None
+
+        if conn is None:
+            try:
+                conn = self._open(readonly=True)
+            except Exception:
+                with self._condition:
+                    self._reader_count -= 1
+                    self._condition.notify()
+                raise
+
+        with self._condition:
+            self._held[thread_id] = (conn, 1)
+        return conn
+
+    def release_reader(self, conn: sqlite3.Connection):
+        """Okuyucuyu havuza iade et"""
+        thread_id = threading.get_ident()
+        with self._condition:
+            held = self._held.get(thread_id)
+            if held is None or held[0] is not conn:
+                raise sqlite3.ProgrammingError("Bu bağlantı bu thread'e ait değil")
+
+            depth = held[1] - 1
+            if depth:
+                self._held[thread_id] = (conn, depth)
+                return
+
+            del self._held[thread_id]
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                self._reader_count -= 1
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._condition.notify()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.release_reader(conn)
+
+    # ---------- Yazıcı
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Tek yazıcı bağlantısını kilitle ve ver"""
+        with self._writer_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Bağlantı havuzu kapatıldı")
+            if self._writer is None:
+                self._writer = self._open(readonly=False)
+            try:
+                yield self._writer
+            finally:
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+
+    # ---------- Değişiklik takibi
+    def data_version(self) -> Tuple[int, ...]:
+        """
+        Ana ve ATTACH edilmiş şemaların PRAGMA data_version değerleri
+        Değer bağlantıya özeldir ve yalnızca başka bağlantıların commit'leriyle
+        değişir; bu yüzden hiç yazmayan ayrı bir bağlantıda okunur ve böylece
+        hangi bağlantıdan (ya da süreçten) gelirse gelsin her commit'i yansıtır.
+        """
+        with self._probe_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Bağlantı havuzu kapatıldı")
+            if self._probe is None:
+                self._probe = self._open(readonly=True)
+            return tuple(self._probe.execute(f'PRAGMA "{schema}".data_version').fetchone()[0]
+                         for schema in ('main', *self.attached))
+
+    # ---------- Yaşam döngüsü
+    def get_stats(self) -> Dict:
+        with self._condition:
+            return {
+                'readers': self._reader_count,
+                'idle': len(self._idle),
+                'in_use': len(self._held),
+                'max_readers': self.max_readers,
+            }
+
+    def close(self):
+        """Boştaki bağlantıları kapat; kullanımdakiler iade edilince kapanır"""
+        with self._condition:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._reader_count -= len(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+        with self._probe_lock:
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
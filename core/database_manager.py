@@ -5,7 +5,37 @@ Tüm veritabanı bağlantılarını ve işlemlerini yönetir
 
 import sqlite3
 import os
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Iterator
+
+from config.settings import DB_SETTINGS, DATA_LIMITS, CONNECTION_PROFILES, DEFAULT_CONNECTION_PROFILE
+from core.connection_pool import ConnectionPool
+from core.schema_catalog import SchemaCatalog
+from core.row_counter import RowCountService
+
+
+def apply_connection_profile(conn: sqlite3.Connection, profile: str,
+                             set_journal_mode: bool = True) -> Dict[str, Any]:
+    """
+    Bağlantıya profildeki PRAGMA ayarlarını uygula
+    journal_mode açık bir transaction içinde değiştirilemez; o durumda atlanır.
+    Salt okunur (mode=ro) bağlantılar journal_mode değiştiremez: set_journal_mode=False.
+    Returns: SQLite'ın bildirdiği geçerli değerler
+    """
+    if profile not in CONNECTION_PROFILES:
+        raise ValueError(f"Bilinmeyen bağlantı profili: {profile}")
+
+    settings = CONNECTION_PROFILES[profile]
+    applied = {}
+    if set_journal_mode and not conn.in_transaction:
+        # :memory: veritabanında WAL yerine 'memory' döner
+        applied['journal_mode'] = conn.execute(
+            f"PRAGMA journal_mode = {settings['journal_mode']}").fetchone()[0]
+    for pragma in ('synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout'):
+        row = conn.execute(f"PRAGMA {pragma} = {settings[pragma]}").fetchone()
+        applied[pragma] = row[0] if row else settings[pragma]
+    conn.execute(f"PRAGMA query_only = {1 if settings.get('query_only') else 0}")
+    applied['query_only'] = bool(settings.get('query_only'))
+    return applied
 
 
 class DatabaseManager:
@@ -14,20 +44,30 @@ class DatabaseManager:
     def __init__(self):
         self.connections: Dict[str, Dict] = {}
         self.active_db: Optional[str] = None
-
-    def create_database(self, db_path: str, alias: str) -> Tuple[bool, str]:
+        # Bu uygulamanın kendi bağlantısıyla yaptığı yazmalar: {(alias, tablo): sayaç}
+        self.table_versions: Dict[Tuple[str, str], int] = {}
+        # Arka plan işleri için alias başına bağlantı havuzu (ilk istekte açılır)
+        self.pools: Dict[str, ConnectionPool] = {}
+        # Alias başına şema kataloğu (PRAGMA schema_version ile doğrulanır)
+        self.catalogs: Dict[str, SchemaCatalog] = {}
+        # Satır sayısı tahminleri ve ANALYZE zamanlaması
+        self.row_counts = RowCountService(self)
+
+    def create_database(self, db_path: str, alias: str,
+                        profile: str = DEFAULT_CONNECTION_PROFILE) -> Tuple[bool, str]:
         """Yeni veritabanı oluştur"""
         try:
             if alias in self.connections:
                 return False, f"'{alias}' takma adı zaten kullanılıyor!"
 
-            conn = sqlite3.connect(db_path, timeout=10)
-            conn.execute("PRAGMA foreign_keys = ON")  # Foreign key desteği
+            conn = self._connect(db_path, profile)
 
             self.connections[alias] = {
                 'conn': conn,
                 'path': db_path,
-                'active': True
+                'active': True,
+                'attached': {},
+                'profile': profile
             }
 
             self.active_db = alias
@@ -36,7 +76,8 @@ class DatabaseManager:
         except Exception as e:
             return False, f"Veritabanı oluşturulamadı: {str(e)}"
 
-    def open_database(self, db_path: str, alias: str, replace: bool = False) -> Tuple[bool, str]:
+    def open_database(self, db_path: str, alias: str, replace: bool = False,
+                      profile: str = DEFAULT_CONNECTION_PROFILE) -> Tuple[bool, str]:
         """Mevcut veritabanını aç"""
         try:
             if not os.path.exists(db_path):
@@ -48,21 +89,104 @@ class DatabaseManager:
                 else:
                     return False, f"'{alias}' zaten bağlı!"
 
-            conn = sqlite3.connect(db_path, timeout=10)
-            conn.execute("PRAGMA foreign_keys = ON")
+            conn = self._connect(db_path, profile)
 
             self.connections[alias] = {
                 'conn': conn,
                 'path': db_path,
-                'active': True
+                'active': True,
+                'attached': {},
+                'profile': profile
             }
 
             self.active_db = alias
+            # İstatistikler (sqlite_stat1) belli aralıklarla tazelensin
+            self.row_counts.schedule_analyze(alias, DATA_LIMITS['analyze_interval'])
             return True, f"Veritabanına bağlanıldı: {alias}"
 
         except Exception as e:
             return False, f"Bağlantı hatası: {str(e)}"
 
+    def _connect(self, db_path: str, profile: str = DEFAULT_CONNECTION_PROFILE) -> sqlite3.Connection:
+        """Ayarlara ve bağlantı profiline göre yeni bağlantı aç"""
+        conn = sqlite3.connect(db_path, timeout=DB_SETTINGS['timeout'])
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")  # Foreign key desteği
+            apply_connection_profile(conn, profile)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def set_connection_profile(self, alias: str, profile: str) -> Tuple[bool, str]:
+        """Açık bağlantının profilini değiştir (işçi bağlantıları da bu profili alır)"""
+        if alias not in self.connections:
+            return False, f"'{alias}' bağlantısı bulunamadı!"
+        if profile not in CONNECTION_PROFILES:
+            return False, f"Bilinmeyen bağlantı profili: {profile}"
+
+        try:
+            applied = apply_connection_profile(self.connections[alias]['conn'], profile)
+        except sqlite3.Error as e:
+            return False, f"Profil uygulanamadı: {str(e)}"
+
+        self.connections[alias]['profile'] = profile
+        self._close_pool(alias)  # Havuz bağlantıları yeni profille yeniden açılsın
+        label = CONNECTION_PROFILES[profile]['label']
+        journal = applied.get('journal_mode', '-')
+        return True, f"{alias}: {label} profili uygulandı (journal_mode={journal})"
+
+    def open_worker_connection(self, alias: str, profile: Optional[str] = None) -> Optional[sqlite3.Connection]:
+        """
+        Arka plan işleri için ayrı bir bağlantı aç
+        UI'ın kullandığı bağlantı paylaşılmaz; ATTACH edilmiş DB'ler yeniden bağlanır.
+        profile verilmezse veritabanının profili kullanılır (ör. içe aktarma 'bulk-load' ister).
+        Bağlantı çağıran thread'e aittir, işi bitince kapatılmalıdır.
+        """
+        if alias not in self.connections:
+            return None
+
+        info = self.connections[alias]
+        conn = self._connect(info['path'], profile or info.get('profile', DEFAULT_CONNECTION_PROFILE))
+        for attach_alias, attach_path in info.get('attached', {}).items():
+            conn.execute(f"ATTACH DATABASE '{attach_path}' AS {attach_alias}")
+        return conn
+
+    def get_pool(self, alias: Optional[str] = None) -> Optional[ConnectionPool]:
+        """
+        Veritabanının bağlantı havuzunu getir (yoksa oluştur)
+        Önden yükleme, dışa aktarma gibi arka plan okumaları UI bağlantısını
+        paylaşmak yerine buradan kendi okuyucusunu alır. :memory: için None döner.
+        """
+        alias = alias or self.active_db
+        if alias not in self.connections:
+            return None
+
+        pool = self.pools.get(alias)
+        if pool is None:
+            info = self.connections[alias]
+            if not ConnectionPool.supports(info['path']):
+                return None
+            profile = info.get('profile', DEFAULT_CONNECTION_PROFILE)
+
+            def configure(conn: sqlite3.Connection, readonly: bool):
+                conn.execute("PRAGMA foreign_keys = ON")
+                apply_connection_profile(conn, profile, set_journal_mode=not readonly)
+                if readonly:
+                    conn.execute("PRAGMA query_only = 1")
+
+            pool = ConnectionPool(info['path'], configure, info.get('attached'),
+                                  max_readers=DB_SETTINGS['pool_readers'],
+                                  timeout=DB_SETTINGS['timeout'])
+            self.pools[alias] = pool
+        return pool
+
+    def _close_pool(self, alias: str):
+        """Havuzu kapat (kullanımdaki okuyucular iade edilince kapanır)"""
+        pool = self.pools.pop(alias, None)
+        if pool is not None:
+            pool.close()
+
     def attach_database(self, db_path: str, attach_alias: str) -> Tuple[bool, str]:
         """Mevcut oturuma başka bir veritabanı ekle (ATTACH)"""
         try:
@@ -77,6 +201,8 @@ class DatabaseManager:
                 return False, "Aktif bağlantı bulunamadı!"
 
             conn.execute(f"ATTACH DATABASE '{db_path}' AS {attach_alias}")
+            self.connections[self.active_db]['attached'][attach_alias] = db_path
+            self._close_pool(self.active_db)
 
             return True, f"Veritabanı eklendi: {attach_alias}"
 
@@ -89,8 +215,13 @@ class DatabaseManager:
             if alias not in self.connections:
                 return False, f"'{alias}' bağlantısı bulunamadı!"
 
+            self._close_pool(alias)
+            self.catalogs.pop(alias, None)
+            self.row_counts.forget(alias)
             self.connections[alias]['conn'].close()
             del self.connections[alias]
+            for key in [k for k in self.table_versions if k[0] == alias]:
+                del self.table_versions[key]
 
             # Aktif DB kapatıldıysa başka birini aktif yap
             if self.active_db == alias:
@@ -132,6 +263,53 @@ class DatabaseManager:
             return self.connections[alias]['conn']
         return None
 
+    def get_data_version(self, alias: Optional[str] = None) -> int:
+        """
+        PRAGMA data_version değeri
+        Başka bir bağlantı (işçi thread'i, başka süreç) dosyayı değiştirdiğinde
+        artar; bu bağlantının kendi yazmaları için değişmez.
+        """
+        conn = self.get_connection(alias) if alias else self.get_active_connection()
+        if not conn:
+            return 0
+        try:
+            return conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def mark_table_changed(self, table_name: Optional[str], alias: Optional[str] = None):
+        """
+        Kendi bağlantımızla yazılan tablonun sayacını artır
+        table_name None ise tablo bilinmiyordur; veritabanının tüm tabloları bayatlar.
+        """
+        key = (alias or self.active_db, table_name)
+        self.table_versions[key] = self.table_versions.get(key, 0) + 1
+
+    def get_table_version(self, table_name: str, alias: Optional[str] = None) -> Tuple:
+        """
+        Önbellek doğrulama anahtarı:
+        (alias, data_version, veritabanı sayacı, tablo sayacı)
+        Değer değiştiyse tabloya ait önbellek girdileri bayattır.
+        """
+        alias = alias or self.active_db
+        return (alias, self.get_data_version(alias),
+                self.table_versions.get((alias, None), 0),
+                self.table_versions.get((alias, table_name), 0))
+
+    def get_database_version(self, alias: Optional[str] = None) -> Optional[Tuple]:
+        """
+        Veritabanının (ATTACH edilenler dahil) içerik sürümü; herhangi bir commit'te değişir
+        Thread-safe'tir (havuzun gözlem bağlantısını kullanır). :memory: için None.
+        """
+        alias = alias or self.active_db
+        pool = self.get_pool(alias)
+        if pool is None:
+            return None
+        try:
+            return (alias,) + pool.data_version()
+        except sqlite3.Error:
+            return None
+
     def get_database_list(self) -> List[str]:
         """Bağlı veritabanı listesini getir"""
         return list(self.connections.keys())
@@ -149,10 +327,7 @@ class DatabaseManager:
             db_info['size'] = os.path.getsize(db_info['path'])
 
             # Tablo sayısı
-            conn = db_info['conn']
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table'")
-            db_info['table_count'] = cursor.fetchone()[0]
+            db_info['table_count'] = len(self.get_catalog(alias).tables())
 
             # Dosya adı
             db_info['filename'] = os.path.basename(db_info['path'])
@@ -174,56 +349,40 @@ class DatabaseManager:
                 all_info.append(info)
         return all_info
 
+    def get_catalog(self, alias: Optional[str] = None) -> Optional[SchemaCatalog]:
+        """Veritabanının şema kataloğunu getir (yoksa oluştur)"""
+        alias = alias or self.active_db
+        if alias not in self.connections:
+            return None
+        if alias not in self.catalogs:
+            self.catalogs[alias] = SchemaCatalog(self.connections[alias]['conn'])
+        return self.catalogs[alias]
+
     def get_tables(self, alias: Optional[str] = None) -> List[str]:
-        """Veritabanındaki tabloları listele"""
+        """Veritabanındaki tabloları listele (katalogdan)"""
         try:
-            if alias:
-                conn = self.get_connection(alias)
-            else:
-                conn = self.get_active_connection()
-
-            if not conn:
-                return []
-
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-            return [row[0] for row in cursor.fetchall()]
+            catalog = self.get_catalog(alias)
+            return catalog.tables() if catalog else []
 
         except Exception:
             return []
 
     def get_table_info(self, table_name: str, alias: Optional[str] = None) -> List[Tuple]:
-        """Tablo yapısını getir (PRAGMA table_info)"""
+        """Tablo yapısını getir (PRAGMA table_info biçiminde, katalogdan)"""
         try:
-            if alias:
-                conn = self.get_connection(alias)
-            else:
-                conn = self.get_active_connection()
-
-            if not conn:
-                return []
-
-            cursor = conn.cursor()
-            cursor.execute(f"PRAGMA table_info(`{table_name}`)")
-            return cursor.fetchall()
+            catalog = self.get_catalog(alias)
+            return catalog.columns(table_name) if catalog else []
 
         except Exception:
             return []
 
     def get_table_row_count(self, table_name: str, alias: Optional[str] = None) -> int:
-        """Tablodaki kayıt sayısını getir"""
+        """
+        Tablodaki kesin kayıt sayısını getir
+        Tablo değişmediyse önceki sayım kullanılır; anlık tahmin için row_counts.get_count.
+        """
         try:
-            if alias:
-                conn = self.get_connection(alias)
-            else:
-                conn = self.get_active_connection()
-
-            if not conn:
-                return 0
-
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-            return cursor.fetchone()[0]
+            return self.row_counts.count_exact(table_name, alias)
 
         except Exception:
             return 0
@@ -247,18 +406,48 @@ class DatabaseManager:
             else:
                 cursor.execute(query)
 
-            # SELECT sorgusu mu kontrol et
-            if query.strip().upper().startswith(('SELECT', 'PRAGMA')):
+            # Satır döndüren sorgu mu? (sütun bilgisi yorum/VALUES/WITH'ten bağımsız)
+            if cursor.description is not None:
                 results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                columns = [desc[0] for desc in cursor.description]
+                if conn.in_transaction:
+                    conn.commit()  # INSERT ... RETURNING
+                    self.mark_table_changed(None, alias)
                 return True, {'rows': results, 'columns': columns}
             else:
                 conn.commit()
+                self.mark_table_changed(None, alias)
                 return True, {'affected': cursor.rowcount}
 
         except Exception as e:
             return False, str(e)
 
+    def iter_query(self, query: str, params: Optional[Tuple] = None,
+                   alias: Optional[str] = None, batch_size: int = 1000) -> Iterator[List[Tuple]]:
+        """
+        SQL sorgusunu çalıştırıp satırları fetchmany ile parça parça üret
+        execute_query'nin aksine tüm sonuç belleğe alınmaz; hata durumunda
+        sqlite3.Error yükseltilir.
+        """
+        if alias:
+            conn = self.get_connection(alias)
+        else:
+            conn = self.get_active_connection()
+
+        if not conn:
+            raise sqlite3.OperationalError("Aktif bağlantı bulunamadı!")
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            cursor.close()
+
     def export_table_to_dict(self, table_name: str, limit: Optional[int] = None,
                              alias: Optional[str] = None) -> List[Dict]:
         """Tablo verisini dictionary listesi olarak dışa aktar"""
@@ -0,0 +1,85 @@
+"""
+Çalıştırma Koruması
+Progress handler ile ifade başına zaman aşımı ve VM adım sayacı
+"""
+
+import sqlite3
+import time
+from typing import Callable, Optional
+
+
+class ExecutionGuard:
+    """
+    Bir sorgu boyunca bağlantıya takılan progress handler
+
+    SQLite bağlantı başına tek bir progress handler kabul eder; bu yüzden
+    zaman aşımı, adım sayımı ve çağıranın kendi kontrolü (ör. QueryWorker'ın
+    iptal/heartbeat fonksiyonu) tek bir handler'da birleştirilir. Handler her
+    `steps` VM talimatında bir çağrılır: adım sayısı bu kadar ayrıntılıdır,
+    zaman aşımı da en fazla bir adım grubu kadar gecikir.
+
+    Kullanım:
+        with ExecutionGuard(conn, timeout=30) as guard:
+            cursor.execute(...)
+        guard.timed_out, guard.elapsed, guard.vm_steps
+    """
+
+    def __init__(self, conn: sqlite3.Connection, timeout: Optional[float] = None,
+                 steps: int = 10000, on_vm_steps: Optional[Callable[[], int]] = None):
+        """
+        Args:
+            timeout: saniye; None ya da 0 ise süre sınırı yok
+            steps: handler kaç VM talimatında bir çağrılsın
+            on_vm_steps: ek kontrol; sıfırdan farklı dönerse sorgu kesilir
+        """
+        self.conn = conn
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.steps = max(1, int(steps))
+        self.on_vm_steps = on_vm_steps
+        self.calls = 0
+        self.timed_out = False
+        self._started_at = 0.0
+        self._deadline: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        return self.timeout is not None or self.on_vm_steps is not None
+
+    @property
+    def elapsed(self) -> float:
+        end = self._finished_at if self._finished_at is not None else time.monotonic()
+        return end - self._started_at
+
+    @property
+    def vm_steps(self) -> int:
+        """Çalıştırılan yaklaşık VM talimatı sayısı (steps çözünürlüğünde)"""
+        return self.calls * self.steps
+
+    def __call__(self) -> int:
+        self.calls += 1
+        if self.on_vm_steps is not None and self.on_vm_steps():
+            return 1
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self.timed_out = True
+            return 1
+        return 0
+
+    def __enter__(self) -> 'ExecutionGuard':
+        self._started_at = time.monotonic()
+        if self.timeout is not None:
+            self._deadline = self._started_at + self.timeout
+        if self.active:
+            self.conn.set_progress_handler(self, self.steps)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._finished_at = time.monotonic()
+        if self.active:
+            self.conn.set_progress_handler(None, 0)
+        return False
+
+    def describe(self) -> str:
+        """Zaman aşımı mesajı"""
+        return (f"⏱️ Sorgu zaman aşımına uğradı ({self.timeout:g}s sınırı): "
+                f"{self.elapsed:.2f}s çalıştı, ~{self.vm_steps:,} VM adımı")
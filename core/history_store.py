@@ -0,0 +1,251 @@
+"""
+Sorgu Geçmişi Deposu
+Geçmiş yerel bir SQLite dosyasında tutulur; yazma arka plan kuyruğuyla yapılır (çalıştırmayı bekletmez)
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from config.settings import HISTORY_SETTINGS
+from utils.sql_lexer import fingerprint
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    database TEXT,
+    query TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    execution_time REAL NOT NULL,
+    error TEXT,
+    cached INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS history_success ON history (success, id);
+CREATE INDEX IF NOT EXISTS history_fingerprint_time
+    ON history (fingerprint, execution_time) WHERE success = 1;
+
+CREATE TABLE IF NOT EXISTS fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    sample TEXT NOT NULL,
+    database TEXT,
+    count INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    cache_hits INTEGER NOT NULL DEFAULT 0,
+    total_time REAL NOT NULL DEFAULT 0,
+    max_time REAL NOT NULL DEFAULT 0,
+    p50 REAL NOT NULL DEFAULT 0,
+    p95 REAL NOT NULL DEFAULT 0,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprints_p95 ON fingerprints (p95);
+CREATE INDEX IF NOT EXISTS fingerprints_database ON fingerprints (database, count);
+"""
+
+_STOP = object()
+
+
+class HistoryStore:
+    """
+    Kalıcı sorgu geçmişi ve parmak izi (fingerprint) istatistikleri
+
+    record() yalnızca kuyruğa ekler; arka plandaki yazıcı thread kuyruktaki
+    kayıtları tek transaction'da yazar, dokunulan parmak izlerinin
+    count/max/p50/p95 değerlerini günceller ve geçmişi max_entries satırda
+    tutar. Toplamlar parmak izi tablosunda tutulduğu için kırpılan eski
+    kayıtlar istatistiklerden düşmez; yüzdelikler saklanan örneklerden,
+    (fingerprint, execution_time) indeksi üzerinden hesaplanır.
+
+    Okumalar önce kuyruğun boşalmasını bekler (flush), böylece az önce
+    çalışan sorgu da görünür. path ':memory:' ise geçmiş oturumla sınırlıdır.
+    """
+
+    def __init__(self, path: str = ':memory:', max_entries: int = HISTORY_SETTINGS['max_entries'],
+                 batch_size: int = HISTORY_SETTINGS['batch_size']):
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()  # Tek bağlantı: yazıcı thread ve okumalar
+        self._closed = False
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    # ---------- Yazma
+    def record(self, query: str, database: Optional[str], success: bool,
+               execution_time: float, error: Optional[str] = None, cached: bool = False):
+        """Kaydı kuyruğa ekle (beklemez)"""
+        if self._closed:
+            return
+        self._queue.put((time.time(), database, query, bool(success),
+                         float(execution_time or 0.0), error, bool(cached)))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Birikenleri tek transaction'da yaz
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(entry is _STOP for entry in batch)
+            entries = [entry for entry in batch if entry is not _STOP]
+            try:
+                if entries:
+                    with self._lock:
+                        self._write(entries)
+            except sqlite3.Error:
+                pass  # Geçmiş yazılamazsa sorgu çalıştırma etkilenmez
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, entries: List[tuple]):
+        cursor = self.conn.cursor()
+        touched = {}
+        for ts, database, query, success, execution_time, error, cached in entries:
+            fp = fingerprint(query)
+            cursor.execute(
+                "INSERT INTO history (ts, database, query, fingerprint, success, execution_time, "
+                "error, cached) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (ts, database, query, fp, int(success), execution_time, error, int(cached)))
+            cursor.execute(
+                "INSERT OR IGNORE INTO fingerprints (fingerprint, sample, database, last_seen) "
+                "VALUES (?, ?, ?, ?)", (fp, query, database, ts))
+            cursor.execute(
+                "UPDATE fingerprints SET count = count + 1, failures = failures + ?, "
+                "cache_hits = cache_hits + ?, total_time = total_time + ?, "
+                "max_time = max(max_time, ?), last_seen = ?, database = ? WHERE fingerprint = ?",
+                (0 if success else 1, int(cached), execution_time if success else 0.0,
+                 execution_time if success else 0.0, ts, database, fp))
+            if success:
+                touched[fp] = True
+
+        # Eski kayıtları kırp (id artan olduğu için PRIMARY KEY üzerinden)
+        cursor.execute("DELETE FROM history WHERE id <= (SELECT max(id) FROM history) - ?",
+                       (self.max_entries,))
+
+        for fp in touched:
+            cursor.execute("UPDATE fingerprints SET p50 = ?, p95 = ? WHERE fingerprint = ?",
+                           (self._percentile(cursor, fp, 0.50), self._percentile(cursor, fp, 0.95), fp))
+        self.conn.commit()
+
+    @staticmethod
+    def _percentile(cursor: sqlite3.Cursor, fp: str, fraction: float) -> float:
+        """Saklanan başarılı örneklerden yüzdelik (kısmi indeks sırasıyla)"""
+        count = cursor.execute(
+            "SELECT count(*) FROM history WHERE fingerprint = ? AND success = 1", (fp,)).fetchone()[0]
+        if not count:
+            return 0.0
+        offset = min(count - 1, int(fraction * count))
+        row = cursor.execute(
+            "SELECT execution_time FROM history WHERE fingerprint = ? AND success = 1 "
+            "ORDER BY execution_time LIMIT 1 OFFSET ?", (fp, offset)).fetchone()
+        return row[0] if row else 0.0
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Kuyruktaki kayıtların yazılmasını bekle"""
+        if not self._writer.is_alive():
+            return self._queue.unfinished_tasks == 0
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return self._queue.unfinished_tasks == 0
+
+    def close(self):
+        """Kuyruğu boşalt, yazıcıyı durdur, dosyayı kapat"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout=5)
+        with self._lock:
+            self.conn.close()
+
+    # ---------- Okuma
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        self.flush()
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _to_entry(row: Dict) -> Dict:
+        """QueryExecutor geçmiş kaydı biçimi"""
+        return {
+            'query': row['query'],
+            'database': row['database'],
+            'timestamp': datetime.fromtimestamp(row['ts']),
+            'success': bool(row['success']),
+            'execution_time': row['execution_time'],
+            'error': row['error'],
+            'cached': bool(row['cached']),
+            'fingerprint': row['fingerprint'],
+        }
+
+    def recent(self, limit: Optional[int] = None, success: Optional[bool] = None) -> List[Dict]:
+        """En yeni kayıtlar önce (PRIMARY KEY / (success, id) indeksi sırasıyla)"""
+        where, params = "", ()
+        if success is not None:
+            where, params = "WHERE success = ?", (int(success),)
+        rows = self._query(f"SELECT * FROM history {where} ORDER BY id DESC LIMIT ?",
+                           params + (limit if limit else -1,))
+        return [self._to_entry(row) for row in rows]
+
+    def statistics(self) -> Dict:
+        """Parmak izi toplamlarından genel istatistik (geçmiş satırları taranmaz)"""
+        row = self._query(
+            "SELECT coalesce(sum(count), 0) AS total, coalesce(sum(failures), 0) AS failed, "
+            "coalesce(sum(cache_hits), 0) AS cache_hits, coalesce(sum(total_time), 0) AS total_time, "
+            "count(*) AS fingerprints FROM fingerprints")[0]
+        return row
+
+    def slowest(self, limit: int = 20, database: Optional[str] = None) -> List[Dict]:
+        """p95 süresine göre en yavaş parmak izleri"""
+        where, params = "", ()
+        if database:
+            where, params = "WHERE database = ?", (database,)
+        return self._query(
+            f"SELECT fingerprint, sample, database, count, failures, total_time, max_time, p50, p95, "
+            f"last_seen FROM fingerprints {where} ORDER BY p95 DESC LIMIT ?", params + (limit,))
+
+    def workload(self, database: Optional[str] = None, limit: int = 200) -> List[Dict]:
+        """İndeks danışmanı için en sık çalışan parmak izleri ('query' = örnek sorgu)"""
+        where, params = "WHERE count > failures + cache_hits", ()
+        if database:
+            where += " AND database = ?"
+            params = (database,)
+        rows = self._query(
+            f"SELECT sample AS query, count - failures - cache_hits AS count, total_time "
+            f"FROM fingerprints {where} ORDER BY count DESC LIMIT ?", params + (limit,))
+        for row in rows:
+            row['success'] = True
+            row['database'] = database
+        return rows
+
+    def clear(self):
+        self.flush()
+        with self._lock:
+            self.conn.execute("DELETE FROM history")
+            self.conn.execute("DELETE FROM fingerprints")
+            self.conn.commit()
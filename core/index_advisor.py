@@ -0,0 +1,354 @@
+"""
+İndeks Danışmanı
+Sorgu geçmişini EXPLAIN QUERY PLAN ile yeniden planlayıp iş yüküne göre indeks önerir
+"""
+
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Tuple, Optional, Any
+
+from config.settings import DATA_LIMITS
+from utils.query_plan import PlanEstimator, table_aliases
+from utils.sql_lexer import Token, fingerprint, iter_tokens, split_statements, statement_kind
+
+# Sütun referansından sonra/önce gelen karşılaştırmalar
+_EQ_WORDS = {'IN', 'IS'}
+_RANGE_WORDS = {'BETWEEN'}
+
+# Clause başlangıçları (alt sorgular parantez yığınıyla ayrı izlenir)
+_CLAUSES = {'SELECT': 'select', 'FROM': 'from', 'JOIN': 'from', 'UPDATE': 'from', 'INTO': 'from',
+            'WHERE': 'where', 'ON': 'where', 'HAVING': 'having', 'GROUP': 'order',
+            'ORDER': 'order', 'LIMIT': 'limit', 'SET': 'set', 'VALUES': 'values',
+            'RETURNING': 'select', 'USING': 'using'}
+
+_SAVEPOINT = "index_advisor"
+
+
+class IndexAdvisor:
+    """
+    İş yükü tabanlı indeks önerisi
+
+    1. İş yükü: geçmişteki başarılı SELECT/UPDATE/DELETE ifadeleri parmak izine
+       göre gruplanır (tekrar sayısı ağırlıktır).
+    2. Her ifade planlanır; SCAN, otomatik indeks ya da ORDER BY için geçici
+       B-ağacı olan tablolarda WHERE/JOIN eşitlik sütunları + ilk aralık (ya
+       da ORDER BY) sütunlarıyla birleşik aday, seçilen sütunlar da
+       eklenerek kapsayan (covering) aday üretilir.
+    3. Her aday bir SAVEPOINT içinde gerçekten oluşturulur, (sqlite_stat1
+       varsa) ANALYZE edilir ve tablonun tüm ifadeleri yeniden planlanır;
+       ardından geri alınır. Planda kullanılmayan ya da maliyeti düşürmeyen
+       adaylar elenir, kalanlar toplam tahmini kazanca göre sıralanır.
+
+    Bağlantı yazabilen bir bağlantı olmalıdır (ör. havuzun yazıcısı); aday
+    indeksin kurulması büyük tablolarda sürebilir.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, min_table_rows: int = DATA_LIMITS['large_table_threshold'],
+                 analysis_limit: int = DATA_LIMITS['analysis_limit'], max_columns: int = 4):
+        """
+        Args:
+            min_table_rows: bundan küçük tablolar için öneri yapılmaz
+            max_columns: adaydaki en fazla sütun sayısı (kapsayan adaylar dahil)
+        """
+        self.conn = conn
+        self.min_table_rows = min_table_rows
+        self.analysis_limit = analysis_limit
+        self.max_columns = max_columns
+        self._columns: Dict[str, List[str]] = {}
+
+    # ---------- İş yükü
+    @staticmethod
+    def workload_from_history(history: Iterable[Dict], alias: Optional[str] = None) -> List[Dict]:
+        """
+        QueryExecutor geçmişinden iş yükü
+        Kayıtta 'count' varsa (HistoryStore.workload) o kadar tekrar sayılır;
+        ifadeler parmak izine göre gruplanır (yalnızca sabitleri farklı olanlar tek iş).
+        Returns: [{'query', 'count', 'total_time'}] (tekrar sayısına göre azalan)
+        """
+        groups: Dict[str, Dict] = {}
+        for entry in history:
+            if not entry.get('success') or (alias and entry.get('database') != alias):
+                continue
+            if entry.get('cached'):
+                continue  # Önbellekten gelen sonuç veritabanına dokunmadı
+            for statement in split_statements(entry['query']):
+                if statement_kind(statement) not in ('select', 'modify'):
+                    continue
+                key = fingerprint(statement)
+                group = groups.setdefault(key, {'query': statement, 'count': 0, 'total_time': 0.0})
+                group['count'] += entry.get('count', 1)
+                group['total_time'] += entry.get('total_time', entry.get('execution_time')) or 0.0
+        return sorted(groups.values(), key=lambda g: (g['count'], g['total_time']), reverse=True)
+
+    # ---------- Şema
+    def tables(self) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'").fetchall()
+        return [row[0] for row in rows]
+
+    def columns(self, table: str) -> List[str]:
+        if table not in self._columns:
+            self._columns[table] = [row[0] for row in self.conn.execute(
+                "SELECT name FROM pragma_table_info(?)", (table,))]
+        return self._columns[table]
+
+    def existing_prefixes(self, table: str) -> List[Tuple[str, ...]]:
+        """Tablodaki indekslerin sütun dizileri (yeni aday bunların öneki ise gereksiz)"""
+        prefixes = []
+        for (index,) in self.conn.execute("SELECT name FROM pragma_index_list(?)", (table,)).fetchall():
+            prefixes.append(tuple(row[0] for row in self.conn.execute(
+                "SELECT name FROM pragma_index_info(?) ORDER BY seqno", (index,))))
+        return prefixes
+
+    # ---------- Sütun çıkarımı
+    def extract_columns(self, query: str) -> Dict[str, Dict[str, List[str]]]:
+        """
+        İfadedeki tablo başına sütun kullanımları
+        Returns: {tablo: {'eq': [...], 'range': [...], 'order': [...], 'select': [...]}}
+            'select' içinde '*' varsa kapsayan indeks önerilmez
+        """
+        known = {name.lower(): name for name in self.tables()}
+        tokens = list(iter_tokens(query))
+        aliases = {alias: table for alias, table in table_aliases(query).items()
+                   if table.lower() in known}
+        query_tables: List[str] = []
+        usage: Dict[str, Dict[str, List[str]]] = {}
+
+        def use(table: str, kind: str, column: str):
+            bucket = usage.setdefault(table, {'eq': [], 'range': [], 'order': [], 'select': []})[kind]
+            if column not in bucket:
+                bucket.append(column)
+
+        # 1. geçiş: FROM/JOIN/UPDATE/INTO sonrasındaki tablolar
+        clause = None
+        for token in tokens:
+            if token.kind == 'word' and token.upper in _CLAUSES:
+                clause = _CLAUSES[token.upper]
+            elif clause == 'from' and token.kind in ('word', 'ident'):
+                name = known.get(_unquote(token.text).lower())
+                if name and name not in query_tables:
+                    query_tables.append(name)
+
+        def resolve(qualifier: Optional[str], column: str) -> Optional[str]:
+            if qualifier is not None:
+                table = aliases.get(qualifier) or known.get(qualifier.lower())
+                return table if table and column in self.columns(table) else None
+            owners = [t for t in query_tables if column in self.columns(t)]
+            return owners[0] if len(owners) == 1 else None
+
+        # 2. geçiş: clause'lara göre sütun referansları
+        stack: List[Optional[str]] = []
+        clause = None
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.text == '(':
+                stack.append(clause)
+            elif token.text == ')':
+                clause = stack.pop() if stack else None
+            elif token.kind == 'word' and token.upper in _CLAUSES:
+                clause = _CLAUSES[token.upper]
+            elif token.text == '*' and clause == 'select':
+                for table in query_tables:
+                    use(table, 'select', '*')
+            elif token.kind in ('word', 'ident') and clause in ('select', 'where', 'order', 'having'):
+                qualifier, column, end = None, _unquote(token.text), i
+                if i + 2 < len(tokens) and tokens[i + 1].text == '.':
+                    qualifier, column, end = column, _unquote(tokens[i + 2].text), i + 2
+                    if column == '*' or tokens[i + 2].text == '*':
+                        table = aliases.get(qualifier) or known.get(qualifier.lower())
+                        if table:
+                            use(table, 'select', '*')
+                        i = end + 1
+                        continue
+                table = resolve(qualifier, column)
+                if table:
+                    if clause == 'where':
+                        kind = _comparison(tokens, i, end)
+                        if kind:
+                            use(table, kind, column)
+                        use(table, 'select', column)
+                    elif clause == 'order':
+                        use(table, 'order', column)
+                        use(table, 'select', column)
+                    else:
+                        use(table, 'select', column)
+                i = end + 1
+                continue
+            i += 1
+        return usage
+
+    # ---------- Aday üretimi
+    def candidates_for(self, query: str, plan: Dict[str, Any]) -> List[Dict]:
+        """Planında sorun görülen tablolar için birleşik ve kapsayan adaylar"""
+        problem_tables = set()
+        for node in plan['plan']:
+            if not node['op']:
+                continue
+            if node.get('table_rows') is not None and node['table_rows'] < self.min_table_rows:
+                continue
+            if node['op'] == 'SCAN' or node['automatic']:
+                problem_tables.add(node['table'])
+        sorted_tables = set()
+        for hotspot in plan['hotspots']:
+            if hotspot['kind'] == 'temp_btree' and len(hotspot['tables']) == 1:
+                sorted_tables.add(hotspot['tables'][0][0])
+
+        candidates = []
+        for table, used in self.extract_columns(query).items():
+            if table not in problem_tables and table not in sorted_tables:
+                continue
+            key = used['eq'][:self.max_columns]
+            if used['range'] and len(key) < self.max_columns:
+                key.append(used['range'][0])
+            elif table in sorted_tables and used['order']:
+                key += [c for c in used['order'] if c not in key]
+            key = key[:self.max_columns]
+            if not key:
+                continue
+
+            variants = [key]
+            extra = [c for c in used['select'] if c not in key]
+            if '*' not in used['select'] and extra and len(key) + len(extra) <= self.max_columns:
+                variants.append(key + extra)
+
+            existing = self.existing_prefixes(table)
+            for columns in variants:
+                if any(prefix[:len(columns)] == tuple(columns) for prefix in existing):
+                    continue
+                candidates.append({'table': table, 'columns': columns,
+                                   'covering': columns is not key})
+        return candidates
+
+    # ---------- Doğrulama
+    def plan(self, query: str) -> Optional[Dict[str, Any]]:
+        try:
+            return PlanEstimator(self.conn, full_scan_rows=self.min_table_rows).estimate(query)
+        except sqlite3.Error:
+            return None
+
+    @staticmethod
+    def index_name(table: str, columns: List[str]) -> str:
+        return "idx_" + "_".join([table] + columns).replace(" ", "_")
+
+    @staticmethod
+    def create_sql(name: str, table: str, columns: List[str]) -> str:
+        cols = ", ".join(f'"{c}"' for c in columns)
+        return f'CREATE INDEX "{name}" ON "{table}" ({cols});'
+
+    def validate(self, candidate: Dict, workload: List[Dict]) -> Dict:
+        """
+        Adayı SAVEPOINT içinde kurup tablonun ifadelerini yeniden planla (sonra geri al)
+        candidate'a 'used_by', 'cost_before', 'cost_after', 'benefit', 'writes' eklenir.
+        """
+        name = candidate['name']
+        statements = [item for item in workload if candidate['table'] in item['tables']]
+        has_stats = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+
+        self.conn.execute(f"SAVEPOINT {_SAVEPOINT}")
+        try:
+            self.conn.execute(candidate['sql'])
+            if has_stats:
+                if self.analysis_limit:
+                    self.conn.execute(f"PRAGMA analysis_limit = {int(self.analysis_limit)}")
+                self.conn.execute(f'ANALYZE "{name}"')
+            after = [(item, self.plan(item['query'])) for item in statements]
+        finally:
+            self.conn.execute(f"ROLLBACK TO {_SAVEPOINT}")
+            self.conn.execute(f"RELEASE {_SAVEPOINT}")
+
+        used_by = 0
+        cost_before = cost_after = 0.0
+        for item, plan in after:
+            if plan is None:
+                continue
+            weight = item['count']
+            cost_before += weight * item['cost']
+            cost_after += weight * plan['cost']
+            if any(node.get('index') == name for node in plan['plan']):
+                used_by += weight
+
+        candidate.update({
+            'used_by': used_by,
+            'cost_before': cost_before,
+            'cost_after': cost_after,
+            'benefit': cost_before - cost_after,
+            # Her yazma bu indeksi de günceller
+            'writes': sum(item['count'] for item in statements if item['kind'] == 'modify'),
+        })
+        return candidate
+
+    def recommend(self, workload: List[Dict],
+                  progress_callback: Optional[Callable[[int, float], None]] = None,
+                  cancel_check: Optional[Callable[[], bool]] = None) -> List[Dict]:
+        """
+        İş yükü için doğrulanmış öneriler (kazanca göre azalan)
+        Öneri: table, columns, covering, name, sql, used_by, benefit, cost_before,
+        cost_after, writes, statements (adayı doğuran ifade sayısı)
+        """
+        planned = []
+        candidates: Dict[Tuple[str, Tuple[str, ...]], Dict] = {}
+        for item in workload:
+            plan = self.plan(item['query'])
+            if plan is None:
+                continue
+            entry = {**item, 'cost': plan['cost'], 'kind': statement_kind(item['query']),
+                     'tables': {node['table'] for node in plan['plan'] if node['op']}}
+            planned.append(entry)
+            for candidate in self.candidates_for(item['query'], plan):
+                key = (candidate['table'], tuple(candidate['columns']))
+                existing = candidates.setdefault(key, {**candidate, 'statements': 0})
+                existing['statements'] += item['count']
+
+        recommendations = []
+        total = len(candidates)
+        for done, candidate in enumerate(candidates.values(), 1):
+            if cancel_check and cancel_check():
+                break
+            candidate['name'] = self.index_name(candidate['table'], candidate['columns'])
+            candidate['sql'] = self.create_sql(candidate['name'], candidate['table'], candidate['columns'])
+            try:
+                self.validate(candidate, planned)
+            except sqlite3.Error:
+                continue
+            if candidate['used_by'] and candidate['benefit'] > 0:
+                recommendations.append(candidate)
+            if progress_callback:
+                progress_callback(done, done / total)
+
+        recommendations.sort(key=lambda c: (c['benefit'], -len(c['columns'])), reverse=True)
+        return recommendations
+
+
+def _unquote(name: str) -> str:
+    if len(name) >= 2 and name[0] in '"`[' and name[-1] in '"`]':
+        return name[1:-1]
+    return name
+
+
+def _comparison(tokens: List[Token], start: int, end: int) -> Optional[str]:
+    """Sütun referansının karşılaştırma türü: 'eq', 'range' ya da None"""
+    following = tokens[end + 1] if end + 1 < len(tokens) else None
+    after = tokens[end + 2] if end + 2 < len(tokens) else None
+    if following is not None:
+        text = following.text
+        if text == '=':
+            return 'eq'
+        if text in ('<', '>'):
+            return None if after is not None and after.text in ('>', '<') else 'range'
+        if following.kind == 'word':
+            if following.upper in _RANGE_WORDS:
+                return 'range'
+            if following.upper in _EQ_WORDS:
+                return None if after is not None and after.upper == 'NOT' else 'eq'
+
+    previous = tokens[start - 1] if start > 0 else None
+    before = tokens[start - 2] if start > 1 else None
+    if previous is not None:
+        if previous.text == '=':
+            if before is not None and before.text in ('<', '>', '!'):
+                return 'range' if before.text != '!' else None
+            return 'eq'
+        if previous.text in ('<', '>'):
+            return 'range'
+    return None
@@ -4,21 +4,136 @@ Sorgu geçmişi, validasyon ve güvenli çalıştırma
 """
 
 import sqlite3
-from typing import List, Dict, Tuple, Optional, Any
+import time
+from typing import List, Dict, Tuple, Optional, Any, Callable, Iterator
 from datetime import datetime
 
+from config.settings import QUERY_CACHE, DB_SETTINGS
+from core.execution_guard import ExecutionGuard
+from core.history_store import HistoryStore
+from core.index_advisor import IndexAdvisor
+from core.result_cache import ResultCache, is_cacheable, uses_temp_schema
+from utils.sql_lexer import iter_tokens, split_statements, statement_kind
+
+
+class StreamingResult:
+    """
+    Cursor'a bağlı akış sonucu
+    Satırlar fetchmany ile sabit boyutlu parçalar halinde üretilir;
+    bellek kullanımı sonuç boyutuna değil parça boyutuna bağlıdır.
+    """
+
+    type = 'stream'
+
+    def __init__(self, cursor: sqlite3.Cursor, batch_size: int, started_at: float,
+                 on_complete: Optional[Callable[['StreamingResult'], None]] = None,
+                 guard: Optional[ExecutionGuard] = None):
+        self.cursor = cursor
+        self.columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        self.batch_size = batch_size
+        self.row_count = 0
+        self.first_batch_time: Optional[float] = None  # İlk parçanın gelme süresi (s)
+        self.total_time: Optional[float] = None  # Akış bitince toplam süre (s)
+        self.exhausted = False
+        self.error: Optional[str] = None  # Akış bir hatayla kesildiyse mesajı
+        self._started_at = started_at
+        self._on_complete = on_complete
+        self._guard = guard  # Zaman aşımı/iptal handler'ı akış bitene kadar takılı kalır
+
+    def __iter__(self) -> Iterator[List[tuple]]:
+        return self.iter_batches()
+
+    def iter_batches(self) -> Iterator[List[tuple]]:
+        """Satırları parça parça üret"""
+        if self.exhausted:
+            return
+        try:
+            while True:
+                batch = self.cursor.fetchmany(self.batch_size)
+                if self.first_batch_time is None:
+                    self.first_batch_time = time.perf_counter() - self._started_at
+                if not batch:
+                    break
+                self.row_count += len(batch)
+                yield batch
+        except sqlite3.Error as e:
+            if self._guard is not None and self._guard.timed_out:
+                self.error = self._guard.describe()
+            else:
+                self.error = f"❌ SQL Hatası: {str(e)}"
+            raise
+        finally:
+            self._finish()
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """Satırları tek tek üret (exporter'lar için)"""
+        for batch in self.iter_batches():
+            yield from batch
+
+    def close(self, reason: Optional[str] = None):
+        """Akışı erken kapat (reason verilirse geçmişe başarısız olarak yazılır)"""
+        if reason and not self.exhausted:
+            self.error = reason
+        self._finish()
+
+    def to_result(self) -> Dict:
+        """Kalan satırları toplayıp execute() sonucu biçimine çevir"""
+        rows = list(self.iter_rows())
+        return {
+            'type': 'select',
+            'rows': rows,
+            'columns': self.columns,
+            'row_count': len(rows)
+        }
+
+    def _finish(self):
+        """Cursor'ı kapat, süreyi kaydet (bir kez)"""
+        if self.exhausted:
+            return
+        self.exhausted = True
+        self.total_time = time.perf_counter() - self._started_at
+        try:
+            self.cursor.close()
+        except sqlite3.Error:
+            pass
+        if self._guard is not None:
+            self._guard.__exit__(None, None, None)
+        if self._on_complete:
+            self._on_complete(self)
+
 
 class QueryExecutor:
     """SQL sorgularını yöneten ve çalıştıran sınıf"""
 
-    def __init__(self, database_manager):
+    def __init__(self, database_manager, history_file: Optional[str] = None):
         self.db_manager = database_manager
-        self.query_history: List[Dict] = []
-        self.max_history = 100
-
-    def execute(self, query: str, alias: Optional[str] = None) -> Tuple[bool, Any, str]:
+        # Kalıcı geçmiş (history_file None ise yalnızca bu oturum, bellekte)
+        self.history = HistoryStore(history_file or ':memory:')
+        self.fetch_batch_size = 1000  # progress_callback varken fetchmany boyutu
+        # İsteğe bağlı sonuç önbelleği (anahtar: alias + normalize sorgu, sürüm: data_version)
+        self.result_cache = ResultCache(QUERY_CACHE['max_size_mb'])
+        self.cache_enabled = QUERY_CACHE['enabled']
+        # Sorgu başına çalıştırma süresi sınırı (DB_SETTINGS['timeout'] yalnızca kilit beklemesidir)
+        self.default_timeout: Optional[float] = DB_SETTINGS['query_timeout']
+        self.progress_steps = DB_SETTINGS['progress_steps']
+
+    def execute(self, query: str, alias: Optional[str] = None,
+                progress_callback: Optional[Callable[[int], None]] = None,
+                connection: Optional[sqlite3.Connection] = None,
+                use_cache: Optional[bool] = None,
+                timeout: Optional[float] = None,
+                on_vm_steps: Optional[Callable[[], int]] = None,
+                progress_steps: Optional[int] = None) -> Tuple[bool, Any, str]:
         """
         SQL sorgusu çalıştır
+        progress_callback: verilirse satırlar parça parça çekilir ve
+        o ana kadar çekilen satır sayısı ile çağrılır
+        connection: verilirse alias'ın paylaşılan bağlantısı yerine bu kullanılır
+        (arka plan işçisinin kendi bağlantısı)
+        use_cache: sonuç önbelleği (None ise cache_enabled geçerli)
+        timeout: çalıştırma süresi sınırı, saniye (None ise default_timeout, 0 ise sınırsız)
+        on_vm_steps: progress handler'a eklenecek kontrol (sıfır dışı dönerse sorgu kesilir)
+        progress_steps: handler kaç VM adımında bir çağrılsın (None ise self.progress_steps)
         Returns: (başarılı_mı, sonuç, mesaj)
         """
         # Query validation
@@ -27,28 +142,56 @@ class QueryExecutor:
             return False, None, validation_msg
 
         # Veritabanı bağlantısını al
-        if alias:
-            conn = self.db_manager.get_connection(alias)
-            db_name = alias
-        else:
-            conn = self.db_manager.get_active_connection()
-            db_name = self.db_manager.active_db
-
+        conn, db_name = self._resolve_connection(alias, connection)
         if not conn:
             return False, None, "Aktif veritabanı bağlantısı bulunamadı!"
 
+        # 🚀 Sonuç önbelleği: sürüm çalıştırmadan önce alınır (arada commit olursa girdi bayat kalır)
+        # TEMP tablolar data_version'a yansımaz, onları okuyan sorgular önbelleğe alınmaz
+        cache_version = None
+        if ((self.cache_enabled if use_cache is None else use_cache) and is_cacheable(query)
+                and not uses_temp_schema(query, conn)):
+            cache_version = self.db_manager.get_database_version(db_name)
+        if cache_version is not None:
+            lookup_start = time.perf_counter()
+            cached = self.result_cache.get(query, db_name, cache_version)
+            if cached is not None:
+                self._add_to_history(query, db_name, True, time.perf_counter() - lookup_start,
+                                     cached=True)
+                if progress_callback:
+                    progress_callback(cached['row_count'])
+                return True, cached, f"✅ {cached['row_count']} kayıt getirildi (önbellekten)"
+
         start_time = datetime.now()
+        guard = ExecutionGuard(conn, self.default_timeout if timeout is None else timeout,
+                               progress_steps or self.progress_steps, on_vm_steps)
 
         try:
-            cursor = conn.cursor()
-            cursor.execute(query)
-
-            # SELECT, PRAGMA, WITH gibi sorguları kontrol et
-            query_upper = query.strip().upper()
-
-            if query_upper.startswith(('SELECT', 'WITH', 'PRAGMA', 'EXPLAIN')):
-                # Veri döndüren sorgular
-                rows = cursor.fetchall()
+            # 🚀 İfade türü lexer ile (yorumlar, VALUES, WITH ... INSERT doğru sınıflanır)
+            kind = statement_kind(query)
+
+            # 🚀 Zaman aşımı/iptal handler'ı satırlar çekilirken de etkin kalır
+            with guard:
+                cursor = conn.cursor()
+                cursor.execute(query)
+
+                # Sütun bilgisi varsa satır döner (INSERT ... RETURNING dahil)
+                returns_rows = (cursor.description is not None
+                                or kind in ('select', 'pragma', 'explain'))
+                if returns_rows:
+                    # Veri döndüren sorgular
+                    if progress_callback:
+                        rows = []
+                        while True:
+                            batch = cursor.fetchmany(self.fetch_batch_size)
+                            if not batch:
+                                break
+                            rows.extend(batch)
+                            progress_callback(len(rows))
+                    else:
+                        rows = cursor.fetchall()
+
+            if returns_rows:
                 columns = [desc[0] for desc in cursor.description] if cursor.description else []
 
                 result = {
@@ -57,9 +200,15 @@ class QueryExecutor:
                     'columns': columns,
                     'row_count': len(rows)
                 }
+                if cache_version is not None:
+                    self.result_cache.put(query, db_name, cache_version, result)
+                    result['cached'] = False
 
                 message = f"✅ {len(rows)} kayıt getirildi"
 
+                if kind == 'modify' and conn.in_transaction:
+                    conn.commit()  # RETURNING'li DML
+
             else:
                 # INSERT, UPDATE, DELETE, CREATE gibi sorgular
                 conn.commit()
@@ -81,6 +230,14 @@ class QueryExecutor:
             return True, result, message
 
         except sqlite3.Error as e:
+            if guard.timed_out:
+                # Kesilen ifade SQLite tarafından geri alınır; açık transaction da kapatılır
+                if conn.in_transaction:
+                    conn.rollback()
+                error_msg = guard.describe()
+                self._add_to_history(query, db_name, False, guard.elapsed, error_msg)
+                return False, None, error_msg
+
             error_msg = f"❌ SQL Hatası: {str(e)}"
             self._add_to_history(query, db_name, False, 0, str(e))
             return False, None, error_msg
@@ -90,11 +247,77 @@ class QueryExecutor:
             self._add_to_history(query, db_name, False, 0, str(e))
             return False, None, error_msg
 
+    def execute_stream(self, query: str, alias: Optional[str] = None,
+                       batch_size: Optional[int] = None,
+                       connection: Optional[sqlite3.Connection] = None,
+                       timeout: Optional[float] = None,
+                       on_vm_steps: Optional[Callable[[], int]] = None,
+                       progress_steps: Optional[int] = None) -> Tuple[bool, Any, str]:
+        """
+        SQL sorgusunu akış modunda çalıştır
+        Veri döndüren sorgular için sonuç bir StreamingResult'tır (fetchmany ile
+        parça parça okunur); diğer sorgular execute() ile aynı sonucu döndürür.
+        timeout/on_vm_steps/progress_steps execute() ile aynıdır; handler akış
+        kapanana kadar bağlantıda kalır, parça çekerken de sorgu kesilebilir.
+        Geçmiş kaydı akış tükendiğinde (toplam süre ve satır sayısıyla) eklenir.
+        Returns: (başarılı_mı, sonuç, mesaj)
+        """
+        is_valid, validation_msg = self.validate_query(query)
+        if not is_valid:
+            return False, None, validation_msg
+
+        conn, db_name = self._resolve_connection(alias, connection)
+        if not conn:
+            return False, None, "Aktif veritabanı bağlantısı bulunamadı!"
+
+        if statement_kind(query) not in ('select', 'pragma', 'explain'):
+            return self.execute(query, alias, connection=connection, timeout=timeout,
+                                on_vm_steps=on_vm_steps, progress_steps=progress_steps)
+
+        started_at = time.perf_counter()
+        guard = ExecutionGuard(conn, self.default_timeout if timeout is None else timeout,
+                               progress_steps or self.progress_steps, on_vm_steps)
+        guard.__enter__()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query)
+        except sqlite3.Error as e:
+            guard.__exit__(None, None, None)
+            error_msg = guard.describe() if guard.timed_out else f"❌ SQL Hatası: {str(e)}"
+            self._add_to_history(query, db_name, False, guard.elapsed if guard.timed_out else 0,
+                                 error_msg if guard.timed_out else str(e))
+            return False, None, error_msg
+
+        def on_complete(stream: StreamingResult):
+            if stream.error:
+                self._add_to_history(query, db_name, False, stream.total_time, stream.error)
+            else:
+                self._add_to_history(query, db_name, True, stream.total_time)
+
+        stream = StreamingResult(cursor, batch_size or self.fetch_batch_size,
+                                 started_at, on_complete, guard)
+        return True, stream, "✅ Sonuç akışı başlatıldı"
+
+    def _resolve_connection(self, alias: Optional[str],
+                            connection: Optional[sqlite3.Connection] = None) -> Tuple[Optional[sqlite3.Connection], Optional[str]]:
+        """Alias'a (ya da aktif DB'ye) göre bağlantı ve DB adını bul"""
+        if alias:
+            conn = self.db_manager.get_connection(alias)
+            db_name = alias
+        else:
+            conn = self.db_manager.get_active_connection()
+            db_name = self.db_manager.active_db
+
+        if connection is not None:
+            conn = connection
+
+        return conn, db_name
+
     def execute_batch(self, queries: List[str], alias: Optional[str] = None) -> List[Tuple[bool, Any, str]]:
         """Birden fazla sorguyu sırayla çalıştır"""
         results = []
         for query in queries:
-            if query.strip():  # Boş sorguları atla
+            if statement_kind(query) != 'empty':  # Boş/yalnızca yorum olanları atla
                 result = self.execute(query, alias)
                 results.append(result)
         return results
@@ -115,7 +338,8 @@ class QueryExecutor:
             cursor = conn.cursor()
             cursor.executescript(script)
             conn.commit()
-            return True, "✅ Script başarıyla çalıştırıldı"
+            count = len(split_statements(script))
+            return True, f"✅ Script başarıyla çalıştırıldı ({count} ifade)"
 
         except Exception as e:
             return False, f"❌ Script hatası: {str(e)}"
@@ -125,68 +349,64 @@ class QueryExecutor:
         if not query or not query.strip():
             return False, "Sorgu boş olamaz!"
 
-        query_stripped = query.strip().upper()
-
         # Tehlikeli komutları kontrol et (opsiyonel)
-        dangerous_keywords = ['DROP DATABASE', 'FORMAT', 'SHUTDOWN']
-        for keyword in dangerous_keywords:
-            if keyword in query_stripped:
+        # Yalnızca anahtar kelimeler sayılır: 'format' sütunu ya da dizgi içeriği engellenmez
+        words = [token.upper for token in iter_tokens(query) if token.kind == 'word']
+        if any(a == 'DROP' and b == 'DATABASE' for a, b in zip(words, words[1:])):
+            return False, "⚠️ Güvenlik: 'DROP DATABASE' komutu kullanılamaz!"
+        for keyword in ('FORMAT', 'SHUTDOWN'):
+            if words and words[0] == keyword:
                 return False, f"⚠️ Güvenlik: '{keyword}' komutu kullanılamaz!"
 
         return True, "OK"
 
     def _add_to_history(self, query: str, database: str, success: bool,
-                        execution_time: float, error: Optional[str] = None):
-        """Sorgu geçmişine ekle"""
-        history_entry = {
-            'query': query,
-            'database': database,
-            'timestamp': datetime.now(),
-            'success': success,
-            'execution_time': execution_time,
-            'error': error
-        }
-
-        self.query_history.insert(0, history_entry)
-
-        # Maksimum geçmiş sayısını kontrol et
-        if len(self.query_history) > self.max_history:
-            self.query_history = self.query_history[:self.max_history]
+                        execution_time: float, error: Optional[str] = None,
+                        cached: bool = False):
+        """Sorgu geçmişine ekle (cached: sonuç önbellekten geldi); yazma arka planda yapılır"""
+        self.history.record(query, database, success, execution_time, error, cached)
 
     def get_history(self, limit: Optional[int] = None) -> List[Dict]:
-        """Sorgu geçmişini getir"""
-        if limit:
-            return self.query_history[:limit]
-        return self.query_history
+        """Sorgu geçmişini getir (en yeni önce)"""
+        return self.history.recent(limit)
 
     def get_successful_queries(self, limit: Optional[int] = None) -> List[Dict]:
         """Sadece başarılı sorguları getir"""
-        successful = [q for q in self.query_history if q['success']]
-        if limit:
-            return successful[:limit]
-        return successful
+        return self.history.recent(limit, success=True)
 
     def get_failed_queries(self, limit: Optional[int] = None) -> List[Dict]:
         """Sadece başarısız sorguları getir"""
-        failed = [q for q in self.query_history if not q['success']]
-        if limit:
-            return failed[:limit]
-        return failed
+        return self.history.recent(limit, success=False)
+
+    def get_slowest_queries(self, limit: int = 20, alias: Optional[str] = None) -> List[Dict]:
+        """
+        p95 süresine göre en yavaş sorgu kalıpları (parmak izi başına)
+        Returns: [{'fingerprint', 'sample', 'database', 'count', 'failures',
+                   'total_time', 'max_time', 'p50', 'p95', 'last_seen'}]
+        """
+        return self.history.slowest(limit, alias)
 
     def clear_history(self):
         """Sorgu geçmişini temizle"""
-        self.query_history.clear()
+        self.history.clear()
+
+    def close(self):
+        """Bekleyen geçmiş kayıtlarını yaz ve geçmiş dosyasını kapat"""
+        self.history.close()
 
     def export_history(self, filepath: str) -> Tuple[bool, str]:
         """Sorgu geçmişini dosyaya kaydet"""
         try:
+            history = self.get_history()
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write("-- SQL Sorgu Geçmişi\n")
                 f.write(f"-- Oluşturulma: {datetime.now()}\n")
-                f.write(f"-- Toplam Sorgu: {len(self.query_history)}\n\n")
+                f.write(f"-- Toplam Sorgu: {len(history)}\n\n")
 
-                for i, entry in enumerate(self.query_history, 1):
+                for i, entry in enumerate(history, 1):
                     status = "✅ BAŞARILI" if entry['success'] else "❌ BAŞARISIZ"
+                    if entry.get('cached'):
+                        status += " (💾 önbellek)"
                     f.write(f"-- [{i}] {status} | {entry['timestamp']} | DB: {entry['database']}\n")
                     f.write(f"-- Süre: {entry['execution_time']:.4f}s\n")
 
@@ -200,29 +420,61 @@ class QueryExecutor:
         except Exception as e:
             return False, f"Kaydetme hatası: {str(e)}"
 
+    def advise_indexes(self, alias: Optional[str] = None,
+                       progress_callback: Optional[Callable[[int, float], None]] = None,
+                       cancel_check: Optional[Callable[[], bool]] = None) -> Tuple[bool, Any]:
+        """
+        Sorgu geçmişine göre indeks önerileri (IndexAdvisor)
+        Adaylar havuzun yazıcı bağlantısında SAVEPOINT içinde kurulup geri alınır;
+        arka plan thread'inden çağrılabilir.
+        Returns: (başarılı_mı, öneri listesi ya da mesaj)
+        """
+        db_name = alias or self.db_manager.active_db
+        workload = IndexAdvisor.workload_from_history(self.history.workload(db_name), db_name)
+        if not workload:
+            return False, "Geçmişte bu veritabanı için çözümlenecek sorgu yok."
+
+        pool = self.db_manager.get_pool(db_name)
+        try:
+            if pool is not None:
+                with pool.writer() as conn:
+                    return True, IndexAdvisor(conn).recommend(workload, progress_callback, cancel_check)
+
+            conn = self.db_manager.open_worker_connection(db_name)
+            if conn is None:
+                return False, "Aktif veritabanı bağlantısı bulunamadı!"
+            try:
+                return True, IndexAdvisor(conn).recommend(workload, progress_callback, cancel_check)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            return False, f"❌ İndeks analizi hatası: {str(e)}"
+
     def get_query_statistics(self) -> Dict:
-        """Sorgu istatistiklerini getir"""
-        if not self.query_history:
+        """Sorgu istatistiklerini getir (parmak izi toplamlarından)"""
+        stats = self.history.statistics()
+        total = stats['total']
+        if not total:
             return {
                 'total': 0,
                 'successful': 0,
                 'failed': 0,
+                'cache_hits': 0,
                 'avg_execution_time': 0
             }
 
-        successful = len([q for q in self.query_history if q['success']])
-        failed = len([q for q in self.query_history if not q['success']])
-
-        total_time = sum(q['execution_time'] for q in self.query_history if q['success'])
-        avg_time = total_time / successful if successful > 0 else 0
+        successful = total - stats['failed']
+        total_time = stats['total_time']
 
         return {
-            'total': len(self.query_history),
+            'total': total,
             'successful': successful,
-            'failed': failed,
-            'success_rate': (successful / len(self.query_history)) * 100,
-            'avg_execution_time': avg_time,
-            'total_execution_time': total_time
+            'failed': stats['failed'],
+            'cache_hits': stats['cache_hits'],
+            'success_rate': (successful / total) * 100,
+            'avg_execution_time': total_time / successful if successful > 0 else 0,
+            'total_execution_time': total_time,
+            'distinct_queries': stats['fingerprints']
         }
 
     def suggest_query(self, table_name: str, query_type: str = 'select') -> str:
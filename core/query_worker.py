@@ -0,0 +1,185 @@
+"""
+Arka Plan Sorgu İşçisi
+Uzun sorguları UI thread'i dışında çalıştırır, durumu kuyruk ile bildirir
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from typing import List, Tuple, Optional, Any
+
+
+class QueryWorker:
+    """QueryExecutor.execute çağrısını ayrı bir thread'de çalıştıran sınıf
+
+    İşçi, UI'ın bağlantısını paylaşmaz; her sorgu için kendi bağlantısını açar
+    ve iş bitince kapatır. Böylece iptal (interrupt) yalnızca bu sorguyu keser.
+
+    Olaylar kuyruğa (olay_tipi, veri) olarak yazılır:
+        ('started', alias)
+        ('heartbeat', geçen_saniye)      - sorgu SQLite içinde çalışırken
+        ('progress', çekilen_satır_sayısı)
+        ('columns', sütunlar)             - yalnızca akış modunda, ilk parçadan önce
+        ('batch', satırlar)               - yalnızca akış modunda, parça başına
+        ('done', (başarılı_mı, sonuç, mesaj))
+        ('cancelled', mesaj)
+    Tkinter tarafı poll() ile kuyruğu root.after döngüsünde boşaltır.
+    """
+
+    def __init__(self, query_executor, progress_steps: int = 10000,
+                 heartbeat_interval: float = 0.25):
+        self.executor = query_executor
+        self.events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self.progress_steps = progress_steps  # Progress handler kaç VM adımında bir çağrılsın
+        self.heartbeat_interval = heartbeat_interval
+        self._thread: Optional[threading.Thread] = None
+        self._conn = None
+        self._alias: Optional[str] = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Çalışan bir sorgu var mı?"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def running_alias(self) -> Optional[str]:
+        """Çalışan sorgunun veritabanı (yoksa None)"""
+        return self._alias if self.is_running else None
+
+    def start(self, query: str, alias: Optional[str] = None,
+              timeout: Optional[float] = None, stream: bool = False) -> Tuple[bool, str]:
+        """
+        Sorguyu arka planda başlat
+        timeout: çalıştırma süresi sınırı (None ise executor'ın varsayılanı, 0 ise sınırsız)
+        stream: satırlar tek sonuçta toplanmaz, 'batch' olaylarıyla parça parça gönderilir;
+        'done' sonucu {'type': 'stream', 'columns', 'row_count', 'first_batch_time', 'total_time'}
+        """
+        if self.is_running:
+            return False, "Zaten çalışan bir sorgu var!"
+
+        alias = alias or self.executor.db_manager.active_db
+        if not alias or alias not in self.executor.db_manager.connections:
+            return False, "Aktif veritabanı bağlantısı bulunamadı!"
+
+        self._alias = alias
+        self._cancelled.clear()
+        self._thread = threading.Thread(target=self._run, args=(query, alias, timeout, stream),
+                                        daemon=True)
+        self._thread.start()
+        return True, "Sorgu başlatıldı"
+
+    def cancel(self) -> bool:
+        """Çalışan sorguyu iptal et
+
+        Bayrak, progress handler tarafından her adım grubunda kontrol edilir;
+        ifade henüz çalışmaya başlamamış olsa bile ilk adımda kesilir.
+        """
+        if not self.is_running:
+            return False
+
+        self._cancelled.set()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.interrupt()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """Çalışan sorguyu iptal et ve bitmesini bekle (kapanış için)"""
+        if not self.is_running:
+            return True
+        self.cancel()
+        self.wait(timeout)
+        return not self.is_running
+
+    def poll(self) -> List[Tuple[str, Any]]:
+        """Kuyruktaki tüm olayları al (bloklamaz)"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def wait(self, timeout: Optional[float] = None):
+        """İşçinin bitmesini bekle (test ve kapanış için)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, query: str, alias: str, timeout: Optional[float], stream: bool = False):
+        """Thread gövdesi"""
+        self.events.put(('started', alias))
+        started_at = time.monotonic()
+        last_beat = [started_at]
+
+        def on_vm_steps() -> int:
+            # SQLite içinde çalışırken canlı süre bilgisi + iptal kontrolü
+            now = time.monotonic()
+            if now - last_beat[0] >= self.heartbeat_interval:
+                last_beat[0] = now
+                self.events.put(('heartbeat', now - started_at))
+            return 1 if self._cancelled.is_set() else 0
+
+        def on_progress(row_count: int):
+            self.events.put(('progress', row_count))
+
+        conn = None
+        try:
+            conn = self.executor.db_manager.open_worker_connection(alias)
+            if conn is None:
+                outcome = (False, None, "Aktif veritabanı bağlantısı bulunamadı!")
+            else:
+                with self._lock:
+                    self._conn = conn
+                # İptal/heartbeat kontrolü executor'ın zaman aşımı handler'ına eklenir
+                # (bağlantı başına tek progress handler olabilir)
+                run = self._stream if stream else self.executor.execute
+                outcome = run(query, alias,
+                              progress_callback=on_progress,
+                              connection=conn,
+                              timeout=timeout,
+                              on_vm_steps=on_vm_steps,
+                              progress_steps=self.progress_steps)
+        except Exception as e:
+            outcome = (False, None, f"❌ Beklenmeyen Hata: {str(e)}")
+        finally:
+            with self._lock:
+                self._conn = None
+            if conn is not None:
+                conn.close()
+
+        if self._cancelled.is_set() and not outcome[0]:
+            self.events.put(('cancelled', "⛔ Sorgu kullanıcı tarafından iptal edildi"))
+        else:
+            self.events.put(('done', outcome))
+
+    def _stream(self, query: str, alias: str, progress_callback, connection,
+                timeout, on_vm_steps, progress_steps) -> Tuple[bool, Any, str]:
+        """Akış modu: parçaları kuyruğa yaz, sonuçta yalnızca özet döndür"""
+        success, stream, message = self.executor.execute_stream(
+            query, alias, connection=connection, timeout=timeout,
+            on_vm_steps=on_vm_steps, progress_steps=progress_steps)
+        if not success or not hasattr(stream, 'iter_batches'):
+            return success, stream, message  # Hata ya da veri döndürmeyen ifade
+
+        self.events.put(('columns', stream.columns))
+        try:
+            for batch in stream.iter_batches():
+                self.events.put(('batch', batch))
+                progress_callback(stream.row_count)
+                if self._cancelled.is_set():
+                    stream.close("⛔ Sorgu kullanıcı tarafından iptal edildi")
+                    return False, None, stream.error
+        except sqlite3.Error:
+            return False, None, stream.error
+
+        return True, {
+            'type': 'stream',
+            'columns': stream.columns,
+            'row_count': stream.row_count,
+            'first_batch_time': stream.first_batch_time,
+            'total_time': stream.total_time,
+        }, f"✅ {stream.row_count} kayıt getirildi (akış)"
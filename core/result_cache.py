@@ -0,0 +1,96 @@
+"""
+Sorgu Sonuç Önbelleği
+Aynı sorgunun değişmemiş veritabanında tekrar çalıştırılmasını önler
+"""
+
+import sqlite3
+from typing import Dict, Tuple, Optional, Any
+
+from utils.performance_optimizer import SmartCache, estimate_size
+from utils.sql_lexer import normalize, statement_kind, tokenize
+
+# Her çalıştırmada farklı sonuç verebilen ifadeler önbelleğe alınmaz
+_VOLATILE_FUNCTIONS = {'RANDOM', 'RANDOMBLOB', 'CHANGES', 'TOTAL_CHANGES', 'LAST_INSERT_ROWID'}
+_VOLATILE_KEYWORDS = {'CURRENT_DATE', 'CURRENT_TIME', 'CURRENT_TIMESTAMP'}
+_TEMP_SCHEMAS = {'temp', 'temporary'}
+
+
+def normalize_sql(query: str) -> str:
+    """Sorgu metnini önbellek anahtarı için sadeleştir (büyük/küçük harf korunur)"""
+    return normalize(query)
+
+
+def is_cacheable(query: str) -> bool:
+    """Yalnızca veri değiştirmeyen ve deterministik SELECT/WITH/VALUES sorguları"""
+    if statement_kind(query) != 'select':
+        return False
+    tokens = tokenize(query)
+    for token, following in zip(tokens, tokens[1:] + [None]):
+        if token.kind == 'string' and token.text.lower() == "'now'":
+            return False
+        if token.kind != 'word':
+            continue
+        upper = token.upper
+        if upper in _VOLATILE_KEYWORDS:
+            return False
+        if upper in _VOLATILE_FUNCTIONS and following is not None and following.text == '(':
+            return False
+    return True
+
+
+def uses_temp_schema(query: str, conn: sqlite3.Connection) -> bool:
+    """
+    Sorgu bağlantıya özel TEMP şemasını okuyor mu?
+    TEMP tablolara yazmak data_version'ı değiştirmez ve diğer bağlantılar aynı
+    adı ana şemadaki tabloya çözer; bu sorgular önbelleğe alınmamalıdır.
+    Nitelikli (temp.x) ve niteliksiz (TEMP tablo/görünüm adı) başvurular sayılır.
+    """
+    names = set()
+    for token in tokenize(query):
+        if token.kind == 'word':
+            names.add(token.text.lower())
+        elif token.kind == 'ident':
+            names.add(token.text[1:-1].lower())
+    if names & _TEMP_SCHEMAS:
+        return True
+    temp_names = {row[0].lower() for row in conn.execute(
+        "SELECT name FROM sqlite_temp_master WHERE type IN ('table', 'view')")}
+    return not names.isdisjoint(temp_names)
+
+
+class ResultCache:
+    """
+    Sorgu sonuçları için LRU önbellek (bellek bütçeli)
+
+    Anahtar (alias, normalize edilmiş sorgu), sürüm ise
+    DatabaseManager.get_database_version() değeridir (PRAGMA data_version);
+    veritabanına herhangi bir bağlantıdan commit yapılınca eski girdiler
+    ilk erişimde bayat sayılıp silinir. TEMP şemasını okuyan sorgular bu
+    sürümle izlenemediği için önbelleğe alınmaz (uses_temp_schema).
+    """
+
+    def __init__(self, max_size_mb: int = 64):
+        self.cache = SmartCache(max_size_mb=max_size_mb, policy='lru')
+
+    @staticmethod
+    def make_key(query: str, alias: Optional[str]) -> Tuple[Optional[str], str]:
+        return alias, normalize_sql(query)
+
+    def get(self, query: str, alias: Optional[str], version: Any) -> Optional[Dict]:
+        """Geçerli bir sonuç varsa kopyasını döndür ('cached': True ile)"""
+        entry = self.cache.get(self.make_key(query, alias), version=version)
+        if entry is None:
+            return None
+        return {**entry, 'rows': list(entry['rows']), 'cached': True}
+
+    def put(self, query: str, alias: Optional[str], version: Any, result: Dict):
+        """select sonucunu sakla (satırlar değiştirilemez tuple olarak tutulur)"""
+        rows = tuple(result['rows'])
+        entry = {**result, 'rows': rows}
+        self.cache.set(self.make_key(query, alias), entry, size=estimate_size(rows), version=version)
+
+    def clear(self):
+        self.cache.clear()
+
+    def get_stats(self) -> Dict:
+        return self.cache.get_stats()
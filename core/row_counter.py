@@ -0,0 +1,206 @@
+"""
+Satır Sayacı
+COUNT(*) yerine anlık satır tahmini, arka planda kesin sayım ve ANALYZE zamanlama
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple, Optional, Any
+
+from config.settings import DATA_LIMITS
+
+
+class RowCountService:
+    """
+    Tablo satır sayıları için tahmin + iyileştirme servisi
+
+    get_count önce kesin sayım önbelleğine bakar (tablo sürümü değişmediyse
+    geçerlidir). Yoksa anlık bir tahmin verir:
+      - max(rowid) B-ağacının sonundan okunur (O(log n)); küçük tablolarda
+        (exact_count_limit altında) kesin COUNT(*) zaten ucuzdur ve yapılır.
+      - Büyük tablolarda sqlite_stat1 (son ANALYZE) varsa o, yoksa max(rowid)
+        tahmin olarak döner; silinmiş satırlar nedeniyle fazla çıkabilir.
+    refine ile kesin sayım havuzdan alınan okuyucuda arka planda yapılır.
+    """
+
+    def __init__(self, db_manager, exact_count_limit: int = DATA_LIMITS['exact_count_rows'],
+                 analysis_limit: int = DATA_LIMITS['analysis_limit']):
+        self.db_manager = db_manager
+        self.exact_count_limit = exact_count_limit
+        self.analysis_limit = analysis_limit
+
+        self._lock = threading.Lock()
+        self.exact: Dict[Tuple[str, str], Tuple[Any, int]] = {}  # (alias, tablo) -> (sürüm, sayı)
+        self.refining: set = set()
+        self.schedules: Dict[str, threading.Event] = {}  # alias -> durdurma sinyali
+        self.last_analyzed: Dict[str, float] = {}
+
+    def get_count(self, table_name: str, alias: Optional[str] = None) -> Tuple[int, bool]:
+        """
+        Satır sayısını getir
+        Returns: (sayı, tahmini_mi)
+        """
+        alias = alias or self.db_manager.active_db
+        version = self.db_manager.get_table_version(table_name, alias)
+        with self._lock:
+            cached = self.exact.get((alias, table_name))
+        if cached and cached[0] == version:
+            return cached[1], False
+
+        conn = self.db_manager.get_connection(alias)
+        if conn is None:
+            return 0, False
+
+        count, approximate = self._estimate(conn, table_name, alias)
+        if not approximate:
+            self._store(alias, table_name, version, count)
+        return count, approximate
+
+    def count_exact(self, table_name: str, alias: Optional[str] = None) -> int:
+        """Kesin sayı (önbellekte yoksa UI bağlantısında COUNT(*) yapılır)"""
+        alias = alias or self.db_manager.active_db
+        count, approximate = self.get_count(table_name, alias)
+        if approximate:
+            version = self.db_manager.get_table_version(table_name, alias)
+            count = self._count(self.db_manager.get_connection(alias), table_name)
+            self._store(alias, table_name, version, count)
+        return count
+
+    def _estimate(self, conn: sqlite3.Connection, table_name: str, alias: str) -> Tuple[int, bool]:
+        """Anlık tahmin; küçük tablolar ve rowid'siz kaynaklar için kesin sayım"""
+        try:
+            max_rowid = conn.execute(f"SELECT max(rowid) FROM `{table_name}`").fetchone()[0]
+        except sqlite3.OperationalError:
+            max_rowid = None  # WITHOUT ROWID tablo ya da view
+        else:
+            if max_rowid is None:
+                return 0, False  # Boş tablo
+
+        if max_rowid is not None and max_rowid <= self.exact_count_limit:
+            return self._count(conn, table_name), False
+
+        catalog = self.db_manager.get_catalog(alias)
+        estimate = catalog.row_estimate(table_name) if catalog else None
+        if estimate is not None:
+            return estimate, True
+        if max_rowid is not None:
+            return max_rowid, True
+        return self._count(conn, table_name), False
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, table_name: str) -> int:
+        return conn.execute(f"SELECT COUNT(*) FROM `{table_name}`").fetchone()[0]
+
+    def _store(self, alias: str, table_name: str, version: Any, count: int):
+        with self._lock:
+            self.exact[(alias, table_name)] = (version, count)
+
+    def refine(self, table_name: str, alias: Optional[str] = None) -> bool:
+        """
+        Kesin sayımı arka planda başlat (UI bağlantısı kullanılmaz)
+        Sonuç hazır olunca get_count kesin değeri döndürür.
+        Returns: sayım başlatıldı ya da zaten sürüyorsa True
+        """
+        alias = alias or self.db_manager.active_db
+        pool = self.db_manager.get_pool(alias)
+        if pool is None:
+            return False
+
+        key = (alias, table_name)
+        with self._lock:
+            if key in self.refining:
+                return True
+            self.refining.add(key)
+
+        # Sürüm sayım başlamadan alınır; sayım sırasında yazma olursa sonuç bayat sayılır
+        version = self.db_manager.get_table_version(table_name, alias)
+
+        def work():
+            try:
+                with pool.reader() as conn:
+                    self._store(alias, table_name, version, self._count(conn, table_name))
+            except sqlite3.Error:
+                pass
+            finally:
+                with self._lock:
+                    self.refining.discard(key)
+
+        threading.Thread(target=work, daemon=True).start()
+        return True
+
+    def is_refining(self, table_name: str, alias: Optional[str] = None) -> bool:
+        alias = alias or self.db_manager.active_db
+        with self._lock:
+            return (alias, table_name) in self.refining
+
+    def analyze(self, alias: Optional[str] = None, table_name: Optional[str] = None,
+                conn: Optional[sqlite3.Connection] = None) -> Tuple[bool, str]:
+        """
+        ANALYZE çalıştır ve katalogdaki tahminleri yenile
+        analysis_limit ile her indeks için yalnızca bir örneklem taranır (SQLite 3.32+),
+        böylece çok büyük tablolarda da kısa sürer.
+        """
+        alias = alias or self.db_manager.active_db
+        conn = conn or self.db_manager.get_connection(alias)
+        if conn is None:
+            return False, "Aktif bağlantı bulunamadı!"
+
+        start = time.perf_counter()
+        try:
+            if self.analysis_limit:
+                conn.execute(f"PRAGMA analysis_limit = {int(self.analysis_limit)}")
+            conn.execute(f"ANALYZE `{table_name}`" if table_name else "ANALYZE")
+            if conn.in_transaction:
+                conn.commit()
+        except sqlite3.Error as e:
+            return False, f"ANALYZE hatası: {str(e)}"
+
+        # Var olan sqlite_stat1'in güncellenmesi schema_version'ı değiştirmez
+        catalog = self.db_manager.get_catalog(alias)
+        if catalog:
+            catalog.invalidate()
+        self.last_analyzed[alias] = time.time()
+        return True, f"ANALYZE tamamlandı ({time.perf_counter() - start:.2f}s)"
+
+    def schedule_analyze(self, alias: str, interval_seconds: float):
+        """
+        ANALYZE'ı belirli aralıklarla havuzun yazıcı bağlantısında çalıştır
+        Veritabanı son çalıştırmadan beri değişmediyse (PRAGMA data_version) atlanır.
+        """
+        self.cancel_schedule(alias)
+        stop = threading.Event()
+        with self._lock:
+            self.schedules[alias] = stop
+
+        def loop():
+            last_version = None
+            while not stop.wait(interval_seconds):
+                pool = self.db_manager.get_pool(alias)
+                if pool is None:
+                    continue
+                try:
+                    with pool.writer() as conn:
+                        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+                        if data_version != last_version:
+                            self.analyze(alias, conn=conn)
+                            # ANALYZE'ın kendi yazması değişiklik sayılmasın
+                            last_version = conn.execute("PRAGMA data_version").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def cancel_schedule(self, alias: str):
+        with self._lock:
+            stop = self.schedules.pop(alias, None)
+        if stop is not None:
+            stop.set()
+
+    def forget(self, alias: str):
+        """Veritabanı kapatılınca önbelleği ve zamanlayıcıyı temizle"""
+        self.cancel_schedule(alias)
+        with self._lock:
+            for key in [k for k in self.exact if k[0] == alias]:
+                del self.exact[key]
+        self.last_analyzed.pop(alias, None)
@@ -0,0 +1,158 @@
+"""
+Şema Kataloğu
+Tablo/görünüm/sütun/indeks/foreign key bilgisini PRAGMA schema_version ile önbellekler
+"""
+
+import sqlite3
+from threading import RLock
+from typing import Dict, List, Tuple, Optional, Any
+
+from utils.query_plan import read_sqlite_stats
+
+# Dahili tablolar kataloğa alınmaz
+_SYSTEM_PREFIX = 'sqlite_'
+
+
+class SchemaCatalog:
+    """
+    Bir bağlantının (ana + ATTACH edilmiş şemalar) katalog önbelleği
+
+    Her şema için sqlite_master ve tablo değerli PRAGMA fonksiyonları
+    (pragma_table_info, pragma_index_list, pragma_foreign_key_list) ile tek
+    seferde birkaç sorguda okunur. Sonraki çağrılarda yalnızca o şemanın
+    PRAGMA schema_version değeri sorulur; değer değişmediyse önbellek
+    kullanılır. Başka bir bağlantının yaptığı DDL de schema_version'ı
+    artırdığı için fark edilir.
+
+    Satır tahminleri ve indeks istatistikleri sqlite_stat1'den (son ANALYZE
+    anından) okunur.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+        self.loads = 0  # Şema okuma sayısı (istatistik)
+        self._lock = RLock()
+
+    def schemas(self) -> List[str]:
+        """Bağlantıdaki şemalar (main + ATTACH edilenler, temp hariç)"""
+        rows = self.conn.execute("PRAGMA database_list").fetchall()
+        names = [row[1] for row in rows if row[1] != 'temp']
+        with self._lock:
+            for schema in [s for s in self.snapshots if s not in names]:
+                del self.snapshots[schema]  # DETACH edilmiş
+        return names
+
+    def invalidate(self, schema: Optional[str] = None):
+        """Önbelleği sil (schema verilmezse tümü)"""
+        with self._lock:
+            if schema is None:
+                self.snapshots.clear()
+            else:
+                self.snapshots.pop(schema, None)
+
+    def _snapshot(self, schema: str) -> Dict[str, Any]:
+        """Şemanın güncel kaydını getir; schema_version değiştiyse yeniden oku"""
+        try:
+            version = self.conn.execute(f'PRAGMA "{schema}".schema_version').fetchone()[0]
+        except sqlite3.OperationalError:
+            self.invalidate(schema)  # Şema yok (DETACH edilmiş)
+            raise
+
+        with self._lock:
+            snapshot = self.snapshots.get(schema)
+            if snapshot is not None and snapshot['version'] == version:
+                return snapshot
+
+            snapshot = self._load(schema, version)
+            self.snapshots[schema] = snapshot
+            self.loads += 1
+            return snapshot
+
+    def _load(self, schema: str, version: int) -> Dict[str, Any]:
+        """Şemanın tüm katalog bilgisini oku"""
+        cursor = self.conn.cursor()
+        master = f'"{schema}".sqlite_master'
+
+        objects = cursor.execute(
+            f"SELECT type, name FROM {master} "
+            f"WHERE type IN ('table', 'view') AND name NOT LIKE '{_SYSTEM_PREFIX}%' "
+            f"ORDER BY name").fetchall()
+        tables = [name for obj_type, name in objects if obj_type == 'table']
+        views = [name for obj_type, name in objects if obj_type == 'view']
+
+        columns: Dict[str, List[Tuple]] = {name: [] for _, name in objects}
+        try:
+            rows = cursor.execute(
+                f"SELECT m.name, p.cid, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk "
+                f"FROM {master} AS m JOIN pragma_table_info(m.name, ?) AS p "
+                f"WHERE m.type IN ('table', 'view') AND m.name NOT LIKE '{_SYSTEM_PREFIX}%' "
+                f"ORDER BY m.name, p.cid", (schema,)).fetchall()
+            for row in rows:
+                columns[row[0]].append(tuple(row[1:]))
+        except sqlite3.Error:
+            # Bozuk bir view tüm birleşik sorguyu düşürür; nesne nesne oku
+            for name in columns:
+                try:
+                    columns[name] = cursor.execute(
+                        f'PRAGMA "{schema}".table_info(`{name}`)').fetchall()
+                except sqlite3.Error:
+                    columns[name] = []
+
+        indexes: Dict[str, List[Tuple]] = {name: [] for name in tables}
+        for row in cursor.execute(
+                f"SELECT m.name, il.name, il.\"unique\", il.origin, il.partial "
+                f"FROM {master} AS m JOIN pragma_index_list(m.name, ?) AS il "
+                f"WHERE m.type = 'table' AND m.name NOT LIKE '{_SYSTEM_PREFIX}%'",
+                (schema,)).fetchall():
+            indexes[row[0]].append(tuple(row[1:]))
+
+        foreign_keys: Dict[str, List[Tuple]] = {name: [] for name in tables}
+        for row in cursor.execute(
+                f"SELECT m.name, fk.id, fk.seq, fk.\"table\", fk.\"from\", fk.\"to\", "
+                f"fk.on_update, fk.on_delete "
+                f"FROM {master} AS m JOIN pragma_foreign_key_list(m.name, ?) AS fk "
+                f"WHERE m.type = 'table' AND m.name NOT LIKE '{_SYSTEM_PREFIX}%' "
+                f"ORDER BY m.name, fk.id, fk.seq", (schema,)).fetchall():
+            foreign_keys[row[0]].append(tuple(row[1:]))
+
+        row_estimates, index_stats = read_sqlite_stats(cursor, schema)
+
+        return {
+            'version': version,
+            'tables': tables,
+            'views': views,
+            'columns': columns,
+            'indexes': indexes,
+            'foreign_keys': foreign_keys,
+            'row_estimates': row_estimates,
+            'index_stats': index_stats,
+        }
+
+    # ---------- Okuma
+    def tables(self, schema: str = 'main') -> List[str]:
+        return list(self._snapshot(schema)['tables'])
+
+    def views(self, schema: str = 'main') -> List[str]:
+        return list(self._snapshot(schema)['views'])
+
+    def columns(self, table_name: str, schema: str = 'main') -> List[Tuple]:
+        """PRAGMA table_info biçiminde: (cid, name, type, notnull, dflt_value, pk)"""
+        return list(self._snapshot(schema)['columns'].get(table_name, []))
+
+    def indexes(self, table_name: str, schema: str = 'main') -> List[Tuple]:
+        """(name, unique, origin, partial)"""
+        return list(self._snapshot(schema)['indexes'].get(table_name, []))
+
+    def foreign_keys(self, table_name: str, schema: str = 'main') -> List[Tuple]:
+        """(id, seq, table, from, to, on_update, on_delete)"""
+        return list(self._snapshot(schema)['foreign_keys'].get(table_name, []))
+
+    def row_estimate(self, table_name: str, schema: str = 'main') -> Optional[int]:
+        """Son ANALYZE'dan satır tahmini (yoksa None)"""
+        return self._snapshot(schema)['row_estimates'].get(table_name)
+
+    def index_stat(self, index_name: str, schema: str = 'main') -> Optional[List[int]]:
+        """sqlite_stat1 indeks satırı: [satır, ilk 1 sütun eşitken satır, ilk 2 ...]"""
+        stat = self._snapshot(schema)['index_stats'].get(index_name)
+        return list(stat) if stat is not None else None
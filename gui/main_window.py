@@ -16,6 +16,12 @@ from core.database_manager import DatabaseManager
 from core.query_executor import QueryExecutor
 from core.saved_queries_manager import SavedQueriesManager
 
+# Utils
+from utils.metrics import (MetricsExporter, MetricsRegistry, cache_collector,
+                           describe_default_metrics, monitor_collector, query_collector)
+from utils.performance_optimizer import PerformanceMonitor
+from utils.profiler import StackSampler, default_profile_path
+
 # GUI Tabs
 from gui.tabs.query_tab import QueryTab
 from gui.tabs.databases_tab import DatabasesTab
@@ -44,6 +50,14 @@ class MainWindow:
         self.db_manager = None
         self.query_executor = None
         self.saved_queries = None
+        # Sekmelerin ortak ölçüm histogramları (sorgu, render, sayfa, export/import)
+        self.performance_monitor = PerformanceMonitor()
+        # Uygulama metrikleri (sayaçlar + toplayıcılar), periyodik olarak dosyaya dökülür
+        self.metrics = MetricsRegistry()
+        describe_default_metrics(self.metrics)
+        self.metrics_exporter = None
+        self.profiler = None  # Tanılama modu açıkken StackSampler
+        self.profiler_var = None
         self.toolbar = None
         self.notebook = None
         self.status_label = None
@@ -85,6 +99,8 @@ class MainWindow:
 
     def setup_gui(self):
         """GUI bileşenlerini oluştur"""
+        self.setup_menu()
+
         # Toolbar
         self.toolbar = Toolbar(self.root, self)
         self.toolbar.frame.pack(fill="x")
@@ -110,6 +126,46 @@ class MainWindow:
         # Footer
         self.setup_footer()
 
+    def setup_menu(self):
+        """Menü çubuğu"""
+        menubar = tk.Menu(self.root)
+
+        diagnostics_menu = tk.Menu(menubar, tearoff=0)
+        self.profiler_var = tk.BooleanVar(value=False)
+        diagnostics_menu.add_checkbutton(label="🔬 Tanılama Modu (profil örnekleyici)",
+                                         variable=self.profiler_var, command=self.toggle_profiler)
+        menubar.add_cascade(label="🛠️ Tanılama", menu=diagnostics_menu)
+
+        self.root.config(menu=menubar)
+
+    def toggle_profiler(self):
+        """Örnekleyiciyi başlat; kapatınca collapsed stack dosyasını yaz ve özeti göster"""
+        if self.profiler_var.get():
+            self.profiler = StackSampler(PROFILER_SETTINGS['interval_ms'] / 1000,
+                                         PROFILER_SETTINGS['max_depth'])
+            self.profiler.start()
+            self.update_status("🔬 Tanılama modu açık: yavaş işlemi tekrarlayıp modu kapatın",
+                               COLORS['warning'])
+            return
+
+        success, path, report = self._stop_profiler()
+        if success:
+            messagebox.showinfo("🔬 Tanılama Sonucu",
+                                f"{report}\n\n"
+                                f"📄 Profil (flamegraph.pl / speedscope):\n{os.path.abspath(path)}")
+            self.update_status(f"{ICONS['success']} Profil kaydedildi: {path}", COLORS['success'])
+        elif path:
+            messagebox.showerror(f"{ICONS['error']} Hata", path)
+
+    def _stop_profiler(self):
+        """Örnekleyiciyi durdur ve dosyaya yaz; Returns: (başarılı_mı, yol ya da mesaj, özet)"""
+        if self.profiler is None:
+            return False, "", ""
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        success, path = profiler.write_collapsed(default_profile_path(PROFILER_SETTINGS['directory']))
+        return success, path, profiler.format_report()
+
     def setup_footer(self):
         """Alt bilgi çubuğu"""
         footer_frame = tk.Frame(self.root, bg=COLORS['bg_dark'], height=30)
@@ -173,6 +229,23 @@ class MainWindow:
     def on_closing(self):
         """Pencere kapatılırken"""
         if messagebox.askokcancel("Çıkış", MESSAGES['confirm_close']):
+            # Arka planda çalışan sorguyu durdur
+            if self.query_tab and not self.query_tab.stop_running_query():
+                messagebox.showwarning(f"{ICONS['warning']} Uyarı",
+                                       "Çalışan sorgu durdurulamadı, lütfen tekrar deneyin.")
+                return
+
+            # Açık kalan profil örneklemesini kaydet
+            self._stop_profiler()
+
+            # Son metrik dökümü (geçmiş deposu kapanmadan önce)
+            if self.metrics_exporter:
+                self.metrics_exporter.stop()
+
+            # Bekleyen geçmiş kayıtlarını yaz
+            if self.query_executor:
+                self.query_executor.close()
+
             # Tüm bağlantıları kapat
             count = self.db_manager.close_all()
             if count > 0:
@@ -181,6 +254,22 @@ class MainWindow:
 
             self.root.destroy()
 
+    def setup_metrics(self):
+        """Metrik toplayıcılarını bağla ve periyodik dökümü başlat"""
+        self.metrics.register_collector(monitor_collector(self.performance_monitor))
+        self.metrics.register_collector(
+            cache_collector('query_results', self.query_executor.result_cache.get_stats))
+        self.metrics.register_collector(cache_collector('editor_pages', self.editor_tab.cache.get_stats))
+        self.metrics.register_collector(
+            query_collector(self.query_executor, METRICS_SETTINGS['slow_queries']))
+
+        if METRICS_SETTINGS['enabled']:
+            self.metrics_exporter = MetricsExporter(
+                self.metrics, METRICS_SETTINGS['directory'], METRICS_SETTINGS['interval'],
+                METRICS_SETTINGS['prometheus_file'], METRICS_SETTINGS['jsonl_file'],
+                METRICS_SETTINGS['max_jsonl_mb'] * 1024 * 1024)
+            self.metrics_exporter.start()
+
     def run(self):
         """Uygulamayı başlat"""
         self.root.mainloop()
@@ -194,7 +283,8 @@ class MainWindow:
 
             self._update_loading("Sorgu motoru optimize ediliyor...", 35,
                                  "Önbellek stratejileri uygulanıyor")
-            self.query_executor = QueryExecutor(self.db_manager)
+            self.query_executor = QueryExecutor(self.db_manager,
+                                                HISTORY_SETTINGS['storage_file'])
 
             self._update_loading("Kayıtlı sorgular yükleniyor...", 55,
                                  "Favori şablonlar taranıyor")
@@ -207,6 +297,7 @@ class MainWindow:
             self._update_loading("Modüler paneller oluşturuluyor...", 90,
                                  "Sekmeler ve araç çubuğu yapılandırılıyor")
             self.setup_gui()
+            self.setup_metrics()
 
             self._update_loading("Son kontroller...", 100,
                                  "Performans metrikleri doğrulanıyor")
@@ -48,6 +48,9 @@ class DatabasesTab:
         tk.Button(btn_frame, text="🔧 Optimize", command=self.optimize_database,
                   bg=COLORS['warning'], fg=COLORS['text_white'],
                   font=FONTS['subtitle']).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="📈 İstatistik", command=self.analyze_database,
+                  bg=COLORS['info'], fg=COLORS['text_white'],
+                  font=FONTS['subtitle']).pack(side="left", padx=5)
 
         # Database list
         list_frame = tk.Frame(self.frame)
@@ -128,6 +131,12 @@ class DatabasesTab:
 
         if messagebox.askyesno(f"{ICONS['warning']} Onay",
                                f"'{alias}' veritabanı bağlantısını kesmek istiyor musunuz?"):
+            # Bu DB'de çalışan arka plan sorgusu varsa önce durdur
+            if not self.main.query_tab.stop_running_query(alias):
+                messagebox.showwarning(f"{ICONS['warning']} Uyarı",
+                                       f"'{alias}' üzerinde çalışan sorgu durdurulamadı!")
+                return
+
             success, message = self.main.db_manager.close_database(alias)
 
             if success:
@@ -272,4 +281,21 @@ SELECT name, 'attached' as db FROM attached_db.sqlite_master WHERE type='table';
                 messagebox.showinfo(f"{ICONS['success']} Başarılı", message)
                 self.refresh()
             else:
-                messagebox.showerror(f"{ICONS['error']} Hata", message)
\ No newline at end of file
+                messagebox.showerror(f"{ICONS['error']} Hata", message)
+
+    def analyze_database(self):
+        """Satır tahminleri ve sorgu planlayıcı için istatistikleri güncelle (ANALYZE)"""
+        selected = self.db_tree.selection()
+        if not selected:
+            messagebox.showwarning(f"{ICONS['warning']} Uyarı",
+                                   "İstatistikleri güncellenecek veritabanını seçin!")
+            return
+
+        alias = self.db_tree.item(selected[0])['values'][0]
+        success, message = self.main.db_manager.row_counts.analyze(alias)
+
+        if success:
+            messagebox.showinfo(f"{ICONS['success']} Başarılı", message)
+            self.main.refresh_all()
+        else:
+            messagebox.showerror(f"{ICONS['error']} Hata", message)
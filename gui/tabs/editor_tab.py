@@ -8,21 +8,27 @@ from tkinter import ttk, messagebox, simpledialog, filedialog
 from typing import Optional, List, Dict
 
 # Performance optimizer'ı import et
-from utils.performance_optimizer import DataPaginator, PerformanceMonitor, SmartCache
+from utils.performance_optimizer import DataPaginator, SmartCache
 
 from config.settings import *
+from gui.widgets.progress_dialog import ProgressDialog
+from gui.widgets.virtual_grid import VirtualGrid
+from core.change_set_writer import ChangeSetWriter
 
 
 class EditorTab:
     """Veri düzenleme sekmesi - OPTIMIZE EDİLMİŞ"""
 
+    ROW_COUNT_POLL_MS = 300  # Arka plandaki kesin sayımı yoklama aralığı
+
     def __init__(self, parent, main_window):
         self.parent = parent
         self.main = main_window
 
         self.frame = ttk.Frame(parent)
 
-        # Değişiklik takibi
+        # Değişiklik takibi (anahtarlar: sayfa içindeki satır indeksi)
+        self.page_rows = []
         self.original_data = {}
         self.pending_changes = {}
         self.deleted_rows = set()
@@ -33,7 +39,7 @@ class EditorTab:
 
         # 🚀 YENİ: Performans optimizasyon araçları
         self.paginator = DataPaginator(page_size=100)  # Her sayfada 100 satır
-        self.performance_monitor = PerformanceMonitor()
+        self.performance_monitor = main_window.performance_monitor  # Ana pencereyle ortak histogramlar
         self.cache = SmartCache(max_size_mb=50)  # 50 MB cache
         self.is_large_dataset = False  # Büyük veri seti bayrağı
 
@@ -177,23 +183,10 @@ class EditorTab:
                                         font=FONTS['normal'], fg=COLORS['text_gray'])
         self.edit_info_label.pack(side="right")
 
-        # Editable treeview
-        edit_tree_frame = tk.Frame(self.frame)
-        edit_tree_frame.pack(fill="both", expand=True, padx=5, pady=5)
-
-        self.edit_tree = ttk.Treeview(edit_tree_frame, show="headings")
-
-        edit_v_scroll = ttk.Scrollbar(edit_tree_frame, orient="vertical", command=self.edit_tree.yview)
-        edit_h_scroll = ttk.Scrollbar(edit_tree_frame, orient="horizontal", command=self.edit_tree.xview)
-
-        self.edit_tree.configure(yscrollcommand=edit_v_scroll.set, xscrollcommand=edit_h_scroll.set)
-
-        self.edit_tree.grid(row=0, column=0, sticky="nsew")
-        edit_v_scroll.grid(row=0, column=1, sticky="ns")
-        edit_h_scroll.grid(row=1, column=0, sticky="ew")
-
-        edit_tree_frame.grid_rowconfigure(0, weight=1)
-        edit_tree_frame.grid_columnconfigure(0, weight=1)
+        # Editable grid (sanal kaydırma)
+        self.edit_grid = VirtualGrid(self.frame)
+        self.edit_grid.pack(fill="both", expand=True, padx=5, pady=5)
+        self.edit_tree = self.edit_grid.tree
 
         # Bind edit events
         self.edit_tree.bind('<Double-1>', self.edit_cell)
@@ -224,16 +217,13 @@ class EditorTab:
             return
 
         self.main.update_status(f"{ICONS['info']} '{table_name}' tablosu yükleniyor...", COLORS['warning'])
-        # 🚀 Performans monitörü başlat
-        self.performance_monitor.start_timer()
 
         try:
             conn = self.main.db_manager.get_connection(db_alias)
 
-            # Toplam satır sayısını al
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-            total_rows = cursor.fetchone()[0]
+            # 🚀 Toplam satır sayısı: anlık tahmin (büyük tablolarda COUNT(*) arka planda)
+            total_rows, approximate = self.main.db_manager.row_counts.get_count(table_name, db_alias)
+            total_text = f"{'~' if approximate else ''}{total_rows:,}"
 
             # 🚀 Büyük veri seti kontrolü
             self.is_large_dataset = total_rows > 1000
@@ -241,7 +231,7 @@ class EditorTab:
             if self.is_large_dataset:
                 response = messagebox.askyesno(
                     "📊 Büyük Veri Seti Tespit Edildi!",
-                    f"Bu tablo {total_rows:,} kayıt içeriyor.\n\n"
+                    f"Bu tablo {total_text} kayıt içeriyor.\n\n"
                     f"🚀 Optimizasyon Aktif!\n"
                     f"• Sayfalama kullanılacak (100 satır/sayfa)\n"
                     f"• Sadece görünen veriler yüklenecek\n"
@@ -257,73 +247,71 @@ class EditorTab:
             columns_info = self.main.db_manager.get_table_info(table_name, db_alias)
 
             # Clear existing data
-            for item in self.edit_tree.get_children():
-                self.edit_tree.delete(item)
+            self.edit_grid.clear()
 
             # Setup columns (rowid + actual columns)
             col_names = ["rowid"] + [col[1] for col in columns_info]
-            self.edit_tree["columns"] = col_names
-            self.edit_tree["show"] = "headings"
-
-            # Configure columns
-            for col in col_names:
-                if col == "rowid":
-                    self.edit_tree.heading(col, text="🔢 ID")
-                    self.edit_tree.column(col, width=70, anchor="center")
-                else:
-                    self.edit_tree.heading(col, text=col)
-                    self.edit_tree.column(col, width=120, anchor="center")
-
-            # 🚀 Pagination kurulumu
-            self.paginator.set_total_rows(total_rows)
+            self.edit_grid.set_columns(col_names,
+                                       widths={"rowid": 70},
+                                       headings={"rowid": "🔢 ID"})
+
+            # 🚀 Pagination kurulumu (seek sınırları sürüm değiştiyse düşer)
+            self.paginator.validate_table(
+                table_name, self.main.db_manager.get_table_version(table_name, db_alias))
+            self.paginator.set_total_rows(total_rows, approximate)
             self.paginator.current_page = 0
 
-            # İlk sayfayı yükle
-            self._load_page(0, conn, table_name, col_names)
+            self.current_table = table_name
+            self.current_db = db_alias
+
+            # İlk sayfayı yükle (süre 'page_load' histogramına yazılır)
+            load_time = self._load_page(0, conn, table_name, col_names)
 
             # 🚀 Pagination butonlarını aktifleştir
             self._update_pagination_buttons()
 
             # 🚀 Sonraki sayfayı arka planda önceden yükle
             if total_rows > self.paginator.page_size:
-                self.paginator.prefetch_next_page(conn, table_name, 0, col_names[1:])
+                self.paginator.prefetch_next_page(
+                    self.main.db_manager.get_pool(db_alias), table_name, 0, col_names[1:],
+                    self.main.db_manager.get_table_version(table_name, db_alias))
 
             # Configure colors
-            self.edit_tree.tag_configure("even", background=COLORS['tree_even'])
-            self.edit_tree.tag_configure("odd", background=COLORS['tree_odd'])
-            self.edit_tree.tag_configure("changed", background=COLORS['tree_changed'])
-            self.edit_tree.tag_configure("new", background=COLORS['tree_new'])
-            self.edit_tree.tag_configure("deleted", background=COLORS['tree_deleted'])
+            self.edit_grid.tag_configure("changed", background=COLORS['tree_changed'])
+            self.edit_grid.tag_configure("new", background=COLORS['tree_new'])
+            self.edit_grid.tag_configure("deleted", background=COLORS['tree_deleted'])
 
             # Reset tracking
             self.pending_changes = {}
             self.deleted_rows = set()
             self.new_rows = {}
             self.next_new_id = -1
-            self.current_table = table_name
-            self.current_db = db_alias
 
             self.update_changes_status()
 
             # 🚀 Performans raporla
-            load_time = self.performance_monitor.stop_timer('load_times')
             page_info = self.paginator.get_page_info()
 
             self.performance_label.config(
                 text=f"⚡ Yükleme: {load_time:.2f}s | "
-                     f"📊 {page_info['start_row']}-{page_info['end_row']} / {total_rows:,}"
+                     f"📊 {page_info['start_row']}-{page_info['end_row']} / {total_text} | "
+                     f"{self.performance_monitor.format_percentiles('page_load')}"
             )
 
+            # 🚀 Tahminse kesin sayımı arka planda yap ve gelince etiketleri düzelt
+            if approximate and self.main.db_manager.row_counts.refine(table_name, db_alias):
+                self.frame.after(self.ROW_COUNT_POLL_MS, self._poll_row_count, table_name, db_alias)
+
             if self.is_large_dataset:
                 messagebox.showinfo(f"{ICONS['success']} Başarılı",
                                   f"✅ Tablo yüklendi (Optimize mod)\n\n"
-                                  f"📊 Toplam: {total_rows:,} kayıt\n"
+                                  f"📊 Toplam: {total_text} kayıt\n"
                                   f"📄 Sayfa: {page_info['total_pages']} sayfa\n"
                                   f"⚡ Yükleme: {load_time:.2f} saniye\n\n"
                                   f"💡 Sayfa butonlarıyla gezinebilirsiniz")
             else:
                 messagebox.showinfo(f"{ICONS['success']} Başarılı",
-                                  f"{total_rows:,} kayıt yüklendi")
+                                  f"{total_text} kayıt yüklendi")
             self.main.update_status(f"{ICONS['success']} '{table_name}' tablosu yüklendi", COLORS['success'])
 
         except Exception as e:
@@ -331,43 +319,71 @@ class EditorTab:
                                f"Yükleme hatası:\n{str(e)}")
             self.main.update_status(f"{ICONS['error']} Tablo yüklenemedi", COLORS['danger'])
 
-    def _load_page(self, page: int, conn, table_name: str, col_names: List[str]):
-        """Belirli bir sayfayı yükle"""
-        # Cache kontrolü
-        cache_key = f"{table_name}_{page}"
-        cached_data = self.cache.get(cache_key)
-
-        if cached_data:
-            data = cached_data
-        else:
-            # Veritabanından çek
-            data, _ = self.paginator.get_page_data(conn, table_name, page, col_names[1:])
-            self.cache.set(cache_key, data)
-
-        # Treeview'i temizle
-        for item in self.edit_tree.get_children():
-            self.edit_tree.delete(item)
-
-        # Veriyi göster
-        self.original_data = {}
-        for i, row in enumerate(data):
-            item_id = self.edit_tree.insert("", tk.END, values=row)
-            self.original_data[item_id] = row
+    def _load_page(self, page: int, conn, table_name: str, col_names: List[str]) -> float:
+        """Belirli bir sayfayı yükle; süreyi (saniye) döndürür"""
+        with self.performance_monitor.span('page_load') as span:
+            # Cache kontrolü (sürüm değiştiyse girdi bayat sayılır)
+            version = self.main.db_manager.get_table_version(table_name, self.current_db)
+            cache_key = f"{self.current_db}:{table_name}:{page}"
+            cached_data = self.cache.get(cache_key, version=version)
 
-            # Alternate colors
-            tag = "even" if i % 2 == 0 else "odd"
-            self.edit_tree.item(item_id, tags=(tag,))
+            if cached_data is not None:
+                data = cached_data
+            else:
+                # Veritabanından çek
+                data, _ = self.paginator.get_page_data(conn, table_name, page, col_names[1:],
+                                                       version=version)
+                self.cache.set(cache_key, data, version=version)
+
+            # Veriyi göster (grid sadece görünen satırları çizer)
+            self.page_rows = [tuple(row) for row in data]
+            self.original_data = dict(enumerate(self.page_rows))
+            self.edit_grid.set_rows(self.page_rows)
+        self.main.metrics.inc('app_rows_rendered_total', len(self.page_rows), tab='editor')
+
+        # Değişiklikler sayfa içi satır indeksine bağlı; sayfa değişince sıfırla
+        self.pending_changes = {}
+        self.deleted_rows = set()
+        self.new_rows = {}
+        self.update_changes_status()
 
         # Sayfa bilgisini güncelle
+        self._update_page_labels()
+        self.performance_label.config(
+            text=f"⚡ Sayfa: {span.elapsed * 1000:.0f} ms | "
+                 f"{self.performance_monitor.format_percentiles('page_load')}"
+        )
+        return span.elapsed
+
+    def _update_page_labels(self):
+        """Sayfa etiketlerini güncelle (tahmini toplam '~' ile gösterilir)"""
         page_info = self.paginator.get_page_info()
+        prefix = "~" if page_info['approximate'] else ""
         self.page_info_label.config(
-            text=f"📊 Gösterilen: {page_info['start_row']}-{page_info['end_row']} / {page_info['total_rows']:,} kayıt"
+            text=f"📊 Gösterilen: {page_info['start_row']}-{page_info['end_row']} / "
+                 f"{prefix}{page_info['total_rows']:,} kayıt"
         )
 
         self.current_page_label.config(
-            text=f"Sayfa: {page + 1} / {page_info['total_pages']}"
+            text=f"Sayfa: {page_info['current_page'] + 1} / {prefix}{page_info['total_pages']}"
         )
 
+    def _poll_row_count(self, table_name: str, db_alias: str):
+        """Arka plandaki kesin sayım bitince sayfalamayı kesin sayıyla güncelle"""
+        if table_name != self.current_table or db_alias != self.current_db:
+            return
+
+        row_counts = self.main.db_manager.row_counts
+        total_rows, approximate = row_counts.get_count(table_name, db_alias)
+        if approximate:
+            if row_counts.is_refining(table_name, db_alias):
+                self.frame.after(self.ROW_COUNT_POLL_MS, self._poll_row_count, table_name, db_alias)
+            return
+
+        self.paginator.set_total_rows(total_rows)
+        self._update_page_labels()
+        self._update_pagination_buttons()
+
     def _update_pagination_buttons(self):
         """Pagination butonlarının durumunu güncelle"""
         page_info = self.paginator.get_page_info()
@@ -382,13 +398,13 @@ class EditorTab:
             self.btn_first.config(state="normal")
             self.btn_prev.config(state="normal")
 
-        # Sonraki ve son butonlar
+        # Sonraki ve son butonlar (toplam tahminiyken son sayfa bilinmez)
         if current >= total - 1:
             self.btn_next.config(state="disabled")
             self.btn_last.config(state="disabled")
         else:
             self.btn_next.config(state="normal")
-            self.btn_last.config(state="normal")
+            self.btn_last.config(state="disabled" if page_info['approximate'] else "normal")
 
     def goto_first_page(self):
         """İlk sayfaya git"""
@@ -427,8 +443,10 @@ class EditorTab:
             self._update_pagination_buttons()
 
             # 🚀 Sonraki sayfayı arka planda yükle
-            self.paginator.prefetch_next_page(conn, self.current_table,
-                                             self.paginator.current_page, col_names[1:])
+            self.paginator.prefetch_next_page(
+                self.main.db_manager.get_pool(self.current_db), self.current_table,
+                self.paginator.current_page, col_names[1:],
+                self.main.db_manager.get_table_version(self.current_table, self.current_db))
 
     def goto_last_page(self):
         """Son sayfaya git"""
@@ -451,6 +469,11 @@ class EditorTab:
             if 0 <= page_num < page_info['total_pages']:
                 self.paginator.current_page = page_num
                 conn = self.main.db_manager.get_connection(self.current_db)
+
+                # 🚀 Uzak sayfaya atlamadan önce sayfa başlangıçlarını tek geçişte çıkar
+                if not self.paginator.has_bound(self.current_table, page_num):
+                    self.paginator.sample_checkpoints(conn, self.current_table)
+
                 col_names = list(self.edit_tree["columns"])
                 self._load_page(page_num, conn, self.current_table, col_names)
                 self._update_pagination_buttons()
@@ -463,22 +486,18 @@ class EditorTab:
     # ===== Diğer metodlar aynı kalacak (edit_cell, add_new_row, etc.) =====
 
     def edit_cell(self, event):
-        """Hücre düzenle - AYNEN KALIYOR"""
-        selected = self.edit_tree.selection()
-        if not selected:
+        """Hücre düzenle"""
+        index, col_num = self.edit_grid.identify_cell(event)
+        if index is None:
             return
 
-        item = selected[0]
-        column = self.edit_tree.identify_column(event.x)
-        col_num = int(column.replace('#', '')) - 1
-
         if col_num == 0:  # rowid düzenlenemez
             messagebox.showwarning(f"{ICONS['warning']} Uyarı",
                                  "ID sütunu düzenlenemez!")
             return
 
         # Get current value
-        current_value = self.edit_tree.item(item)['values'][col_num]
+        current_value = self.edit_grid.row_values(index)[col_num]
 
         # Edit dialog
         new_value = simpledialog.askstring(
@@ -488,45 +507,45 @@ class EditorTab:
         )
 
         if new_value is not None:
-            # Update treeview
-            values = list(self.edit_tree.item(item)['values'])
+            # Update grid
+            values = list(self.edit_grid.row_values(index))
             values[col_num] = new_value
-            self.edit_tree.item(item, values=values)
-
-            # Mark as changed
-            self.edit_tree.item(item, tags=('changed',))
+            self.edit_grid.update_row(index, values)
 
-            # Track change
-            if item not in self.pending_changes:
-                self.pending_changes[item] = {}
-
-            col_name = self.edit_tree['columns'][col_num]
-            self.pending_changes[item][col_name] = new_value
+            # Track change (yeni satırlar INSERT değerlerinde tutulur)
+            if index in self.new_rows:
+                self.new_rows[index][col_num - 1] = new_value
+            else:
+                self.edit_grid.set_row_tags(index, ('changed',))
+                col_name = self.edit_grid.columns[col_num]
+                self.pending_changes.setdefault(index, {})[col_name] = new_value
 
             self.update_changes_status()
 
     def add_new_row(self):
-        """Yeni satır ekle - AYNEN KALIYOR"""
+        """Yeni satır ekle"""
         if not self.current_table:
             messagebox.showwarning(f"{ICONS['warning']} Uyarı",
                                  "Önce bir tablo yükleyin!")
             return
 
         # Create empty row
-        num_cols = len(self.edit_tree['columns'])
+        num_cols = len(self.edit_grid.columns)
         new_values = [self.next_new_id] + [""] * (num_cols - 1)
 
-        item_id = self.edit_tree.insert("", tk.END, values=new_values)
-        self.edit_tree.item(item_id, tags=('new',))
+        index = len(self.page_rows)
+        self.edit_grid.append_rows([tuple(new_values)])
+        self.edit_grid.set_row_tags(index, ('new',))
+        self.edit_grid.scroll_to(index)
 
-        self.new_rows[item_id] = new_values[1:]  # rowid hariç
+        self.new_rows[index] = new_values[1:]  # rowid hariç
         self.next_new_id -= 1
 
         self.update_changes_status()
 
     def delete_selected_row(self, event=None):
-        """Seçili satırı sil - AYNEN KALIYOR"""
-        selected = self.edit_tree.selection()
+        """Seçili satırı sil"""
+        selected = self.edit_grid.selected_indices()
         if not selected:
             messagebox.showwarning(f"{ICONS['warning']} Uyarı",
                                  "Silinecek satırı seçin!")
@@ -534,9 +553,9 @@ class EditorTab:
 
         if messagebox.askyesno(f"{ICONS['warning']} Onay",
                               "Seçili satırı silmek istiyor musunuz?"):
-            for item in selected:
-                self.deleted_rows.add(item)
-                self.edit_tree.item(item, tags=('deleted',))
+            for index in selected:
+                self.deleted_rows.add(index)
+                self.edit_grid.set_row_tags(index, ('deleted',))
 
             self.update_changes_status()
 
@@ -565,46 +584,52 @@ class EditorTab:
             if not response:
                 return
 
-        try:
-            conn = self.main.db_manager.get_connection(self.current_db)
-            cursor = conn.cursor()
-
-            # Apply updates
-            for item, changes in self.pending_changes.items():
-                rowid = self.edit_tree.item(item)['values'][0]
-
-                set_clause = ", ".join([f"`{col}` = ?" for col in changes.keys()])
-                values = list(changes.values()) + [rowid]
-
-                query = f"UPDATE `{self.current_table}` SET {set_clause} WHERE rowid = ?"
-                cursor.execute(query, values)
-
-            # Apply deletes
-            for item in self.deleted_rows:
-                if item in self.original_data:
-                    rowid = self.original_data[item][0]
-                    cursor.execute(f"DELETE FROM `{self.current_table}` WHERE rowid = ?", (rowid,))
-                    self.edit_tree.delete(item)
-
-            # Apply inserts
-            for item, values in self.new_rows.items():
-                columns = self.edit_tree['columns'][1:]  # rowid hariç
-                placeholders = ", ".join(["?"] * len(values))
-                cols_str = ", ".join([f"`{col}`" for col in columns])
-
-                query = f"INSERT INTO `{self.current_table}` ({cols_str}) VALUES ({placeholders})"
-                cursor.execute(query, values)
+        conn = self.main.db_manager.get_connection(self.current_db)
+        if not conn:
+            return
 
-            conn.commit()
+        # 🚀 Değişiklik kümesi: gruplanmış executemany, tek transaction
+        columns = self.edit_grid.columns[1:]  # rowid hariç
+        updates = [(index, self.page_rows[index][0], changes)
+                   for index, changes in self.pending_changes.items()
+                   if index not in self.deleted_rows]
+        deletes = [(index, self.original_data[index][0])
+                   for index in sorted(self.deleted_rows) if index in self.original_data]
+        inserts = [(index, dict(zip(columns, values)))
+                   for index, values in self.new_rows.items()
+                   if index not in self.deleted_rows]
+
+        with self.performance_monitor.span('query') as span:
+            writer = ChangeSetWriter(conn, self.current_table)
+            success, summary = writer.apply(updates, deletes, inserts)
+        save_time = span.elapsed
+
+        if not success:
+            messagebox.showerror(f"{ICONS['error']} Hata",
+                               f"Kaydetme hatası:\n{summary.get('error', '')}\n\n"
+                               f"Hiçbir değişiklik kaydedilmedi.")
+            return
 
-            messagebox.showinfo(f"{ICONS['success']} Başarılı",
-                              f"Değişiklikler kaydedildi!\n\n"
-                              f"Güncellenen: {len(self.pending_changes)}\n"
-                              f"Silinen: {len(self.deleted_rows)}\n"
-                              f"Eklenen: {len(self.new_rows)}")
+        message = (f"Değişiklikler kaydedildi! ({save_time * 1000:.0f} ms)\n\n"
+                   f"Güncellenen: {summary['updated']}\n"
+                   f"Silinen: {summary['deleted']}\n"
+                   f"Eklenen: {summary['inserted']}")
+        kind_names = {'update': 'Güncelleme', 'delete': 'Silme', 'insert': 'Ekleme'}
+        failed = summary['failed']
+        if failed:
+            message += f"\n\n⚠️ Kaydedilemeyen: {len(failed)} satır\n"
+            message += "\n".join(
+                f"• {kind_names[kind]} (satır {self.page_rows[index][0]}): {error}"
+                for kind, index, error in failed[:10])
+            if len(failed) > 10:
+                message += f"\n... ve {len(failed) - 10} satır daha"
+            messagebox.showwarning(f"{ICONS['warning']} Kısmen Kaydedildi", message)
+        else:
+            messagebox.showinfo(f"{ICONS['success']} Başarılı", message)
 
-            # 🚀 Cache'i temizle ve mevcut sayfayı yeniden yükle
-            self.cache.clear()
+        try:
+            # 🚀 Sadece bu tablonun önbelleği bayatlar, diğer tablolar sıcak kalır
+            self.main.db_manager.mark_table_changed(self.current_table, self.current_db)
             current_page = self.paginator.current_page
             col_names = list(self.edit_tree["columns"])
             self._load_page(current_page, conn, self.current_table, col_names)
@@ -612,9 +637,8 @@ class EditorTab:
             self.main.refresh_all()
 
         except Exception as e:
-            conn.rollback()
             messagebox.showerror(f"{ICONS['error']} Hata",
-                               f"Kaydetme hatası:\n{str(e)}")
+                               f"Yenileme hatası:\n{str(e)}")
 
     def revert_changes(self):
         """Değişiklikleri geri al - AYNEN KALIYOR"""
@@ -656,7 +680,7 @@ class EditorTab:
             )
 
     def bulk_update_from_excel(self):
-        """Excel'den toplu güncelleme - AYNEN KALIYOR (tüm kod korunuyor)"""
+        """Excel'den toplu güncelleme (hazırlık tablosu ile küme tabanlı)"""
         if not self.current_table or not self.current_db:
             messagebox.showwarning(f"{ICONS['warning']} Uyarı",
                                  "Önce bir tablo yükleyin!")
@@ -674,30 +698,27 @@ class EditorTab:
         try:
             from utils.excel_handler import ExcelHandler
 
-            # Excel'i oku
-            self.main.update_status(f"{ICONS['info']} Excel okunuyor...", COLORS['warning'])
-            success, df = ExcelHandler.import_excel(file_path)
+            # 🚀 Yalnızca başlık okunur (read_only); satırlar güncelleme sırasında akıtılır
+            success, sheet_info = ExcelHandler.read_excel_header(file_path)
 
             if not success:
-                messagebox.showerror(f"{ICONS['error']} Hata", df)
+                messagebox.showerror(f"{ICONS['error']} Hata", sheet_info)
                 self.main.update_status(f"{ICONS['error']} Excel okunamadı", COLORS['danger'])
                 return
 
             # id sütunu var mı kontrol et
-            if 'id' not in df.columns:
+            if 'id' not in sheet_info['columns']:
                 messagebox.showerror(f"{ICONS['error']} Hata",
                                    "Excel'de 'id' sütunu bulunamadı!\n\n"
                                    "Toplu güncelleme için Excel'de 'id' sütunu olmalıdır.")
                 return
 
             # Mevcut tablo sütunlarını al
-            conn = self.main.db_manager.get_connection(self.current_db)
-            cursor = conn.cursor()
-            cursor.execute(f"PRAGMA table_info(`{self.current_table}`)")
-            table_columns = [col[1] for col in cursor.fetchall()]
+            table_columns = [col[1] for col in
+                             self.main.db_manager.get_table_info(self.current_table, self.current_db)]
 
             # Güncellenebilecek sütunları bul (id hariç, tabloda olan)
-            updatable_columns = [col for col in df.columns
+            updatable_columns = [col for col in sheet_info['columns']
                                if col != 'id' and col in table_columns]
 
             if not updatable_columns:
@@ -720,7 +741,7 @@ class EditorTab:
             info_frame = tk.Frame(preview_dialog, bg=COLORS['bg_light'])
             info_frame.pack(fill="x", padx=20, pady=10)
 
-            tk.Label(info_frame, text=f"📊 Toplam Kayıt: {len(df)}\n"
+            tk.Label(info_frame, text=f"📊 Toplam Kayıt: ~{sheet_info['rows']:,}\n"
                                      f"🔑 Eşleşme Anahtarı: id\n"
                                      f"📝 Güncellenecek Sütunlar: {', '.join(updatable_columns)}",
                     bg=COLORS['bg_light'], font=FONTS['normal'],
@@ -787,51 +808,61 @@ class EditorTab:
             if not result.get('confirmed'):
                 return
 
-            # Toplu güncelleme yap
+            # 🚀 Küme tabanlı toplu güncelleme: read_only satırlar işçi bağlantısında
+            # TEMP hazırlık tablosuna akıtılır, tek UPDATE ile uygulanır (UI donmaz)
             selected_columns = result['columns']
-            updated_count = 0
-            not_found_count = 0
-
-            cursor = conn.cursor()
-
-            for _, row in df.iterrows():
-                row_id = row['id']
-
-                # Bu id var mı kontrol et
-                cursor.execute(f"SELECT COUNT(*) FROM `{self.current_table}` WHERE id = ?", (row_id,))
-                if cursor.fetchone()[0] == 0:
-                    not_found_count += 1
-                    continue
-
-                # UPDATE sorgusu oluştur
-                set_clause = ", ".join([f"`{col}` = ?" for col in selected_columns])
-                # Pandas Timestamp'leri string'e çevir
-                values = []
-                for col in selected_columns:
-                    val = row[col]
-                    # Timestamp veya datetime ise string'e çevir
-                    if hasattr(val, 'strftime'):
-                        values.append(val.strftime('%Y-%m-%d %H:%M:%S'))
-                    else:
-                        values.append(val)
-                values.append(row_id)
-
-                update_query = f"UPDATE `{self.current_table}` SET {set_clause} WHERE id = ?"
-                cursor.execute(update_query, values)
-                updated_count += 1
-
-            conn.commit()
-
-            messagebox.showinfo(f"{ICONS['success']} Başarılı",
-                              f"✅ Toplu güncelleme tamamlandı!\n\n"
-                              f"📊 Güncellenen: {updated_count} kayıt\n"
-                              f"⚠️ Bulunamayan: {not_found_count} kayıt\n"
-                              f"📝 Güncellenen Sütunlar: {', '.join(selected_columns)}")
-            self.main.update_status(f"{ICONS['success']} Toplu güncelleme tamamlandı", COLORS['success'])
-
-            # 🚀 Cache'i temizle ve tabloyu yeniden yükle
-            self.cache.clear()
-            self.load_table_for_editing()
+            table_name, alias = self.current_table, self.current_db
+            total_rows = max(1, sheet_info['rows'])
+
+            def task(progress_callback, cancel_check):
+                missing_id = [0]
+
+                def keyed_rows():
+                    for row in ExcelHandler.iter_excel_rows(file_path, ['id'] + selected_columns):
+                        if row[0] is None:
+                            missing_id[0] += 1
+                        else:
+                            yield row
+
+                conn = self.main.db_manager.open_worker_connection(alias)
+                if conn is None:
+                    return False, "Aktif veritabanı bağlantısı bulunamadı!"
+                try:
+                    writer = ChangeSetWriter(conn, table_name)
+                    success, summary = writer.bulk_update(
+                        'id', selected_columns, keyed_rows(),
+                        on_chunk=lambda read: progress_callback(read, min(1.0, read / total_rows)),
+                        cancel_check=cancel_check)
+                finally:
+                    conn.close()
+                if not success:
+                    return False, summary['error']
+                return True, {**summary, 'missing_id': missing_id[0]}
+
+            def on_done(success, summary):
+                if not success:
+                    messagebox.showerror(f"{ICONS['error']} Hata",
+                                       f"Toplu güncelleme hatası:\n{summary}")
+                    self.main.update_status(f"{ICONS['error']} Toplu güncelleme başarısız", COLORS['danger'])
+                    return
+                if summary['cancelled']:
+                    self.main.update_status(f"{ICONS['warning']} Toplu güncelleme iptal edildi", COLORS['warning'])
+                    return
+
+                messagebox.showinfo(f"{ICONS['success']} Başarılı",
+                                  f"✅ Toplu güncelleme tamamlandı!\n\n"
+                                  f"📊 Güncellenen: {summary['matched']} kayıt\n"
+                                  f"⚠️ Bulunamayan: {summary['unmatched'] + summary['missing_id']} kayıt\n"
+                                  f"📝 Güncellenen Sütunlar: {', '.join(selected_columns)}")
+                self.main.update_status(f"{ICONS['success']} Toplu güncelleme tamamlandı", COLORS['success'])
+
+                # 🚀 Tablonun sürümünü artır ve yeniden yükle (bayat sayfalar okumada düşer)
+                self.main.db_manager.mark_table_changed(table_name, alias)
+                self.load_table_for_editing()
+
+            self.main.update_status(f"{ICONS['info']} Toplu güncelleme uygulanıyor...", COLORS['warning'])
+            ProgressDialog(self.main.root, "📄 Toplu Güncelleme",
+                           f"Excel → {table_name}").run(task, on_done)
 
         except Exception as e:
             messagebox.showerror(f"{ICONS['error']} Hata",
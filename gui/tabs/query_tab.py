@@ -3,6 +3,7 @@ SQL Sorguları Sekmesi - PERFORMANS OPTİMİZE EDİLMİŞ
 Büyük sonuç setleri için akıllı limit, pagination ve progressive loading
 """
 
+import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 import pandas as pd
@@ -11,13 +12,19 @@ import pandas as pd
 from utils.performance_optimizer import (
     QueryOptimizer,
     DataPaginator,
-    PerformanceMonitor,
     ProgressiveLoader
 )
 
 from config.settings import *
+from core.execution_guard import ExecutionGuard
+from core.query_worker import QueryWorker
+from gui.widgets.virtual_grid import VirtualGrid
+from gui.widgets.plan_viewer import PlanViewer
+from gui.widgets.progress_dialog import ProgressDialog
 from utils.excel_handler import ExcelHandler
 from utils.csv_handler import CSVHandler
+from utils.metrics import observe_import
+from utils.sql_lexer import statement_at
 
 
 class QueryTab:
@@ -33,9 +40,18 @@ class QueryTab:
         # 🚀 YENİ: Performans araçları
         self.query_optimizer = QueryOptimizer()
         self.paginator = DataPaginator(page_size=1000)  # Sorgu sonuçları için 1000 satır/sayfa
-        self.performance_monitor = PerformanceMonitor()
+        self.performance_monitor = main_window.performance_monitor  # Ana pencereyle ortak histogramlar
+        self._query_span = None
         self.progressive_loader = ProgressiveLoader(chunk_size=100)
 
+        # 🚀 YENİ: Arka plan sorgu işçisi (UI donmasın)
+        self.query_worker = QueryWorker(self.main.query_executor)
+        self.worker_poll_ms = 100
+        self._running_db_alias = None
+        self._running_rows = 0
+        self._running_elapsed = 0.0
+        self._stream_rows = []  # Akış modunda grid'in tamponu (liste kopyalanmaz)
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -88,9 +104,18 @@ class QueryTab:
         query_controls = tk.Frame(left_panel)
         query_controls.pack(fill="x", pady=(5, 0))
 
-        tk.Button(query_controls, text=f"▶️ Çalıştır", command=self.run_query,
-                 bg=COLORS['success'], fg=COLORS['text_white'],
-                 font=FONTS['subtitle'], padx=20).pack(side="left", padx=2)
+        self.btn_run = tk.Button(query_controls, text=f"▶️ Çalıştır", command=self.run_query,
+                                 bg=COLORS['success'], fg=COLORS['text_white'],
+                                 font=FONTS['subtitle'], padx=20)
+        self.btn_run.pack(side="left", padx=2)
+        self.btn_cancel = tk.Button(query_controls, text="⛔ İptal", command=self.cancel_query,
+                                    bg=COLORS['dark'], fg=COLORS['text_white'],
+                                    padx=15, state="disabled")
+        self.btn_cancel.pack(side="left", padx=2)
+        tk.Button(query_controls, text="🧭 Plan", command=self.show_query_plan,
+                 bg=COLORS['primary'], fg=COLORS['text_white'], padx=10).pack(side="left", padx=2)
+        tk.Button(query_controls, text="🔢 Say", command=self.count_results,
+                 bg=COLORS['dark'], fg=COLORS['text_white'], padx=10).pack(side="left", padx=2)
         tk.Button(query_controls, text=f"{ICONS['delete']} Temizle", command=self.clear_query,
                  bg=COLORS['danger'], fg=COLORS['text_white'], padx=15).pack(side="left", padx=2)
         tk.Button(query_controls, text=f"{ICONS['import']} Excel İçe Aktar", command=self.import_excel,
@@ -100,6 +125,14 @@ class QueryTab:
         tk.Button(query_controls, text=f"{ICONS['save']} Kaydet", command=self.save_query,
                  bg=COLORS['dark'], fg=COLORS['text_white'], padx=15).pack(side="left", padx=2)
 
+        # 🚀 Sorgu zaman aşımı (progress handler ile; 'Yok' = sınırsız)
+        default_timeout = self.main.query_executor.default_timeout
+        self.timeout_var = tk.StringVar(value=f"{default_timeout:g}" if default_timeout else "Yok")
+        ttk.Combobox(query_controls, textvariable=self.timeout_var, width=5,
+                     values=["Yok", "10", "30", "60", "300", "900"]).pack(side="right", padx=2)
+        tk.Label(query_controls, text="⏱️ Zaman aşımı (s):",
+                 font=FONTS['small']).pack(side="right")
+
         # Right panel - Quick queries
         right_panel = tk.Frame(top_section, width=300)
         right_panel.pack(side="right", fill="y", padx=(10, 0))
@@ -123,12 +156,27 @@ class QueryTab:
                 fg=COLORS['primary']).pack(pady=5)
 
         tk.Label(opt_frame,
-                text="• Büyük sonuçlar otomatik limit\n"
+                text="• Plan tahmini: akış / ilk sayfa\n"
+                     "• Tam tarama uyarısı\n"
                      "• Sayfalama ile hızlı yükleme\n"
                      "• Performans takibi aktif",
                 bg=COLORS['bg_light'], font=FONTS['small'],
                 fg=COLORS['text_gray'], justify="left").pack(padx=5, pady=5)
 
+        tk.Button(opt_frame, text="💡 İndeks Önerileri", command=self.advise_indexes,
+                  bg=COLORS['info'], fg=COLORS['text_white'],
+                  font=FONTS['small']).pack(fill="x", padx=5, pady=(0, 5))
+
+        tk.Button(opt_frame, text="🐢 En Yavaş Sorgular", command=self.show_slowest_queries,
+                  bg=COLORS['info'], fg=COLORS['text_white'],
+                  font=FONTS['small']).pack(fill="x", padx=5, pady=(0, 5))
+
+        # 🚀 Sonuç önbelleği (aynı sorgu, değişmemiş veritabanı -> yeniden çalıştırılmaz)
+        self.cache_var = tk.BooleanVar(value=self.main.query_executor.cache_enabled)
+        tk.Checkbutton(opt_frame, text="💾 Sonuç önbelleği", variable=self.cache_var,
+                       command=self.toggle_result_cache, bg=COLORS['bg_light'],
+                       font=FONTS['small']).pack(anchor="w", padx=5, pady=(0, 5))
+
         # 🚀 YENİ: Result info bar (sonuç bilgisi)
         result_info_frame = tk.Frame(self.frame, bg=COLORS['bg_light'], height=35)
         result_info_frame.pack(fill="x", padx=5, pady=5)
@@ -154,23 +202,17 @@ class QueryTab:
         result_label = tk.Label(results_frame, text="📊 Sonuçlar:", font=FONTS['subtitle'])
         result_label.pack(anchor="w")
 
-        # Results treeview
-        tree_frame = tk.Frame(results_frame)
-        tree_frame.pack(fill="both", expand=True, pady=(5, 0))
-
-        self.tree = ttk.Treeview(tree_frame, show="headings")
+        # 🚀 Results grid (sanal kaydırma: sadece görünen satırlar Treeview'de)
+        self.results_grid = VirtualGrid(results_frame)
+        self.results_grid.pack(fill="both", expand=True, pady=(5, 0))
+        self.tree = self.results_grid.tree
 
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        h_scrollbar = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        v_scrollbar.grid(row=0, column=1, sticky="ns")
-        h_scrollbar.grid(row=1, column=0, sticky="ew")
-
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
+    def toggle_result_cache(self):
+        """Sonuç önbelleğini aç/kapat (kapatınca bellek boşaltılır)"""
+        executor = self.main.query_executor
+        executor.cache_enabled = self.cache_var.get()
+        if not executor.cache_enabled:
+            executor.result_cache.clear()
 
     def insert_query(self, query: str):
         """Sorgu metnini editöre ekle - AYNEN KALIYOR"""
@@ -180,8 +222,7 @@ class QueryTab:
     def clear_query(self):
         """Sorgu ve sonuçları temizle - AYNEN KALIYOR"""
         self.text_query.delete("1.0", tk.END)
-        for col in self.tree.get_children():
-            self.tree.delete(col)
+        self.results_grid.clear()
         self.current_results = None
         self.result_info_label.config(text="📊 Sonuçlar temizlendi")
         self.performance_label.config(text="")
@@ -202,39 +243,338 @@ class QueryTab:
             messagebox.showwarning(f"{ICONS['warning']} Uyarı", MESSAGES['no_db'])
             return
 
-        # 🚀 YENİ: Akıllı limit kontrolü
-        original_query = query
-        optimized_query, was_optimized = self.query_optimizer.add_limit_if_missing(
-            query,
-            limit=10000  # Maksimum 10,000 satır döndür
+        # 🚀 Plan tahmini (sorgu çalışmadan): normal / akış / ilk sayfa / tam tarama uyarısı
+        estimate = self.estimate_query(query, db_alias)
+        strategy = self.query_optimizer.choose_strategy(
+            estimate, DATA_LIMITS['stream_rows'], DATA_LIMITS['paginate_rows'])
+
+        if strategy == 'warn':
+            query = self._confirm_full_scan(query, estimate)
+            if query is None:
+                return
+        elif strategy == 'paginate':
+            query = self._offer_first_page(query, estimate)
+
+        # 🚀 Performans ölçümü başlat (işçi bitince durdurulur)
+        self._query_span = self.performance_monitor.span('query')
+
+        # Execute query (arka planda; büyük ama indeksli sonuçlar parça parça gelir)
+        stream = strategy == 'stream'
+        started, start_msg = self.query_worker.start(query, db_alias, timeout=self._get_timeout(),
+                                                     stream=stream)
+        if not started:
+            self._query_span.discard()
+            messagebox.showwarning(f"{ICONS['warning']} Uyarı", start_msg)
+            return
+
+        self._running_db_alias = db_alias
+        self._running_rows = 0
+        self._running_elapsed = 0.0
+        self.btn_run.config(state="disabled")
+        self.btn_cancel.config(state="normal", bg=COLORS['danger'])
+        self.result_info_label.config(text="⏳ Sorgu çalışıyor... 0 kayıt")
+        if stream:
+            self.main.update_status(
+                f"{ICONS['info']} Akış modu: tahmini {self._format_estimate(estimate)} | DB: {db_alias}",
+                COLORS['info'])
+        else:
+            self.main.update_status(f"{ICONS['info']} Sorgu çalıştırılıyor...", COLORS['warning'])
+
+        self.main.root.after(self.worker_poll_ms, self._poll_query_worker)
+
+    def estimate_query(self, query: str, db_alias: str):
+        """EXPLAIN QUERY PLAN + sqlite_stat1 tahmini (okuma sorgusu değilse None)"""
+        conn = self.main.db_manager.get_connection(db_alias)
+        if conn is None:
+            return None
+        return self.query_optimizer.estimate_query(
+            conn, query, self.main.db_manager.get_catalog(db_alias),
+            full_scan_rows=DATA_LIMITS['full_scan_rows'])
+
+    @staticmethod
+    def _format_estimate(estimate) -> str:
+        rows = estimate['estimated_rows']
+        return f"~{rows:,} satır" if rows is not None else "bilinmiyor"
+
+    def _confirm_full_scan(self, query: str, estimate):
+        """
+        Büyük tabloda tam tarama uyarısı
+        Returns: çalıştırılacak sorgu (LIMIT'li ya da orijinal), vazgeçilirse None
+        """
+        scans = "\n".join(
+            f"• {scan['table']} (~{scan['rows']:,} satır)"
+            for scan in estimate['scans']
+            if scan['rows'] is not None and scan['rows'] >= DATA_LIMITS['full_scan_rows'])
+        limit = DATA_LIMITS['max_result_rows']
+        response = messagebox.askyesnocancel(
+            "⚠️ Tam Tablo Taraması",
+            f"Sorgu şu tabloları baştan sona tarayacak:\n{scans}\n\n"
+            f"📊 Tahmini sonuç: {self._format_estimate(estimate)}\n\n"
+            f"EVET: İlk {limit:,} satırı getir (LIMIT)\n"
+            f"HAYIR: Olduğu gibi çalıştır\n"
+            f"İPTAL: Vazgeç\n\n"
+            f"💡 WHERE koşulundaki sütunlara indeks eklemeyi düşünün."
         )
+        if response is None:
+            return None
+        if response:
+            return self.query_optimizer.add_limit_if_missing(query, limit=limit)[0]
+        return query
+
+    def _offer_first_page(self, query: str, estimate) -> str:
+        """Çok büyük sonuçlarda LIMIT ile ilk sayfayı öner"""
+        limit = DATA_LIMITS['max_result_rows']
+        optimized_query, was_optimized = self.query_optimizer.add_limit_if_missing(query, limit=limit)
+        if not was_optimized:
+            return query
+
+        response = messagebox.askyesno(
+            "⚡ Otomatik Optimizasyon",
+            f"🎯 Tahmini sonuç: {self._format_estimate(estimate)}\n\n"
+            f"ÖNCEKİ:\n{query[:100]}...\n\n"
+            f"YENİ (ilk {limit:,} satır):\n{optimized_query[:100]}...\n\n"
+            f"💡 Büyük veri setlerinde performans için LIMIT önerilir.\n\n"
+            f"Optimize edilmiş sorguyu çalıştırmak ister misiniz?\n"
+            f"(HAYIR derseniz orijinal sorgu çalışır)"
+        )
+        return optimized_query if response else query
 
-        if was_optimized:
-            response = messagebox.askyesno(
-                "⚡ Otomatik Optimizasyon",
-                f"🎯 Sorgunuz optimize edildi!\n\n"
-                f"ÖNCEKİ:\n{original_query[:100]}...\n\n"
-                f"YENİ (LIMIT 10000 eklendi):\n{optimized_query[:100]}...\n\n"
-                f"💡 Büyük veri setlerinde performans için LIMIT önerilir.\n\n"
-                f"Optimize edilmiş sorguyu çalıştırmak ister misiniz?\n"
-                f"(HAYIR derseniz orijinal sorgu çalışır)"
-            )
+    def _current_statement(self) -> str:
+        """Seçili metin, yoksa imlecin bulunduğu ifade"""
+        try:
+            return self.text_query.get("sel.first", "sel.last").strip()
+        except tk.TclError:
+            text = self.text_query.get("1.0", "end-1c")
+            return statement_at(text, len(self.text_query.get("1.0", "insert")))
+
+    def show_query_plan(self):
+        """Geçerli ifadenin EXPLAIN QUERY PLAN ağacını göster (sorgu çalışmaz)"""
+        query = self._current_statement()
+        db_alias = self.query_db_var.get() or self.main.db_manager.active_db
+        if not query:
+            messagebox.showwarning(f"{ICONS['warning']} Uyarı", "Sorgu boş olamaz!")
+            return
+        conn = self.main.db_manager.get_connection(db_alias) if db_alias else None
+        if conn is None:
+            messagebox.showwarning(f"{ICONS['warning']} Uyarı", MESSAGES['no_db'])
+            return
+
+        success, estimate = self.query_optimizer.explain_query(
+            conn, query, self.main.db_manager.get_catalog(db_alias),
+            full_scan_rows=DATA_LIMITS['full_scan_rows'])
+        if not success:
+            messagebox.showerror(f"{ICONS['error']} Hata", estimate)
+            return
+        PlanViewer(self.main.root, query, estimate)
+
+    def advise_indexes(self):
+        """Sorgu geçmişinden indeks önerileri (adaylar SAVEPOINT içinde denenir)"""
+        db_alias = self.query_db_var.get() or self.main.db_manager.active_db
+        if not db_alias:
+            messagebox.showwarning(f"{ICONS['warning']} Uyarı", MESSAGES['no_db'])
+            return
+
+        def task(progress_callback, cancel_check):
+            return self.main.query_executor.advise_indexes(db_alias, progress_callback, cancel_check)
+
+        def on_done(success, outcome):
+            if not success:
+                messagebox.showwarning("💡 İndeks Önerileri", outcome)
+            elif not outcome:
+                messagebox.showinfo("💡 İndeks Önerileri",
+                                    "✅ Geçmişteki sorgular için faydalı yeni indeks bulunamadı.")
+            else:
+                self._show_index_advice(db_alias, outcome)
+
+        ProgressDialog(self.main.root, "💡 İndeks Önerileri",
+                       "Sorgu geçmişi yeniden planlanıyor...").run(task, on_done)
+
+    def _show_index_advice(self, db_alias: str, recommendations):
+        """Önerileri kazanca göre listele; SQL editöre aktarılabilir"""
+        window = tk.Toplevel(self.main.root)
+        window.title(f"💡 İndeks Önerileri - {db_alias}")
+        window.geometry("760x420")
+        window.transient(self.main.root)
+
+        text = tk.Text(window, font=FONTS['code'], wrap="word")
+        text.pack(fill="both", expand=True, padx=10, pady=10)
+        for rank, advice in enumerate(recommendations, 1):
+            kind = "kapsayan" if advice['covering'] else "birleşik" if len(advice['columns']) > 1 else "tek sütun"
+            text.insert(tk.END,
+                        f"-- {rank}. {advice['table']} ({kind}): tahmini maliyet "
+                        f"{advice['cost_before']:,.0f} → {advice['cost_after']:,.0f} satır, "
+                        f"{advice['used_by']} çalıştırmada kullanılır, "
+                        f"{advice['writes']} yazma bu indeksi de günceller\n"
+                        f"{advice['sql']}\n\n")
+        text.config(state="disabled")
+
+        def to_editor():
+            self.insert_query("\n".join(advice['sql'] for advice in recommendations))
+            window.destroy()
+
+        tk.Button(window, text="📝 Editöre Aktar", command=to_editor,
+                  bg=COLORS['success'], fg=COLORS['text_white'], padx=15).pack(pady=(0, 10))
+
+    def show_slowest_queries(self):
+        """Kalıcı geçmişten p95 süresine göre en yavaş sorgu kalıpları (çift tıkla editöre)"""
+        db_alias = self.query_db_var.get() or None
+        slowest = self.main.query_executor.get_slowest_queries(50, db_alias)
+        if not slowest:
+            messagebox.showinfo("🐢 En Yavaş Sorgular", "Geçmişte henüz başarılı sorgu yok.")
+            return
 
-            if response:
-                query = optimized_query
+        window = tk.Toplevel(self.main.root)
+        window.title(f"🐢 En Yavaş Sorgular{f' - {db_alias}' if db_alias else ''}")
+        window.geometry("900x420")
+        window.transient(self.main.root)
+
+        tree_frame = tk.Frame(window)
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        columns = ("count", "p50", "p95", "max", "database")
+        tree = ttk.Treeview(tree_frame, columns=columns)
+        tree.heading("#0", text="Sorgu (örnek)")
+        for column, title in zip(columns, ("Çalışma", "p50 (sn)", "p95 (sn)", "En uzun (sn)", "Veritabanı")):
+            tree.heading(column, text=title)
+            tree.column(column, width=80, anchor="e")
+        tree.column("#0", width=460)
+        tree.column("database", anchor="w")
+
+        scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+
+        for index, entry in enumerate(slowest):
+            tree.insert("", tk.END, iid=str(index), text=" ".join(entry['sample'].split())[:200],
+                        values=(entry['count'], f"{entry['p50']:.4f}", f"{entry['p95']:.4f}",
+                                f"{entry['max_time']:.4f}", entry['database'] or ""))
+
+        def to_editor(event=None):
+            selection = tree.selection()
+            if selection:
+                self.insert_query(slowest[int(selection[0])]['sample'])
+                window.destroy()
+
+        tree.bind("<Double-1>", to_editor)
+        tk.Label(window, text="💡 Çift tıklayınca sorgu editöre aktarılır",
+                 font=FONTS['small'], fg=COLORS['text_gray']).pack(pady=(0, 10))
+
+    def count_results(self):
+        """Kesin sonuç sayısı (yalnızca istenince: sorgu COUNT(*) ile çalıştırılır)"""
+        query = self.text_query.get("1.0", tk.END).strip()
+        db_alias = self.query_db_var.get() or self.main.db_manager.active_db
+        if not query or not db_alias:
+            return
 
-        # 🚀 Performans monitörü başlat
-        self.performance_monitor.start_timer()
+        estimate = self.estimate_query(query, db_alias)
+        if estimate is None:
+            messagebox.showinfo("🔢 Sonuç Boyutu", "Yalnızca tek bir okuma sorgusu sayılabilir.")
+            return
+        if not messagebox.askyesno(
+                "🔢 Sonuç Boyutu",
+                f"📊 Plan tahmini: {self._format_estimate(estimate)}"
+                f"{' (tam tarama)' if estimate['full_scan'] else ''}\n\n"
+                f"Kesin sayım sorguyu çalıştırır. Devam edilsin mi?"):
+            return
 
-        # Execute query
-        self.main.update_status(f"{ICONS['info']} Sorgu çalıştırılıyor...", COLORS['warning'])
+        pool = self.main.db_manager.get_pool(db_alias)
+
+        def task(progress_callback, cancel_check):
+            if pool is None:
+                return False, "Bu veritabanı için arka plan bağlantısı yok."
+            with pool.reader() as conn:
+                with ExecutionGuard(conn, on_vm_steps=cancel_check):
+                    count = self.query_optimizer.estimate_result_size(conn, query, exact=True)
+            if cancel_check():
+                return False, "⛔ Sayım iptal edildi"
+            if count is None:
+                return False, "❌ Sayım yapılamadı"
+            return True, count
+
+        def on_done(success, outcome):
+            if success:
+                messagebox.showinfo("🔢 Sonuç Boyutu", f"✅ Kesin sonuç: {outcome:,} satır")
+            else:
+                messagebox.showwarning("🔢 Sonuç Boyutu", outcome)
 
-        success, result, message = self.main.query_executor.execute(query, db_alias)
+        ProgressDialog(self.main.root, "🔢 Sonuç Boyutu", "Sonuç satırları sayılıyor...").run(task, on_done)
 
+    def _get_timeout(self) -> float:
+        """Seçili zaman aşımı (saniye); 'Yok' ya da geçersiz değer sınırsız (0)"""
+        try:
+            return max(0.0, float(self.timeout_var.get().replace(',', '.')))
+        except ValueError:
+            return 0.0
+
+    def cancel_query(self):
+        """Çalışan sorguyu iptal et
+
+        Buton 'cancelled'/'done' olayı gelene kadar aktif kalır; tekrar basılabilir.
+        """
+        if self.query_worker.cancel():
+            self.main.update_status(f"{ICONS['warning']} Sorgu iptal ediliyor...", COLORS['warning'])
+
+    def stop_running_query(self, alias=None, timeout: float = 5.0) -> bool:
+        """
+        Çalışan sorguyu iptal edip bitmesini bekle (pencere kapanışı / bağlantı kesme)
+        alias verilirse yalnızca o veritabanındaki sorgu durdurulur
+        Returns: durdurulabildi mi (ya da çalışan sorgu yok mu)
+        """
+        if not self.query_worker.is_running:
+            return True
+        if alias and self.query_worker.running_alias != alias:
+            return True
+        return self.query_worker.stop(timeout)
+
+    def _poll_query_worker(self):
+        """İşçi kuyruğunu Tk döngüsünden oku"""
+        finished = False
+        for event, payload in self.query_worker.poll():
+            if event in ('progress', 'heartbeat'):
+                if event == 'progress':
+                    self._running_rows = payload
+                else:
+                    self._running_elapsed = payload
+                self.result_info_label.config(
+                    text=f"⏳ Sorgu çalışıyor... {self._running_elapsed:.1f}s | "
+                         f"{self._running_rows:,} kayıt"
+                )
+            elif event == 'columns':
+                # 🚀 Akış: grid tampona bağlanır, parçalar geldikçe eklenir
+                self._stream_rows = []
+                self.results_grid.set_columns(payload)
+                self.results_grid.set_rows(self._stream_rows)
+            elif event == 'batch':
+                self.results_grid.append_rows(payload)
+                self.main.metrics.inc('app_rows_rendered_total', len(payload), tab='query')
+            elif event == 'cancelled':
+                finished = True
+                self._finish_worker_ui()
+                self._query_span.discard()
+                self.result_info_label.config(text=payload)
+                self.main.update_status(f"{ICONS['warning']} Sorgu iptal edildi", COLORS['warning'])
+            elif event == 'done':
+                finished = True
+                self._finish_worker_ui()
+                success, result, message = payload
+                self._on_query_finished(success, result, message, self._running_db_alias)
+
+        if not finished:
+            self.main.root.after(self.worker_poll_ms, self._poll_query_worker)
+
+    def _finish_worker_ui(self):
+        """Çalıştır/İptal butonlarını eski haline getir"""
+        self.btn_run.config(state="normal")
+        self.btn_cancel.config(state="disabled", bg=COLORS['dark'])
+
+    def _on_query_finished(self, success, result, message, db_alias):
+        """İşçi bittiğinde sonucu işle"""
         if success:
-            if result['type'] == 'select':
-                # 🚀 Performans metriğini kaydet
-                exec_time = self.performance_monitor.stop_timer('query_times')
+            # 🚀 Performans metriğini kaydet (başarısız sorgular histograma girmez)
+            exec_time = self._query_span.stop()
+            if result['type'] == 'stream':
+                self._on_stream_finished(result, db_alias)
+            elif result['type'] == 'select':
 
                 # Display results
                 self.display_results(result['rows'], result['columns'])
@@ -242,9 +582,9 @@ class QueryTab:
 
                 # 🚀 Büyük sonuç seti uyarısı
                 row_count = len(result['rows'])
-                if row_count >= 10000:
+                if row_count >= DATA_LIMITS['max_result_rows']:
                     warning_msg = (
-                        f"⚠️ Maksimum limit (10,000 satır) döndürüldü!\n\n"
+                        f"⚠️ Maksimum limit ({DATA_LIMITS['max_result_rows']:,} satır) döndürüldü!\n\n"
                         f"📊 Daha fazla sonuç olabilir.\n"
                         f"💡 WHERE veya daha spesifik filtreler kullanın."
                     )
@@ -260,9 +600,17 @@ class QueryTab:
                     text=f"✅ {row_count:,} kayıt | {len(result['columns'])} sütun | DB: {db_alias}"
                 )
 
-                self.performance_label.config(
-                    text=f"⚡ Sorgu: {exec_time:.3f}s"
-                )
+                if result.get('cached'):
+                    cache_stats = self.main.query_executor.result_cache.get_stats()
+                    self.performance_label.config(
+                        text=f"💾 Önbellekten: {exec_time:.3f}s | "
+                             f"İsabet: %{cache_stats['hit_rate']:.0f} ({cache_stats['size_mb']:.1f} MB)"
+                    )
+                else:
+                    self.performance_label.config(
+                        text=f"⚡ Sorgu: {exec_time:.3f}s | "
+                             f"{self.performance_monitor.format_percentiles('query')}"
+                    )
 
                 messagebox.showinfo(f"{ICONS['success']} Başarılı",
                                   f"{message}\n"
@@ -284,129 +632,60 @@ class QueryTab:
                 # Refresh other tabs
                 self.main.refresh_all()
         else:
+            self._query_span.discard()
             messagebox.showerror(f"{ICONS['error']} Hata",
                                f"{message}\n\n📊 DB: {db_alias}")
             self.main.update_status(f"{ICONS['error']} Sorgu hatası", COLORS['danger'])
             self.result_info_label.config(text="❌ Sorgu başarısız")
 
-    def display_results(self, rows, columns):
-        """Sorgu sonuçlarını göster - OPTİMİZE EDİLMİŞ"""
-        # 🚀 Performans monitörü başlat
-        self.performance_monitor.start_timer()
-
-        # Clear old data
-        for col in self.tree.get_children():
-            self.tree.delete(col)
-
-        # Update columns
-        self.tree["columns"] = columns
-        self.tree["show"] = "headings"
-
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=120, anchor="center")
-
-        # 🚀 YENİ: Progresif yükleme için chunk'lara böl
-        total_rows = len(rows)
-        chunk_size = 100  # Her seferde 100 satır ekle
-
-        if total_rows > 1000:
-            # Büyük veri seti - önce ilk chunk'ı yükle
-            first_chunk = rows[:chunk_size]
-            for i, row in enumerate(first_chunk):
-                tag = "even" if i % 2 == 0 else "odd"
-                self.tree.insert("", tk.END, values=row, tags=(tag,))
-
-            # Kullanıcıya bilgi ver
-            remaining = total_rows - chunk_size
-            if remaining > 0:
-                response = messagebox.askyesno(
-                    "📊 Büyük Sonuç Seti",
-                    f"✅ İlk {chunk_size} satır yüklendi\n"
-                    f"📊 Kalan: {remaining:,} satır\n\n"
-                    f"Tüm sonuçları yüklemek ister misiniz?\n"
-                    f"(Bu işlem zaman alabilir)"
-                )
-
-                if response:
-                    # Geri kalan satırları yükle (batch olarak)
-                    self._load_remaining_rows(rows[chunk_size:], chunk_size)
-        else:
-            # Normal yükleme
-            for i, row in enumerate(rows):
-                tag = "even" if i % 2 == 0 else "odd"
-                self.tree.insert("", tk.END, values=row, tags=(tag,))
+    def _on_stream_finished(self, result, db_alias):
+        """
+        Akış bitti: parçalar zaten grid'de; tampon current_results'a normal
+        select sonucu olarak yazılır (dışa aktarma vb. için)
+        """
+        rows = self._stream_rows
+        self.current_results = {
+            'type': 'select',
+            'rows': rows,
+            'columns': result['columns'],
+            'row_count': len(rows)
+        }
+        self.performance_monitor.record('fetch', result['total_time'] or 0.0)
+        self.result_info_label.config(
+            text=f"✅ {len(rows):,} kayıt | {len(result['columns'])} sütun | DB: {db_alias}"
+        )
+        self.performance_label.config(
+            text=f"⚡ İlk parça: {result['first_batch_time'] or 0:.3f}s | "
+                 f"Toplam: {result['total_time'] or 0:.3f}s | "
+                 f"{self.performance_monitor.format_percentiles('fetch')}"
+        )
+        self.main.update_status(
+            f"{ICONS['success']} {len(rows):,} kayıt getirildi (akış) | DB: {db_alias}",
+            COLORS['success']
+        )
 
-        # Configure row colors
-        self.tree.tag_configure("even", background=COLORS['tree_even'])
-        self.tree.tag_configure("odd", background=COLORS['tree_odd'])
+    def display_results(self, rows, columns):
+        """Sorgu sonuçlarını göster - OPTİMİZE EDİLMİŞ
 
-        # 🚀 Render süresini kaydet
-        render_time = self.performance_monitor.stop_timer('render_times')
+        Satırlar sanal grid'e tampon olarak verilir; kaç satır olursa olsun
+        Treeview'de yalnızca görünen pencere kadar öğe oluşturulur.
+        """
+        # 🚀 Render süresini ölç
+        with self.performance_monitor.span('render') as span:
+            self.results_grid.set_columns(columns)
+            self.results_grid.set_rows(rows)
+        self.main.metrics.inc('app_rows_rendered_total', len(rows), tab='query')
 
         # Performans istatistiklerini güncelle
         current_perf = self.performance_label.cget("text")
         if current_perf:
+            render_p95 = self.performance_monitor.get_percentiles('render')['p95']
             self.performance_label.config(
-                text=f"{current_perf} | Render: {render_time:.3f}s"
+                text=f"{current_perf} | Render: {span.elapsed:.3f}s (p95 {render_p95:.3f}s)"
             )
 
-    def _load_remaining_rows(self, remaining_rows, chunk_size):
-        """Geri kalan satırları batch olarak yükle"""
-        total = len(remaining_rows)
-        loaded = 0
-
-        # Progress dialog oluştur
-        progress_window = tk.Toplevel(self.main.root)
-        progress_window.title("Yükleniyor...")
-        progress_window.geometry("400x150")
-        progress_window.transient(self.main.root)
-        progress_window.grab_set()
-
-        tk.Label(progress_window, text="📊 Sonuçlar Yükleniyor...",
-                font=FONTS['title']).pack(pady=20)
-
-        progress_var = tk.DoubleVar()
-        progress_bar = ttk.Progressbar(progress_window, variable=progress_var,
-                                      maximum=100, length=350)
-        progress_bar.pack(pady=10)
-
-        status_label = tk.Label(progress_window, text="",
-                               font=FONTS['normal'])
-        status_label.pack(pady=10)
-
-        def load_batch():
-            nonlocal loaded
-
-            while loaded < total:
-                batch = remaining_rows[loaded:loaded + chunk_size]
-
-                for i, row in enumerate(batch):
-                    tree_index = loaded + chunk_size + i  # İlk chunk'tan sonra
-                    tag = "even" if tree_index % 2 == 0 else "odd"
-                    self.tree.insert("", tk.END, values=row, tags=(tag,))
-
-                loaded += len(batch)
-                progress = (loaded / total) * 100
-                progress_var.set(progress)
-                status_label.config(text=f"{loaded:,} / {total:,} satır yüklendi")
-
-                # UI'ı güncelle
-                progress_window.update()
-
-                # Küçük gecikme (UI'ın donmaması için)
-                if loaded % 500 == 0:
-                    self.main.root.update_idletasks()
-
-            progress_window.destroy()
-            messagebox.showinfo("✅ Tamamlandı",
-                              f"Tüm {total:,} satır başarıyla yüklendi!")
-
-        # Yüklemeyi başlat
-        self.main.root.after(100, load_batch)
-
     def export_results(self):
-        """Sorgu sonuçlarını Excel'e aktar - AYNEN KALIYOR"""
+        """Sorgu sonuçlarını Excel'e aktar (arka planda, akış halinde)"""
         if not self.current_results or not self.current_results.get('rows'):
             messagebox.showwarning(f"{ICONS['warning']} Uyarı", MESSAGES['no_data'])
             return
@@ -417,23 +696,32 @@ class QueryTab:
             defaultextension=".xlsx"
         )
 
-        if file_path:
-            self.main.update_status(f"{ICONS['info']} Excel aktarımı başlatılıyor...", COLORS['warning'])
-            success, message = ExcelHandler.export_to_excel(
-                self.current_results['rows'],
-                self.current_results['columns'],
-                file_path,
-                styled=True
-            )
+        if not file_path:
+            return
+
+        rows = self.current_results['rows']
+        columns = self.current_results['columns']
+
+        def task(progress_callback, cancel_check):
+            # write_only akış: bellek satır sayısından bağımsız
+            return ExcelHandler.export_to_excel(rows, columns, file_path, styled=True,
+                                                progress_callback=progress_callback,
+                                                cancel_check=cancel_check)
 
+        def on_done(success, message):
             if success:
                 messagebox.showinfo(f"{ICONS['success']} Başarılı",
-                                  f"{message}\n📈 {len(self.current_results['rows']):,} satır")
+                                  f"{message}\n📈 {len(rows):,} satır")
                 self.main.update_status(f"{ICONS['success']} Excel'e aktarıldı", COLORS['success'])
             else:
                 messagebox.showerror(f"{ICONS['error']} Hata", message)
                 self.main.update_status(f"{ICONS['error']} Excel aktarımı başarısız", COLORS['danger'])
 
+        self.main.update_status(f"{ICONS['info']} Excel aktarımı başlatılıyor...", COLORS['warning'])
+        dialog = ProgressDialog(self.main.root, "📤 Excel'e Aktarma",
+                                f"{len(rows):,} satır → {os.path.basename(file_path)}")
+        dialog.run(self.performance_monitor.timed_task('export', task), on_done)
+
     def save_query(self):
         """Sorguyu dosyaya kaydet - AYNEN KALIYOR"""
         query = self.text_query.get("1.0", tk.END).strip()
@@ -524,17 +812,8 @@ class QueryTab:
             self.main.update_status(f"{ICONS['error']} Excel okunamadı", COLORS['danger'])
 
     def _do_excel_import(self, file_path, sheet_name):
-        """Excel import işlemini gerçekleştir - AYNEN KALIYOR"""
+        """Excel import işlemini gerçekleştir (read_only akış, arka planda)"""
         try:
-            self.main.update_status(f"{ICONS['info']} Excel '{sheet_name}' içe aktarılıyor...", COLORS['warning'])
-            # Import Excel
-            success, df = ExcelHandler.import_excel(file_path, sheet_name)
-
-            if not success:
-                messagebox.showerror(f"{ICONS['error']} Hata", df)
-                self.main.update_status(f"{ICONS['error']} Excel içe aktarımı başarısız", COLORS['danger'])
-                return
-
             # Ask for table name
             table_name = simpledialog.askstring(
                 "Tablo Adı",
@@ -591,23 +870,51 @@ class QueryTab:
                 self.main.update_status(f"{ICONS['info']} Excel içe aktarma iptal edildi", COLORS['info'])
                 return
 
-            # Import to database
-            conn = self.main.db_manager.get_active_connection()
+            # 🚀 Satırlar parça parça, işçi bağlantısında yazılır; UI donmaz
+            alias = self.main.db_manager.active_db
             if_exists = result['mode']  # 'replace' or 'append'
-            df.to_sql(table_name, conn, if_exists=if_exists, index=False)
-
             mode_text = "değiştirildi" if if_exists == 'replace' else "altına eklendi"
 
-            messagebox.showinfo(f"{ICONS['success']} Başarılı",
-                              f"✅ Excel içe aktarıldı!\n\n"
-                              f"📄 Sayfa: {sheet_name}\n"
-                              f"📋 Tablo: {table_name}\n"
-                              f"📊 Satır: {len(df):,}\n"
-                              f"📊 Sütun: {len(df.columns)}\n"
-                              f"🔧 Mod: {mode_text.upper()}")
-            self.main.update_status(f"{ICONS['success']} Excel içe aktarıldı", COLORS['success'])
+            def task(progress_callback, cancel_check):
+                conn = self.main.db_manager.open_worker_connection(alias, profile='bulk-load')
+                if conn is None:
+                    return False, "Aktif veritabanı bağlantısı bulunamadı!"
+                try:
+                    return ExcelHandler.import_excel_to_table(
+                        conn, file_path, table_name, sheet_name=sheet_name, if_exists=if_exists,
+                        progress_callback=progress_callback, cancel_check=cancel_check)
+                finally:
+                    conn.close()
+
+            def on_done(success, summary):
+                if not success:
+                    messagebox.showerror(f"{ICONS['error']} Hata",
+                                       f"Excel içe aktarılamadı:\n{summary}")
+                    self.main.update_status(f"{ICONS['error']} Excel içe aktarımı başarısız", COLORS['danger'])
+                    return
+
+                observe_import(self.main.metrics, 'excel', summary)
+                if summary['cancelled']:
+                    messagebox.showwarning(f"{ICONS['warning']} İptal Edildi",
+                                         f"Excel içe aktarma iptal edildi.\n\n"
+                                         f"📊 Kaydedilen: {summary['rows']:,} satır")
+                    self.main.update_status(f"{ICONS['warning']} Excel içe aktarma iptal edildi", COLORS['warning'])
+                else:
+                    messagebox.showinfo(f"{ICONS['success']} Başarılı",
+                                      f"✅ Excel içe aktarıldı!\n\n"
+                                      f"📄 Sayfa: {sheet_name}\n"
+                                      f"📋 Tablo: {table_name}\n"
+                                      f"📊 Satır: {summary['rows']:,}\n"
+                                      f"📊 Sütun: {len(summary['columns'])}\n"
+                                      f"🔧 Mod: {mode_text.upper()}")
+                    self.main.update_status(f"{ICONS['success']} Excel içe aktarıldı", COLORS['success'])
 
-            self.main.refresh_all()
+                self.main.refresh_all()
+
+            self.main.update_status(f"{ICONS['info']} Excel '{sheet_name}' içe aktarılıyor...", COLORS['warning'])
+            dialog = ProgressDialog(self.main.root, "📥 Excel İçe Aktarma",
+                                    f"'{sheet_name}' → {table_name}")
+            dialog.run(self.performance_monitor.timed_task('import', task), on_done)
 
         except Exception as e:
             messagebox.showerror(f"{ICONS['error']} Hata",
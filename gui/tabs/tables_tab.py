@@ -7,6 +7,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 
 from config.settings import *
+from gui.widgets.virtual_grid import VirtualGrid
 
 
 class TablesTab:
@@ -108,26 +109,10 @@ class TablesTab:
         tk.Label(right_panel, text=f"👀 Veri Önizleme (İlk {DATA_LIMITS['preview_rows']} Kayıt):",
                 font=FONTS['subtitle']).pack(anchor="w", pady=(10, 5))
 
-        # Table data treeview
-        data_frame = tk.Frame(right_panel)
-        data_frame.pack(fill="both", expand=True)
-
-        self.table_data_tree = ttk.Treeview(data_frame, show="headings")
-
-        data_v_scroll = ttk.Scrollbar(data_frame, orient="vertical",
-                                     command=self.table_data_tree.yview)
-        data_h_scroll = ttk.Scrollbar(data_frame, orient="horizontal",
-                                     command=self.table_data_tree.xview)
-
-        self.table_data_tree.configure(yscrollcommand=data_v_scroll.set,
-                                       xscrollcommand=data_h_scroll.set)
-
-        self.table_data_tree.grid(row=0, column=0, sticky="nsew")
-        data_v_scroll.grid(row=0, column=1, sticky="ns")
-        data_h_scroll.grid(row=1, column=0, sticky="ew")
-
-        data_frame.grid_rowconfigure(0, weight=1)
-        data_frame.grid_columnconfigure(0, weight=1)
+        # Table data grid (sanal kaydırma)
+        self.table_data_grid = VirtualGrid(right_panel)
+        self.table_data_grid.pack(fill="both", expand=True)
+        self.table_data_tree = self.table_data_grid.tree
 
     def refresh(self, event=None):
         """Tablo listesini yenile"""
@@ -171,18 +156,20 @@ class TablesTab:
 
         if not db_alias:
             return
+        self.current_table = table_name
 
         try:
             # Get table structure
             columns_info = self.main.db_manager.get_table_info(table_name, db_alias)
 
-            # Get record count
-            record_count = self.main.db_manager.get_table_row_count(table_name, db_alias)
+            # 🚀 Kayıt sayısı: anlık tahmin, büyük tablolarda kesin sayım arka planda
+            record_count, approximate = self.main.db_manager.row_counts.get_count(table_name, db_alias)
+            count_text = f"{'~' if approximate else ''}{record_count:,}"
 
             # Display table info
             info_text = f"{ICONS['database']} Veritabanı: {db_alias}\n"
             info_text += f"{ICONS['table']} Tablo: {table_name}\n"
-            info_text += f"📊 Toplam Kayıt: {record_count:,}\n"
+            info_text += f"📊 Toplam Kayıt: {count_text}{' (tahmini)' if approximate else ''}\n"
             info_text += f"🔢 Sütun Sayısı: {len(columns_info)}\n\n"
             info_text += "📌 Sütun Detayları:\n"
             info_text += "-" * 60 + "\n"
@@ -194,11 +181,28 @@ class TablesTab:
                 default_val = f" (📝 Default: {col[4]})" if col[4] else ""
                 info_text += f"📋 {col[1]} - {col[2]}{primary_key}{not_null}{default_val}\n"
 
+            # İndeks ve foreign key bilgisi katalogdan (ek sorgu yok)
+            catalog = self.main.db_manager.get_catalog(db_alias)
+            indexes = catalog.indexes(table_name) if catalog else []
+            foreign_keys = catalog.foreign_keys(table_name) if catalog else []
+            if indexes:
+                info_text += "\n📇 İndeksler:\n"
+                for name, unique, origin, partial in indexes:
+                    flags = " (UNIQUE)" if unique else ""
+                    flags += " (kısmi)" if partial else ""
+                    info_text += f"   • {name}{flags}\n"
+            if foreign_keys:
+                info_text += "\n🔗 Foreign Key'ler:\n"
+                for _, _, ref_table, from_col, to_col, _, on_delete in foreign_keys:
+                    info_text += f"   • {from_col} → {ref_table}.{to_col or '?'} (ON DELETE {on_delete})\n"
+
             self.table_info_text.delete("1.0", tk.END)
             self.table_info_text.insert("1.0", info_text)
 
             # Update record count label
-            self.record_count_label.config(text=f"📊 Toplam: {record_count:,} kayıt")
+            self.record_count_label.config(text=f"📊 Toplam: {count_text} kayıt")
+            if approximate and self.main.db_manager.row_counts.refine(table_name, db_alias):
+                self.frame.after(300, self._poll_row_count, table_name, db_alias)
 
             # Load preview data
             preview_limit = DATA_LIMITS['preview_rows']
@@ -214,7 +218,7 @@ class TablesTab:
             if record_count > DATA_LIMITS['large_table_threshold']:
                 messagebox.showinfo(
                     f"{ICONS['warning']} Büyük Tablo",
-                    f"Bu tablo {record_count:,} kayıt içeriyor.\n"
+                    f"Bu tablo {count_text} kayıt içeriyor.\n"
                     f"Sadece ilk {preview_limit} kayıt gösteriliyor.\n\n"
                     f"Tüm veriyi görmek için SQL sorgusu kullanın."
                 )
@@ -223,28 +227,22 @@ class TablesTab:
             messagebox.showerror(f"{ICONS['error']} Hata",
                                f"Tablo verisi yüklenemedi:\n{str(e)}")
 
+    def _poll_row_count(self, table_name: str, db_alias: str):
+        """Arka plandaki kesin sayım bitince kayıt sayısı etiketini güncelle"""
+        if table_name != self.current_table or db_alias != self.tables_db_var.get():
+            return
+
+        row_counts = self.main.db_manager.row_counts
+        record_count, approximate = row_counts.get_count(table_name, db_alias)
+        if not approximate:
+            self.record_count_label.config(text=f"📊 Toplam: {record_count:,} kayıt")
+        elif row_counts.is_refining(table_name, db_alias):
+            self.frame.after(300, self._poll_row_count, table_name, db_alias)
+
     def display_preview(self, rows, columns):
         """Önizleme verilerini göster"""
-        # Clear old data
-        for col in self.table_data_tree.get_children():
-            self.table_data_tree.delete(col)
-
-        # Set columns
-        self.table_data_tree["columns"] = columns
-        self.table_data_tree["show"] = "headings"
-
-        for col in columns:
-            self.table_data_tree.heading(col, text=col)
-            self.table_data_tree.column(col, width=120, anchor="center")
-
-        # Add data with alternating colors
-        for i, row in enumerate(rows):
-            tag = "even" if i % 2 == 0 else "odd"
-            self.table_data_tree.insert("", tk.END, values=row, tags=(tag,))
-
-        # Configure row colors
-        self.table_data_tree.tag_configure("even", background=COLORS['tree_even'])
-        self.table_data_tree.tag_configure("odd", background=COLORS['tree_odd'])
+        self.table_data_grid.set_columns(columns)
+        self.table_data_grid.set_rows(list(rows))
 
     def delete_table(self):
         """Tabloyu sil"""
@@ -0,0 +1,111 @@
+"""
+Sorgu Planı Penceresi
+EXPLAIN QUERY PLAN ağacını ve sıcak noktaları (tam tarama, geçici B-ağacı, otomatik indeks) gösterir
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Dict, Optional
+
+from config.settings import COLORS, FONTS
+
+HOTSPOT_LABELS = {
+    'full_scan': "🔴 Tam tarama",
+    'temp_btree': "🟠 Geçici B-ağacı",
+    'automatic_index': "🟠 Otomatik indeks",
+}
+
+
+def _format_rows(rows: Optional[int]) -> str:
+    return f"~{rows:,}" if rows is not None else "?"
+
+
+def describe_hotspot(hotspot: Dict[str, Any]) -> str:
+    """Sıcak nokta için tek satırlık açıklama (tablo satır sayısıyla)"""
+    tables = ", ".join(f"{name} ({_format_rows(rows)} satır)" for name, rows in hotspot['tables'])
+    label = HOTSPOT_LABELS.get(hotspot['kind'], hotspot['kind'])
+    if hotspot['kind'] == 'full_scan':
+        hint = "WHERE/JOIN sütunlarına indeks eklenebilir"
+    elif hotspot['kind'] == 'temp_btree':
+        hint = f"{_format_rows(hotspot['rows'])} satır sıralanır; ORDER BY/GROUP BY sütunlarına indeks"
+    else:
+        hint = "SQLite her çalıştırmada geçici indeks kuruyor; kalıcı indeks eklenebilir"
+    return f"{label}: {tables or hotspot['detail']} - {hint}"
+
+
+class PlanViewer:
+    """
+    Plan ağacı penceresi
+
+    estimate: QueryOptimizer.explain_query() sonucu. Ağaçta her düğümün
+    tablosu, katalogdaki satır sayısı ve döngü başına tahmini satırı görünür;
+    sıcak noktalar renklendirilir ve alttaki listeden seçilince ağaçta bulunur.
+    """
+
+    def __init__(self, root: tk.Tk, query: str, estimate: Dict[str, Any]):
+        self.estimate = estimate
+
+        self.window = tk.Toplevel(root)
+        self.window.title("🧭 Sorgu Planı")
+        self.window.geometry("820x520")
+        self.window.transient(root)
+
+        summary = f"📊 Tahmini sonuç: {_format_rows(estimate['estimated_rows'])} satır"
+        if estimate['hotspots']:
+            summary += f"  |  ⚠️ {len(estimate['hotspots'])} sıcak nokta"
+        tk.Label(self.window, text=summary, font=FONTS['subtitle']).pack(anchor="w", padx=10, pady=(10, 2))
+        tk.Label(self.window, text=" ".join(query.split())[:150], font=FONTS['small'],
+                 fg=COLORS['text_gray']).pack(anchor="w", padx=10)
+
+        tree_frame = tk.Frame(self.window)
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.tree = ttk.Treeview(tree_frame, columns=("table", "table_rows", "rows"))
+        self.tree.heading("#0", text="Adım")
+        self.tree.heading("table", text="Tablo")
+        self.tree.heading("table_rows", text="Tablo satırı")
+        self.tree.heading("rows", text="Tahmini satır")
+        self.tree.column("#0", width=440)
+        self.tree.column("table", width=140)
+        self.tree.column("table_rows", width=100, anchor="e")
+        self.tree.column("rows", width=100, anchor="e")
+        self.tree.tag_configure("full_scan", background=COLORS['tree_deleted'])
+        self.tree.tag_configure("temp_btree", background=COLORS['tree_changed'])
+        self.tree.tag_configure("automatic_index", background=COLORS['tree_changed'])
+
+        scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+
+        self._populate()
+
+        tk.Label(self.window, text="🔥 Sıcak Noktalar:", font=FONTS['subtitle']).pack(anchor="w", padx=10)
+        self.hotspot_list = tk.Listbox(self.window, height=5, font=FONTS['small'])
+        self.hotspot_list.pack(fill="x", padx=10, pady=(0, 10))
+        for hotspot in estimate['hotspots']:
+            self.hotspot_list.insert(tk.END, describe_hotspot(hotspot))
+        if not estimate['hotspots']:
+            self.hotspot_list.insert(tk.END, "✅ Büyük tabloda tam tarama, geçici B-ağacı ya da otomatik indeks yok")
+        self.hotspot_list.bind("<<ListboxSelect>>", self._on_hotspot_selected)
+
+    def _populate(self):
+        """Düğümleri parent id'ye göre ağaca yerleştir"""
+        kinds = {hotspot['id']: hotspot['kind'] for hotspot in self.estimate['hotspots']}
+        for node in self.estimate['plan']:
+            parent = str(node['parent']) if self.tree.exists(str(node['parent'])) else ""
+            table = node.get('table') if node['op'] else ""
+            table_rows = _format_rows(node.get('table_rows')) if node['op'] else ""
+            rows = _format_rows(node['rows']) if node.get('rows') is not None else ""
+            kind = kinds.get(node['id'])
+            self.tree.insert(parent, tk.END, iid=str(node['id']), text=node['detail'], open=True,
+                             values=(table, table_rows, rows), tags=(kind,) if kind else ())
+
+    def _on_hotspot_selected(self, event=None):
+        selection = self.hotspot_list.curselection()
+        if not selection or selection[0] >= len(self.estimate['hotspots']):
+            return
+        iid = str(self.estimate['hotspots'][selection[0]]['id'])
+        if self.tree.exists(iid):
+            self.tree.selection_set(iid)
+            self.tree.see(iid)
@@ -0,0 +1,102 @@
+"""
+İlerleme Penceresi
+Uzun süren içe/dışa aktarma işlerini arka planda çalıştırıp ilerlemesini gösterir
+"""
+
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Optional, Tuple
+
+from config.settings import COLORS, FONTS
+
+
+class ProgressDialog:
+    """
+    Arka plan işi için ilerleme çubuğu ve iptal butonu
+
+    task(progress_callback, cancel_check) ayrı bir thread'de çalışır ve
+    (başarılı_mı, sonuç) döndürür. progress_callback(satır, oran) thread'den
+    çağrılır; olaylar kuyruğa yazılıp root.after ile UI thread'inde işlenir.
+    Bittiğinde on_done(başarılı_mı, sonuç) UI thread'inde çağrılır.
+    """
+
+    POLL_MS = 100
+
+    def __init__(self, root: tk.Tk, title: str, message: str):
+        self.root = root
+        self.events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._cancelled = threading.Event()
+        self._on_done: Optional[Callable[[bool, Any], None]] = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title(title)
+        self.window.geometry("420x170")
+        self.window.resizable(False, False)
+        self.window.transient(root)
+        self.window.grab_set()
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        tk.Label(self.window, text=message, font=FONTS['subtitle'],
+                 wraplength=380).pack(pady=(15, 10))
+
+        self.progress = ttk.Progressbar(self.window, mode="determinate", maximum=100, length=380)
+        self.progress.pack(padx=20)
+
+        self.status_label = tk.Label(self.window, text="⏳ Başlatılıyor...", font=FONTS['normal'])
+        self.status_label.pack(pady=8)
+
+        self.btn_cancel = tk.Button(self.window, text="⛔ İptal", command=self.cancel,
+                                    bg=COLORS['danger'], fg=COLORS['text_white'],
+                                    font=FONTS['normal'], padx=15)
+        self.btn_cancel.pack()
+
+    def run(self, task: Callable[[Callable[[int, float], None], Callable[[], bool]], Tuple[bool, Any]],
+            on_done: Callable[[bool, Any], None]):
+        """İşi başlat"""
+        self._on_done = on_done
+        threading.Thread(target=self._run, args=(task,), daemon=True).start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        """İptal iste; iş bir sonraki parçada durur"""
+        self._cancelled.set()
+        self.btn_cancel.config(state="disabled")
+        self.status_label.config(text="⛔ İptal ediliyor...")
+
+    def _run(self, task):
+        def on_progress(rows: int, fraction: float):
+            self.events.put(('progress', (rows, fraction)))
+
+        try:
+            outcome = task(on_progress, self._cancelled.is_set)
+        except Exception as e:
+            outcome = (False, f"❌ Beklenmeyen Hata: {str(e)}")
+        self.events.put(('done', outcome))
+
+    def _poll(self):
+        finished = None
+        latest = None
+        while True:
+            try:
+                event, data = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event == 'progress':
+                latest = data
+            else:
+                finished = data
+
+        if latest is not None and not self._cancelled.is_set():
+            rows, fraction = latest
+            self.progress['value'] = fraction * 100
+            self.status_label.config(text=f"📊 {rows:,} satır  |  %{fraction * 100:.0f}")
+
+        if finished is None:
+            self.root.after(self.POLL_MS, self._poll)
+            return
+
+        self.window.grab_release()
+        self.window.destroy()
+        self._on_done(*finished)
@@ -8,6 +8,10 @@ from tkinter import ttk, filedialog, simpledialog, messagebox
 import os
 
 from config.settings import *
+from gui.widgets.progress_dialog import ProgressDialog
+from utils.csv_handler import CSVHandler
+from utils.excel_handler import ExcelHandler
+from utils.metrics import observe_import
 
 
 class Toolbar:
@@ -58,6 +62,22 @@ class Toolbar:
         self.active_db_combo.pack(side="left", padx=(5, 0))
         self.active_db_combo.bind('<<ComboboxSelected>>', self.change_active_db)
 
+        # 🚀 Bağlantı profili (PRAGMA ayarları)
+        tk.Label(active_db_frame, text="Profil:",
+                bg=COLORS['bg_dark'], fg=COLORS['text_white'],
+                font=FONTS['small']).pack(side="left", padx=(10, 0))
+
+        self.profile_names = list(CONNECTION_PROFILES.keys())
+        self.profile_var = tk.StringVar()
+        self.profile_combo = ttk.Combobox(active_db_frame,
+                                          textvariable=self.profile_var,
+                                          values=[CONNECTION_PROFILES[name]['label']
+                                                  for name in self.profile_names],
+                                          width=18, state="readonly",
+                                          font=FONTS['small'])
+        self.profile_combo.pack(side="left", padx=(5, 0))
+        self.profile_combo.bind('<<ComboboxSelected>>', self.change_profile)
+
         # File operations section
         file_section = tk.Frame(self.frame, bg=COLORS['bg_dark'])
         file_section.pack(side="left", padx=20, pady=10)
@@ -168,6 +188,10 @@ class Toolbar:
                                             f"'{alias}' zaten bağlı. Yeniden bağlanmak istiyor musunuz?")
                 if not replace:
                     return
+                if not self.main.query_tab.stop_running_query(alias):
+                    messagebox.showwarning(f"{ICONS['warning']} Uyarı",
+                                           f"'{alias}' üzerinde çalışan sorgu durdurulamadı!")
+                    return
 
             success, message = self.main.db_manager.open_database(db_path, alias, replace)
 
@@ -215,6 +239,22 @@ class Toolbar:
             self.update_info()
             self.main.refresh_all()
 
+    def change_profile(self, event=None):
+        """Aktif veritabanının bağlantı profilini değiştir"""
+        alias = self.main.db_manager.active_db
+        if not alias:
+            messagebox.showwarning(f"{ICONS['warning']} Uyarı", MESSAGES['no_db'])
+            self.profile_var.set("")
+            return
+
+        profile = self.profile_names[self.profile_combo.current()]
+        success, message = self.main.db_manager.set_connection_profile(alias, profile)
+        if success:
+            self.main.update_status(f"{ICONS['success']} {message}", COLORS['success'])
+        else:
+            messagebox.showerror(f"{ICONS['error']} Hata", message)
+        self.update_info()
+
     # File operations
     def import_csv(self):
         """CSV import"""
@@ -222,8 +262,72 @@ class Toolbar:
             messagebox.showwarning(f"{ICONS['warning']} Uyarı", MESSAGES['no_db'])
             return
 
-        messagebox.showinfo(f"{ICONS['info']} Geliştirme",
-                          "CSV import özelliği 'SQL Sorguları' sekmesinde mevcuttur.")
+        file_path = filedialog.askopenfilename(
+            title="CSV Dosyası Seçin",
+            filetypes=FILE_TYPES['csv']
+        )
+        if not file_path:
+            return
+
+        table_name = simpledialog.askstring(
+            "Tablo Adı", "CSV için tablo adı girin:",
+            initialvalue=os.path.splitext(os.path.basename(file_path))[0].replace(" ", "_").lower()
+        )
+        if not table_name:
+            return
+
+        alias = self.main.db_manager.active_db
+        if_exists = 'append'
+        if table_name in self.main.db_manager.get_tables(alias):
+            answer = messagebox.askyesnocancel(
+                f"{ICONS['warning']} Tablo Mevcut",
+                f"'{table_name}' tablosu zaten var.\n\n"
+                f"Evet: 🔄 Tabloyu değiştir (eski veri silinir)\n"
+                f"Hayır: ➕ Altına ekle"
+            )
+            if answer is None:
+                return
+            if_exists = 'replace' if answer else 'append'
+
+        def task(progress_callback, cancel_check):
+            # İçe aktarma kendi bağlantısında çalışır; UI bağlantısı serbest kalır
+            conn = self.main.db_manager.open_worker_connection(alias, profile='bulk-load')
+            if conn is None:
+                return False, "Aktif veritabanı bağlantısı bulunamadı!"
+            try:
+                return CSVHandler.import_csv_to_table(
+                    conn, file_path, table_name, if_exists=if_exists,
+                    progress_callback=progress_callback, cancel_check=cancel_check)
+            finally:
+                conn.close()
+
+        def on_done(success, result):
+            if not success:
+                messagebox.showerror(f"{ICONS['error']} Hata", result)
+                self.main.update_status(f"{ICONS['error']} CSV içe aktarımı başarısız", COLORS['danger'])
+                return
+
+            observe_import(self.main.metrics, 'csv', result)
+            if result['cancelled']:
+                messagebox.showwarning(f"{ICONS['warning']} İptal Edildi",
+                                       f"CSV içe aktarma iptal edildi.\n\n"
+                                       f"📊 Kaydedilen: {result['rows']:,} satır")
+                self.main.update_status(f"{ICONS['warning']} CSV içe aktarma iptal edildi", COLORS['warning'])
+            else:
+                messagebox.showinfo(f"{ICONS['success']} Başarılı",
+                                    f"✅ CSV içe aktarıldı!\n\n"
+                                    f"📋 Tablo: {table_name}\n"
+                                    f"📊 Satır: {result['rows']:,}\n"
+                                    f"📊 Sütun: {len(result['columns'])}")
+                self.main.update_status(f"{ICONS['success']} CSV içe aktarıldı", COLORS['success'])
+
+            self.update_info()
+            self.main.refresh_all()
+
+        self.main.update_status(f"{ICONS['info']} CSV içe aktarılıyor...", COLORS['warning'])
+        dialog = ProgressDialog(self.main.root, "📥 CSV İçe Aktarma",
+                                f"'{os.path.basename(file_path)}' → {table_name}")
+        dialog.run(self.main.performance_monitor.timed_task('import', task), on_done)
 
     def import_excel(self):
         """Excel import"""
@@ -231,13 +335,99 @@ class Toolbar:
             messagebox.showwarning(f"{ICONS['warning']} Uyarı", MESSAGES['no_db'])
             return
 
-        messagebox.showinfo(f"{ICONS['info']} Geliştirme",
-                          "Excel import özelliği 'SQL Sorguları' sekmesinde mevcuttur.")
+        # Akışlı (read_only) içe aktarma SQL sekmesindeki akışla aynı
+        self.main.query_tab.import_excel()
 
     def export_data(self):
-        """Veri dışa aktar"""
-        messagebox.showinfo(f"{ICONS['info']} Geliştirme",
-                          "Export özelliği 'SQL Sorguları' sekmesinde mevcuttur.")
+        """Tabloyu Excel/CSV'ye dışa aktar (havuzdan alınan okuyucu ile arka planda)"""
+        alias = self.main.db_manager.active_db
+        if not alias:
+            messagebox.showwarning(f"{ICONS['warning']} Uyarı", MESSAGES['no_db'])
+            return
+
+        tables = self.main.db_manager.get_tables(alias)
+        if not tables:
+            messagebox.showwarning(f"{ICONS['warning']} Uyarı", "Dışa aktarılacak tablo yok!")
+            return
+
+        table_name = simpledialog.askstring(
+            "Tablo Adı", f"Dışa aktarılacak tablo:\n({', '.join(tables[:10])}"
+                         f"{'...' if len(tables) > 10 else ''})",
+            initialvalue=tables[0]
+        )
+        if not table_name:
+            return
+        if table_name not in tables:
+            messagebox.showerror(f"{ICONS['error']} Hata", f"'{table_name}' tablosu bulunamadı!")
+            return
+
+        file_path = filedialog.asksaveasfilename(
+            title="Dışa Aktar",
+            defaultextension=".xlsx",
+            initialfile=f"{table_name}.xlsx",
+            filetypes=FILE_TYPES['excel'] + FILE_TYPES['csv']
+        )
+        if not file_path:
+            return
+
+        pool = self.main.db_manager.get_pool(alias)
+
+        def task(progress_callback, cancel_check):
+            # Okuma havuzdaki salt okunur bağlantıda; UI bağlantısı ve imleçleri paylaşılmaz
+            if pool is None:
+                conn = self.main.db_manager.open_worker_connection(alias)
+                if conn is None:
+                    return False, "Aktif veritabanı bağlantısı bulunamadı!"
+                try:
+                    return self._export_table(conn, table_name, file_path,
+                                              progress_callback, cancel_check)
+                finally:
+                    conn.close()
+
+            with pool.reader() as conn:
+                return self._export_table(conn, table_name, file_path,
+                                          progress_callback, cancel_check)
+
+        def on_done(success, result):
+            if success:
+                messagebox.showinfo(f"{ICONS['success']} Başarılı", result)
+                self.main.update_status(f"{ICONS['success']} {result}", COLORS['success'])
+            else:
+                messagebox.showerror(f"{ICONS['error']} Hata", result)
+                self.main.update_status(f"{ICONS['error']} Dışa aktarma başarısız", COLORS['danger'])
+
+        self.main.update_status(f"{ICONS['info']} Dışa aktarılıyor...", COLORS['warning'])
+        dialog = ProgressDialog(self.main.root, "📤 Dışa Aktarma",
+                                f"{table_name} → '{os.path.basename(file_path)}'")
+        dialog.run(self.main.performance_monitor.timed_task('export', task), on_done)
+
+    @staticmethod
+    def _export_table(conn, table_name, file_path, progress_callback, cancel_check):
+        """Tabloyu fetchmany ile akıtarak dosyaya yaz (arka plan thread'inde çalışır)"""
+        total = conn.execute(f"SELECT COUNT(*) FROM `{table_name}`").fetchone()[0]
+        cursor = conn.execute(f"SELECT * FROM `{table_name}`")
+        columns = [desc[0] for desc in cursor.description]
+
+        if file_path.lower().endswith(('.xlsx', '.xls')):
+            batches = iter(lambda: cursor.fetchmany(1000), [])
+            return ExcelHandler.export_stream(batches, columns, file_path, sheet_name=table_name,
+                                              total_rows=total, progress_callback=progress_callback,
+                                              cancel_check=cancel_check)
+
+        written = [0]
+
+        def rows():
+            for batch in iter(lambda: cursor.fetchmany(1000), []):
+                if cancel_check():
+                    return
+                yield from batch
+                written[0] += len(batch)
+                progress_callback(written[0], written[0] / total if total else 1.0)
+
+        success, message = CSVHandler.export_to_csv(rows(), columns, file_path)
+        if success and cancel_check():
+            return False, f"Dışa aktarma iptal edildi ({written[0]:,} satır yazıldı)"
+        return success, message
 
     def update_info(self):
         """Veritabanı bilgilerini güncelle"""
@@ -269,9 +459,10 @@ class Toolbar:
 
                 table_count = info.get('table_count', '?')
                 filename = info.get('filename', os.path.basename(info.get('path', '')))
+                profile = CONNECTION_PROFILES.get(info.get('profile'), {}).get('label', '?')
                 info_text = (
                     f"{is_active} {alias}: {filename or info.get('path', 'Bilinmiyor')}"
-                    f" ({size_str}, {table_count} tablo)"
+                    f" ({size_str}, {table_count} tablo, {profile})"
                 )
 
                 if info.get('error'):
@@ -299,5 +490,9 @@ class Toolbar:
 
         if self.main.db_manager.active_db:
             self.active_db_combo.set(self.main.db_manager.active_db)
+            active_info = self.main.db_manager.connections[self.main.db_manager.active_db]
+            profile = active_info.get('profile', DEFAULT_CONNECTION_PROFILE)
+            self.profile_var.set(CONNECTION_PROFILES[profile]['label'])
         elif not db_list:
-            self.active_db_combo.set("")
\ No newline at end of file
+            self.active_db_combo.set("")
+            self.profile_var.set("")
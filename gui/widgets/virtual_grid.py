@@ -0,0 +1,248 @@
+"""
+Sanal Tablo Widget
+Sadece görünen satırları Treeview öğesi olarak tutan (virtual scrolling) grid
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.settings import COLORS, TREEVIEW_SETTINGS
+
+
+class VirtualGrid(tk.Frame):
+    """Sanal kaydırmalı Treeview
+
+    Treeview'de yalnızca pencereye sığan kadar öğe bulunur; kaydırıldıkça
+    aynı öğelerin değerleri güncellenir (recycle). Veri bellekteki satır
+    listesinden (tampon) okunur: set_rows() listeyi kopyalamadan bağlar,
+    append_rows() akış parçalarını ekler.
+    Satırlar dışarıya her zaman veri indeksiyle (0..total-1) anlatılır,
+    Treeview öğe id'leri kaydırmada değiştiği için kullanılmamalıdır.
+    """
+
+    def __init__(self, parent, row_height: int = TREEVIEW_SETTINGS['row_height'], **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.row_height = row_height
+
+        self.columns: List[str] = []
+        self.total_rows = 0
+        self.top = 0
+        self.visible_rows = 20
+
+        self._rows: Optional[List] = None
+        self._row_tags: Dict[int, Tuple[str, ...]] = {}
+        self._selected: set = set()
+        self._items: List[str] = []
+        self._rendering = False
+
+        self.tree = ttk.Treeview(self, show="headings", selectmode="extended")
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.hsb = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.hsb.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        self.hsb.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.tree.tag_configure("even", background=COLORS['tree_even'])
+        self.tree.tag_configure("odd", background=COLORS['tree_odd'])
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._move_focus(-1))
+        self.tree.bind("<Down>", lambda e: self._move_focus(1))
+        self.tree.bind("<Prior>", lambda e: self._move_focus(-self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self._move_focus(self.visible_rows))
+        self.tree.bind("<Control-Home>", lambda e: self._move_focus(-self.total_rows))
+        self.tree.bind("<Control-End>", lambda e: self._move_focus(self.total_rows))
+
+    # ---------- Veri kaynağı
+    def set_columns(self, columns: Sequence[str], widths: Optional[Dict[str, int]] = None,
+                    headings: Optional[Dict[str, str]] = None):
+        """Sütunları ayarla"""
+        self.columns = list(columns)
+        self.tree["columns"] = self.columns
+        for col in self.columns:
+            self.tree.heading(col, text=(headings or {}).get(col, col))
+            width = (widths or {}).get(col, TREEVIEW_SETTINGS['column_width'])
+            self.tree.column(col, width=width, anchor="center")
+
+    def set_rows(self, rows: List):
+        """Bellekteki satır listesini göster (liste kopyalanmaz)"""
+        self._reset_data()
+        self._rows = rows
+        self.total_rows = len(rows)
+        self._refresh()
+
+    def append_rows(self, rows: Sequence):
+        """Tampona satır ekle (akış sonuçları için)"""
+        if self._rows is None:
+            self._reset_data()
+            self._rows = []
+        self._rows.extend(rows)
+        self.total_rows = len(self._rows)
+        self._refresh()
+
+    def clear(self):
+        """Tüm veriyi ve öğeleri temizle"""
+        self._reset_data()
+        self.total_rows = 0
+        self._refresh()
+
+    def _reset_data(self):
+        self._rows = None
+        self._row_tags.clear()
+        self._selected.clear()
+        self.top = 0
+
+    def row_values(self, index: int) -> tuple:
+        """Veri indeksindeki satırı getir"""
+        if self._rows is not None:
+            return tuple(self._rows[index])
+        return ()
+
+    def update_row(self, index: int, values: Sequence):
+        """Satır değerlerini değiştir (düzenleme sonrası)"""
+        if self._rows is not None:
+            self._rows[index] = tuple(values)
+        self._render()
+
+    def set_row_tags(self, index: int, tags: Optional[Tuple[str, ...]]):
+        """Satıra özel tag ver (None: zebra rengine dön)"""
+        if tags:
+            self._row_tags[index] = tuple(tags)
+        else:
+            self._row_tags.pop(index, None)
+        self._render()
+
+    def tag_configure(self, tag: str, **options):
+        self.tree.tag_configure(tag, **options)
+
+    # ---------- Seçim / konum
+    def selected_indices(self) -> List[int]:
+        """Seçili satırların veri indeksleri"""
+        return sorted(self._selected)
+
+    def identify_cell(self, event) -> Tuple[Optional[int], Optional[int]]:
+        """Olay konumundan (veri indeksi, sütun indeksi) bul"""
+        item = self.tree.identify_row(event.y)
+        column = self.tree.identify_column(event.x)
+        if not item or item not in self._items or not column:
+            return None, None
+        return self.top + self._items.index(item), int(column.replace('#', '')) - 1
+
+    def scroll_to(self, index: int):
+        """Satır görünür olacak şekilde kaydır"""
+        if index < self.top:
+            self._set_top(index)
+        elif index >= self.top + self.visible_rows:
+            self._set_top(index - self.visible_rows + 1)
+
+    # ---------- Kaydırma
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._set_top(int(float(args[1]) * self.total_rows))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_rows
+            self._scroll_by(amount)
+
+    def _on_mousewheel(self, event):
+        # Windows: 120'nin katları, macOS: küçük delta
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self._scroll_by(-3 * delta)
+        return "break"
+
+    def _scroll_by(self, amount: int):
+        self._set_top(self.top + amount)
+        return "break"
+
+    def _move_focus(self, amount: int):
+        """Klavye ile gezinme; pencere dışına çıkınca kaydır"""
+        if not self.total_rows:
+            return "break"
+        focus = self.tree.focus()
+        current = self.top + self._items.index(focus) if focus in self._items else self.top
+        target = max(0, min(self.total_rows - 1, current + amount))
+        self._selected = {target}
+        self.scroll_to(target)
+        self._render()
+        self.tree.focus(self._items[target - self.top])
+        self.tree.event_generate("<<TreeviewSelect>>")
+        return "break"
+
+    def _set_top(self, top: int):
+        max_top = max(0, self.total_rows - self.visible_rows)
+        top = max(0, min(top, max_top))
+        if top != self.top:
+            self.top = top
+            self._render()
+
+    def _on_resize(self, event):
+        heading = self.row_height  # Başlık yüksekliği yaklaşık bir satır
+        if self._items:
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                heading, self.row_height = bbox[1], bbox[3]
+        rows = max(1, (event.height - heading) // max(1, self.row_height))
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self._refresh()
+
+    def _on_click(self, event):
+        # Shift/Ctrl olmadan tıklama: pencere dışındaki eski seçimleri de bırak
+        if not event.state & 0x0005:
+            self._selected.clear()
+
+    def _on_select(self, event=None):
+        # <<TreeviewSelect>> kuyruğa alınır; yalnızca pencere içindeki seçimi güncelle
+        if self._rendering:
+            return
+        window_end = self.top + len(self._items)
+        outside = {index for index in self._selected if not self.top <= index < window_end}
+        inside = {self.top + self._items.index(item)
+                  for item in self.tree.selection() if item in self._items}
+        self._selected = outside | inside
+
+    # ---------- Çizim
+    def _refresh(self):
+        """Toplam satır / pencere değişti: konumu sınırla ve yeniden çiz"""
+        self.top = max(0, min(self.top, max(0, self.total_rows - self.visible_rows)))
+        self._render()
+
+    def _render(self):
+        """Penceredeki öğeleri güncelle (öğeler yeniden kullanılır)"""
+        self._rendering = True
+        try:
+            count = max(0, min(self.visible_rows, self.total_rows - self.top))
+
+            while len(self._items) < count:
+                self._items.append(self.tree.insert("", tk.END, values=()))
+            while len(self._items) > count:
+                self.tree.delete(self._items.pop())
+
+            selection = []
+            for offset, item in enumerate(self._items):
+                index = self.top + offset
+                tags = self._row_tags.get(index) or ("even" if index % 2 == 0 else "odd",)
+                self.tree.item(item, values=self.row_values(index), tags=tags)
+                if index in self._selected:
+                    selection.append(item)
+            self.tree.selection_set(selection)
+
+            if self.total_rows:
+                self.vsb.set(self.top / self.total_rows,
+                             min(1.0, (self.top + count) / self.total_rows))
+            else:
+                self.vsb.set(0.0, 1.0)
+        finally:
+            self._rendering = False
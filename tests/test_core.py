@@ -1,9 +1,16 @@
 import os
+import sqlite3
 import tempfile
+import threading
 import unittest
 
+from core.change_set_writer import ChangeSetWriter
 from core.database_manager import DatabaseManager
+from core.execution_guard import ExecutionGuard
+from core.history_store import HistoryStore
+from core.index_advisor import IndexAdvisor
 from core.query_executor import QueryExecutor
+from core.query_worker import QueryWorker
 
 
 class DatabaseManagerTests(unittest.TestCase):
@@ -34,6 +41,348 @@ class DatabaseManagerTests(unittest.TestCase):
         infos = self.manager.get_all_database_info()
         self.assertTrue(any(info["alias"] == "info_db" for info in infos))
 
+    def test_connection_profile_applied_and_switchable(self):
+        self.manager.create_database(self.db_path, "p_db")
+        conn = self.manager.get_connection("p_db")
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -65536)
+
+        success, _ = self.manager.set_connection_profile("p_db", "read-only analytics")
+        self.assertTrue(success)
+        self.assertEqual(self.manager.connections["p_db"]["profile"], "read-only analytics")
+        self.assertFalse(self.manager.execute_query("CREATE TABLE t (x)")[0])
+
+        worker = self.manager.open_worker_connection("p_db", profile="bulk-load")
+        self.assertEqual(worker.execute("PRAGMA synchronous").fetchone()[0], 0)
+        worker.close()
+
+        success, _ = self.manager.set_connection_profile("p_db", "missing")
+        self.assertFalse(success)
+
+    def test_table_version_tracks_own_and_external_writes(self):
+        self.manager.create_database(self.db_path, "v_db")
+        self.manager.execute_query("CREATE TABLE a (x)")
+        self.manager.execute_query("CREATE TABLE b (x)")
+
+        before_a = self.manager.get_table_version("a")
+        before_b = self.manager.get_table_version("b")
+        self.manager.mark_table_changed("a")
+        self.assertNotEqual(self.manager.get_table_version("a"), before_a)
+        self.assertEqual(self.manager.get_table_version("b"), before_b)
+
+        # Başka bağlantının yazması data_version ile fark edilir
+        other = self.manager.open_worker_connection("v_db")
+        other.execute("INSERT INTO b VALUES (1)")
+        other.commit()
+        other.close()
+        self.assertNotEqual(self.manager.get_table_version("b"), before_b)
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "pool.db")
+        self.manager = DatabaseManager()
+        self.manager.create_database(self.db_path, "pool_db")
+        self.manager.execute_query("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+        self.manager.execute_query("INSERT INTO t (v) VALUES ('a'), ('b')")
+        self.pool = self.manager.get_pool("pool_db")
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.temp_dir.cleanup()
+
+    def test_readers_are_read_only_and_reentrant_per_thread(self):
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 2)
+            with self.pool.reader() as inner:
+                self.assertIs(inner, conn)
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO t (v) VALUES ('x')")
+
+        # İade edilen okuyucu yeniden kullanılır
+        with self.pool.reader() as again:
+            self.assertIs(again, conn)
+        self.assertEqual(self.pool.get_stats()["readers"], 1)
+
+    def test_threads_get_separate_readers_and_see_commits(self):
+        with self.pool.reader() as mine:
+            seen = {}
+
+            def work():
+                with self.pool.reader() as conn:
+                    seen["conn"] = conn
+                    seen["count"] = conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+            with self.pool.writer() as writer:
+                writer.execute("INSERT INTO t (v) VALUES ('c')")
+                writer.commit()
+
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+        self.assertIsNot(seen["conn"], mine)
+        self.assertEqual(seen["count"], 3)
+
+    def test_exhausted_pool_times_out_and_pool_closes_with_database(self):
+        self.pool.max_readers = 1
+        self.pool.timeout = 0.1
+        errors = []
+        with self.pool.reader():
+            def work():
+                try:
+                    self.pool.acquire_reader()
+                except sqlite3.OperationalError as e:
+                    errors.append(e)
+
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+        self.assertEqual(len(errors), 1)
+
+        self.manager.close_database("pool_db")
+        self.assertNotIn("pool_db", self.manager.pools)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            self.pool.acquire_reader()
+
+
+class SchemaCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "catalog.db")
+        self.other_path = os.path.join(self.temp_dir.name, "other.db")
+        self.manager = DatabaseManager()
+        self.manager.create_database(self.db_path, "cat_db")
+        self.manager.execute_query("CREATE TABLE parent (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        self.manager.execute_query(
+            "CREATE TABLE child (id INTEGER PRIMARY KEY, "
+            "parent_id INTEGER REFERENCES parent(id) ON DELETE CASCADE)")
+        self.manager.execute_query("CREATE INDEX idx_child_parent ON child(parent_id)")
+        self.manager.execute_query("CREATE VIEW v_parent AS SELECT name FROM parent")
+        self.catalog = self.manager.get_catalog("cat_db")
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.temp_dir.cleanup()
+
+    def test_catalog_reads_once_until_schema_changes(self):
+        self.assertEqual(self.manager.get_tables("cat_db"), ["child", "parent"])
+        self.assertEqual(self.catalog.views(), ["v_parent"])
+        self.assertEqual([c[1] for c in self.manager.get_table_info("child", "cat_db")],
+                         ["id", "parent_id"])
+        self.assertEqual([i[0] for i in self.catalog.indexes("child")], ["idx_child_parent"])
+        self.assertEqual(self.catalog.foreign_keys("child")[0][2:5], ("parent", "parent_id", "id"))
+        self.assertEqual(self.catalog.loads, 1)
+
+        # Başka bir bağlantıdan yapılan DDL de fark edilir
+        other = sqlite3.connect(self.db_path)
+        other.execute("CREATE TABLE added (x)")
+        other.commit()
+        other.close()
+
+        self.assertIn("added", self.manager.get_tables("cat_db"))
+        self.assertEqual(self.catalog.loads, 2)
+
+    def test_attached_schema_and_row_estimates(self):
+        other = sqlite3.connect(self.other_path)
+        other.execute("CREATE TABLE remote (a)")
+        other.close()
+        self.manager.attach_database(self.other_path, "ext")
+
+        self.assertEqual(self.catalog.schemas(), ["main", "ext"])
+        self.assertEqual(self.catalog.tables("ext"), ["remote"])
+
+        self.assertIsNone(self.catalog.row_estimate("parent"))
+        self.manager.execute_query("INSERT INTO parent (name) VALUES ('a'), ('b'), ('c')")
+        self.manager.execute_query("ANALYZE main")
+        self.assertEqual(self.catalog.row_estimate("parent"), 3)
+        self.assertNotIn("sqlite_stat1", self.catalog.tables())
+
+
+class RowCountServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "count.db")
+        self.manager = DatabaseManager()
+        self.manager.create_database(self.db_path, "count_db")
+        self.manager.execute_query("CREATE TABLE big (id INTEGER PRIMARY KEY, v)")
+        conn = self.manager.get_connection("count_db")
+        conn.executemany("INSERT INTO big (v) VALUES (?)", [(i,) for i in range(100)])
+        conn.execute("DELETE FROM big WHERE id % 10 = 0")
+        conn.commit()
+        self.counts = self.manager.row_counts
+        self.counts.exact_count_limit = 50
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.temp_dir.cleanup()
+
+    def test_large_table_is_estimated_then_refined(self):
+        # max(rowid) tahmini silinen satırları görmez
+        self.assertEqual(self.counts.get_count("big", "count_db"), (99, True))
+
+        self.assertTrue(self.counts.refine("big", "count_db"))
+        for _ in range(200):
+            if not self.counts.is_refining("big", "count_db"):
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(self.counts.get_count("big", "count_db"), (90, False))
+
+        # Yazma sonrası kesin sayı bayatlar
+        self.manager.execute_query("INSERT INTO big (v) VALUES (1)")
+        self.assertTrue(self.counts.get_count("big", "count_db")[1])
+        self.assertEqual(self.manager.get_table_row_count("big", "count_db"), 91)
+
+    def test_analyze_feeds_estimates_and_small_tables_are_exact(self):
+        success, _ = self.counts.analyze("count_db")
+        self.assertTrue(success)
+        self.manager.execute_query("INSERT INTO big (v) VALUES (1)")
+        self.assertEqual(self.counts.get_count("big", "count_db"), (90, True))
+
+        self.counts.exact_count_limit = 1000
+        self.assertEqual(self.counts.get_count("big", "count_db"), (91, False))
+
+
+class HistoryStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "history.db")
+        self.store = HistoryStore(self.path, max_entries=50)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_fingerprint_percentiles_survive_reopen(self):
+        for i in range(40):
+            self.store.record(f"SELECT * FROM t WHERE id = {i}", "db", True, (i + 1) / 1000)
+        self.store.record("SELECT * FROM t WHERE id = 'x'", "db", False, 0, "hata")
+        self.store.record("SELECT 1", "db", True, 0.5)
+        self.store.close()
+
+        self.store = HistoryStore(self.path, max_entries=50)
+        slowest = self.store.slowest(5)
+        self.assertEqual(slowest[0]['sample'], "SELECT 1")
+        pattern = slowest[1]
+        self.assertEqual((pattern['count'], pattern['failures']), (41, 1))
+        self.assertEqual((pattern['p50'], pattern['p95'], pattern['max_time']), (0.021, 0.039, 0.04))
+        self.assertEqual(self.store.workload("db")[0]['count'], 40)
+
+    def test_history_is_trimmed_but_totals_are_kept(self):
+        for i in range(60):
+            self.store.record(f"SELECT {i}", "db", i % 10 != 0, 0.001)
+        recent = self.store.recent()
+        self.assertEqual(len(recent), 50)
+        self.assertEqual(recent[0]['query'], "SELECT 59")
+        self.assertEqual(len(self.store.recent(3, success=False)), 3)
+
+        stats = self.store.statistics()
+        self.assertEqual((stats['total'], stats['failed'], stats['fingerprints']), (60, 6, 1))
+
+
+class IndexAdvisorTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "advisor.db")
+        self.manager = DatabaseManager()
+        self.manager.create_database(self.db_path, "advisor_db")
+        self.manager.get_connection("advisor_db").executescript("""
+            CREATE TABLE orders (id INTEGER PRIMARY KEY, customer INTEGER, month TEXT,
+                                 total REAL, note TEXT);
+            WITH RECURSIVE s(v) AS (SELECT 1 UNION ALL SELECT v + 1 FROM s WHERE v < 5000)
+            INSERT INTO orders (customer, month, total) SELECT v % 200, 'm' || (v % 12), v FROM s;
+        """)
+        self.executor = QueryExecutor(self.manager)
+
+    def tearDown(self):
+        self.executor.close()
+        self.manager.close_all()
+        self.temp_dir.cleanup()
+
+    def test_recommends_filtered_columns_from_history_and_rolls_back(self):
+        for _ in range(3):
+            self.executor.execute("SELECT total FROM orders WHERE customer = 7 ORDER BY total")
+        self.executor.execute("SELECT month, sum(total) FROM orders WHERE month = 'm3' GROUP BY month")
+        self.executor.execute("SELECT * FROM orders")  # Süzmesiz: öneri doğurmamalı
+
+        success, recommendations = self.executor.advise_indexes("advisor_db")
+        self.assertTrue(success, recommendations)
+        self.assertEqual(recommendations[0]['columns'], ['customer', 'total'])
+        self.assertEqual(recommendations[0]['used_by'], 3)
+        self.assertTrue(all(r['benefit'] > 0 for r in recommendations))
+        self.assertNotIn('note', {c for r in recommendations for c in r['columns']})
+
+        # Aday indeksler SAVEPOINT içinde kurulup geri alındı
+        indexes = self.manager.get_connection("advisor_db").execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+        self.assertEqual(indexes, [])
+
+    def test_existing_index_prefix_is_not_suggested_again(self):
+        conn = self.manager.get_connection("advisor_db")
+        conn.execute("CREATE INDEX orders_customer_total ON orders (customer, total)")
+        workload = IndexAdvisor.workload_from_history([
+            {'query': "SELECT total FROM orders WHERE customer = 7", 'success': True,
+             'database': "advisor_db", 'execution_time': 0.01}], "advisor_db")
+        self.assertEqual(IndexAdvisor(conn).recommend(workload), [])
+
+
+class ChangeSetWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE people (name TEXT UNIQUE, age INTEGER)")
+        self.conn.executemany("INSERT INTO people VALUES (?, ?)",
+                              [(f"p{i}", i) for i in range(10)])
+        self.conn.commit()
+        self.writer = ChangeSetWriter(self.conn, "people")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_grouped_changes_apply_in_one_commit(self):
+        updates = [(i, i + 1, {'age': 100 + i}) for i in range(5)]
+        updates.append((5, 6, {'name': 'renamed', 'age': 0}))
+        success, summary = self.writer.apply(updates, [(9, 10)], [("n1", {'name': 'new', 'age': 1})])
+
+        self.assertTrue(success)
+        self.assertEqual((summary['updated'], summary['deleted'], summary['inserted']), (6, 1, 1))
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self.conn.execute("SELECT age FROM people WHERE rowid = 3").fetchone(), (102,))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM people").fetchone(), (10,))
+
+    def test_failing_rows_are_reported_and_rest_is_saved(self):
+        updates = [(0, 1, {'name': 'x'}), (1, 2, {'name': 'x'}), (2, 3, {'name': 'y'})]
+        success, summary = self.writer.apply(updates)
+
+        self.assertTrue(success)
+        self.assertEqual(summary['updated'], 2)
+        self.assertEqual([(kind, ref) for kind, ref, _ in summary['failed']], [('update', 1)])
+        names = [row[0] for row in self.conn.execute("SELECT name FROM people WHERE rowid <= 3 ORDER BY rowid")]
+        self.assertEqual(names, ['x', 'p1', 'y'])
+
+    def test_bulk_update_through_staging_table(self):
+        rows = [(1, 50), (3, 51), (3, 52), ("2", 53), (99, 0)]
+        success, summary = self.writer.bulk_update("rowid", ["age"], rows, chunk_size=2)
+
+        self.assertTrue(success)
+        self.assertEqual((summary['staged'], summary['matched'], summary['unmatched']), (4, 3, 1))
+        ages = [row[0] for row in self.conn.execute("SELECT age FROM people WHERE rowid <= 4 ORDER BY rowid")]
+        self.assertEqual(ages, [50, 53, 52, 3])
+        self.assertFalse(self.conn.in_transaction)
+
+
+    def test_bulk_update_reports_progress_and_can_be_cancelled(self):
+        rows = ((i, 200 + i) for i in range(1, 8))
+        progress = []
+        success, summary = self.writer.bulk_update("rowid", ["age"], rows, chunk_size=3,
+                                                   on_chunk=progress.append,
+                                                   cancel_check=lambda: len(progress) >= 2)
+
+        self.assertTrue(success)
+        self.assertTrue(summary['cancelled'])
+        self.assertEqual(progress, [3, 6])
+        self.assertEqual(self.conn.execute("SELECT SUM(age) FROM people").fetchone(), (45,))
+        self.assertFalse(self.conn.in_transaction)
 
 class QueryExecutorTests(unittest.TestCase):
     def setUp(self):
@@ -44,6 +393,7 @@ class QueryExecutorTests(unittest.TestCase):
         self.executor = QueryExecutor(self.manager)
 
     def tearDown(self):
+        self.executor.close()
         self.manager.close_all()
         self.temp_dir.cleanup()
 
@@ -70,5 +420,265 @@ class QueryExecutorTests(unittest.TestCase):
         self.assertEqual(select_result["columns"], ["id", "name"])
 
 
+    def test_statement_type_comes_from_lexer_and_description(self):
+        self.executor.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, format TEXT)")
+
+        success, result, _ = self.executor.execute(
+            "INSERT INTO items (format) VALUES ('csv') RETURNING id")
+        self.assertTrue(success)
+        self.assertEqual(result["type"], "select")
+        self.assertEqual(result["rows"], [(1,)])
+        self.assertFalse(self.manager.get_connection("exec_db").in_transaction)
+
+        success, result, _ = self.executor.execute("-- yorum\nVALUES (1), (2)")
+        self.assertTrue(success)
+        self.assertEqual(result["row_count"], 2)
+
+        success, _, _ = self.executor.execute("SELECT format FROM items")
+        self.assertTrue(success)
+    def test_execute_stream_yields_fixed_size_batches(self):
+        self.executor.execute("CREATE TABLE nums (n INTEGER)")
+        self.manager.get_connection("exec_db").executemany(
+            "INSERT INTO nums VALUES (?)", [(i,) for i in range(25)]
+        )
+
+        success, stream, _ = self.executor.execute_stream(
+            "SELECT n FROM nums ORDER BY n", batch_size=10
+        )
+        self.assertTrue(success)
+        self.assertEqual(stream.columns, ["n"])
+        self.assertIsNone(stream.first_batch_time)
+
+        sizes = [len(batch) for batch in stream]
+        self.assertEqual(sizes, [10, 10, 5])
+        self.assertTrue(stream.exhausted)
+        self.assertEqual(stream.row_count, 25)
+        self.assertIsNotNone(stream.first_batch_time)
+        self.assertEqual(self.executor.get_history(1)[0]["query"], "SELECT n FROM nums ORDER BY n")
+
+    def test_execute_stream_passes_modify_queries_through(self):
+        success, result, _ = self.executor.execute_stream("CREATE TABLE t (a)")
+        self.assertTrue(success)
+        self.assertEqual(result["type"], "modify")
+
+    def test_iter_query_streams_batches(self):
+        self.executor.execute("CREATE TABLE nums (n INTEGER)")
+        self.executor.execute("INSERT INTO nums VALUES (1), (2), (3)")
+        batches = list(self.manager.iter_query("SELECT n FROM nums WHERE n > ?", (0,),
+                                               alias="exec_db", batch_size=2))
+        self.assertEqual(batches, [[(1,), (2,)], [(3,)]])
+
+    def test_result_cache_hits_until_any_connection_commits(self):
+        self.executor.execute("CREATE TABLE nums (n INTEGER)")
+        self.executor.execute("INSERT INTO nums VALUES (1), (2)")
+        self.executor.cache_enabled = True
+
+        _, first, _ = self.executor.execute("SELECT n FROM nums")
+        _, second, message = self.executor.execute("  SELECT n\n FROM nums -- tekrar\n;")
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertIn("önbellek", message)
+        self.assertEqual(second["rows"], [(1,), (2,)])
+        self.assertTrue(self.executor.get_history(1)[0]["cached"])
+
+        # Başka bir bağlantıdan commit -> data_version değişir
+        other = sqlite3.connect(self.db_path)
+        other.execute("INSERT INTO nums VALUES (3)")
+        other.commit()
+        other.close()
+        _, third, _ = self.executor.execute("SELECT n FROM nums")
+        self.assertFalse(third["cached"])
+        self.assertEqual(len(third["rows"]), 3)
+
+        # Uygulamanın kendi yazması da sürümü değiştirir; rastgele sorgular önbelleğe alınmaz
+        self.executor.execute("DELETE FROM nums WHERE n = 3")
+        _, fourth, _ = self.executor.execute("SELECT n FROM nums")
+        self.assertFalse(fourth["cached"])
+        self.executor.execute("SELECT random() FROM nums")
+        _, volatile, _ = self.executor.execute("SELECT random() FROM nums")
+        self.assertNotIn("cached", volatile)
+
+
+    def test_queries_reading_temp_tables_are_not_cached(self):
+        self.executor.execute("CREATE TABLE nums (n INTEGER)")
+        self.executor.execute("INSERT INTO nums VALUES (1)")
+        self.executor.cache_enabled = True
+        self.executor.execute("SELECT n FROM nums")
+
+        # TEMP yazmaları data_version'ı değiştirmez
+        self.executor.execute("CREATE TEMP TABLE scratch (n INTEGER)")
+        self.executor.execute("INSERT INTO scratch VALUES (10)")
+        _, first, _ = self.executor.execute("SELECT n FROM temp.scratch")
+        self.executor.execute("INSERT INTO scratch VALUES (11)")
+        _, second, _ = self.executor.execute("SELECT n FROM temp.scratch")
+        self.assertNotIn("cached", second)
+        self.assertEqual(second["rows"], [(10,), (11,)])
+        _, unqualified, _ = self.executor.execute("SELECT n FROM `scratch`")
+        self.assertNotIn("cached", unqualified)
+
+        # Ana tabloyu gölgeleyen TEMP tablo önbellekteki ana tablo sonucunu almaz
+        self.executor.execute("CREATE TEMP TABLE nums (n INTEGER)")
+        _, shadowed, _ = self.executor.execute("SELECT n FROM nums")
+        self.assertEqual(shadowed["rows"], [])
+        self.assertNotIn("cached", shadowed)
+
+class QueryWorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "worker.db")
+        self.manager = DatabaseManager()
+        self.manager.create_database(self.db_path, "worker_db")
+        self.executor = QueryExecutor(self.manager)
+        self.worker = QueryWorker(self.executor)
+
+    def tearDown(self):
+        self.worker.wait(5)
+        self.executor.close()
+        self.manager.close_all()
+        self.temp_dir.cleanup()
+
+    def test_worker_reports_progress_and_result(self):
+        self.executor.fetch_batch_size = 10
+        started, _ = self.worker.start(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 25) "
+            "SELECT x FROM n"
+        )
+        self.assertTrue(started)
+        self.worker.wait(5)
+
+        events = self.worker.poll()
+        kinds = [kind for kind, _ in events]
+        self.assertEqual(kinds[0], "started")
+        self.assertEqual(kinds[-1], "done")
+        self.assertEqual([p for k, p in events if k == "progress"], [10, 20, 25])
+
+        success, result, _ = events[-1][1]
+        self.assertTrue(success)
+        self.assertEqual(result["row_count"], 25)
+
+    def test_cancel_interrupts_running_query(self):
+        started, _ = self.worker.start(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) "
+            "SELECT COUNT(*) FROM n"
+        )
+        self.assertTrue(started)
+        self.assertTrue(self.worker.is_running)
+
+        # Tek bir cancel() yeterli olmalı (ifade henüz başlamamış olsa bile)
+        self.assertTrue(self.worker.cancel())
+        self.worker.wait(5)
+
+        self.assertFalse(self.worker.is_running)
+        kinds = [kind for kind, _ in self.worker.poll()]
+        self.assertEqual(kinds[-1], "cancelled")
+
+    def test_long_query_sends_heartbeats_on_private_connection(self):
+        self.worker.heartbeat_interval = 0.01
+        self.worker.progress_steps = 1000
+        started, _ = self.worker.start(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) "
+            "SELECT COUNT(*) FROM n"
+        )
+        self.assertTrue(started)
+
+        beats = []
+        while not beats:
+            self.worker.wait(0.05)
+            beats = [p for k, p in self.worker.poll() if k == "heartbeat"]
+        self.assertGreater(beats[-1], 0)
+
+        # UI bağlantısı işçiden bağımsız kullanılabilir olmalı
+        ui_conn = self.manager.get_connection("worker_db")
+        self.assertEqual(ui_conn.execute("SELECT 1").fetchone()[0], 1)
+
+        self.assertTrue(self.worker.stop(5))
+
+    def test_timeout_aborts_query_and_reports_steps(self):
+        self.worker.heartbeat_interval = 0.01
+        self.worker.progress_steps = 1000
+        started, _ = self.worker.start(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) "
+            "SELECT COUNT(*) FROM n", timeout=0.2
+        )
+        self.assertTrue(started)
+        self.worker.wait(5)
+
+        events = self.worker.poll()
+        self.assertIn("heartbeat", [kind for kind, _ in events])  # iptal/heartbeat handler'ı da çalıştı
+        kind, (success, _, message) = events[-1]
+        self.assertEqual(kind, "done")
+        self.assertFalse(success)
+        self.assertIn("zaman aşımı", message)
+        self.assertIn("VM adımı", message)
+
+        history = self.executor.get_history(1)[0]
+        self.assertFalse(history["success"])
+        self.assertGreaterEqual(history["execution_time"], 0.2)
+
+    def test_stream_sends_batches_from_private_connection(self):
+        self.executor.fetch_batch_size = 10
+        started, _ = self.worker.start(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 25) "
+            "SELECT x FROM n", stream=True
+        )
+        self.assertTrue(started)
+        self.worker.wait(5)
+
+        events = self.worker.poll()
+        self.assertIn(("columns", ["x"]), events)
+        batches = [payload for kind, payload in events if kind == "batch"]
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        kind, (success, result, _) = events[-1]
+        self.assertEqual(kind, "done")
+        self.assertTrue(success)
+        self.assertEqual(result["type"], "stream")
+        self.assertEqual(result["row_count"], 25)
+        self.assertTrue(self.executor.get_history(1)[0]["success"])
+        # UI bağlantısına progress handler takılmadı
+        self.assertFalse(self.manager.get_connection("worker_db").in_transaction)
+
+    def test_stream_cancel_and_timeout(self):
+        endless = ("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) "
+                   "SELECT x FROM n")
+        self.worker.progress_steps = 1000
+        started, _ = self.worker.start(endless, stream=True)
+        self.assertTrue(started)
+        while not any(kind == "batch" for kind, _ in self.worker.poll()):
+            self.worker.wait(0.01)
+        self.assertTrue(self.worker.cancel())
+        self.worker.wait(5)
+        self.assertFalse(self.worker.is_running)
+        self.assertEqual(self.worker.poll()[-1][0], "cancelled")
+        self.assertFalse(self.executor.get_history(1)[0]["success"])
+
+        started, _ = self.worker.start(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) "
+            "SELECT COUNT(*) FROM n", timeout=0.2, stream=True)
+        self.assertTrue(started)
+        self.worker.wait(5)
+        kind, (success, _, message) = self.worker.poll()[-1]
+        self.assertEqual(kind, "done")
+        self.assertFalse(success)
+        self.assertIn("zaman aşımı", message)
+
+    def test_queries_have_no_time_limit_by_default(self):
+        self.assertFalse(self.executor.default_timeout)
+        conn = self.manager.get_connection("worker_db")
+        guard = ExecutionGuard(conn, self.executor.default_timeout)
+        self.assertFalse(guard.active)  # Handler takılmaz, uzun sorgu kesilmez
+
+    def test_timeout_on_shared_connection_removes_handler(self):
+        conn = self.manager.get_connection("worker_db")
+        success, _, message = self.executor.execute(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) "
+            "SELECT COUNT(*) FROM n", timeout=0.1)
+        self.assertFalse(success)
+        self.assertIn("zaman aşımı", message)
+        self.assertFalse(conn.in_transaction)
+
+        success, result, _ = self.executor.execute("SELECT 1", timeout=0)
+        self.assertTrue(success)
+
+
 if __name__ == "__main__":
     unittest.main()
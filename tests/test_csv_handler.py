@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+try:
+    from utils.csv_handler import CSVHandler, infer_column_types
+except ImportError as e:  # pandas kurulu değil
+    CSVHandler = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+
+def table_schema(conn, table):
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info(`{table}`)")]
+
+
+@unittest.skipIf(CSVHandler is None, f"CSV bağımlılıkları yok: {IMPORT_ERROR}")
+class InferColumnTypesTests(unittest.TestCase):
+    def test_integer_real_and_text_columns(self):
+        rows = [["1", "1.5", "007", "", "x"],
+                ["-2", "2", "010", "", "3"],
+                ["30", "-3.25", "12", "", ""]]
+        self.assertEqual(infer_column_types(rows, 5),
+                         ["INTEGER", "REAL", "TEXT", "TEXT", "TEXT"])
+
+    def test_empty_cells_are_ignored_and_special_floats_are_text(self):
+        self.assertEqual(infer_column_types([["", "nan"], ["5", "inf"], ["", "1_000"]], 2),
+                         ["INTEGER", "TEXT"])
+        self.assertEqual(infer_column_types([["0.5"], ["0"], ["00.5"]], 1), ["TEXT"])
+        self.assertEqual(infer_column_types([["1"]], 2), ["INTEGER", "TEXT"])  # Kısa satır
+
+
+@unittest.skipIf(CSVHandler is None, f"CSV bağımlılıkları yok: {IMPORT_ERROR}")
+class ImportCsvToTableTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir.name, "import.db"),
+                                    isolation_level=None)
+
+    def tearDown(self):
+        self.conn.close()
+        self.temp_dir.cleanup()
+
+    def write_csv(self, name, text, encoding='utf-8'):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            f.write(text)
+        return path
+
+    def test_schema_and_rows_from_real_file(self):
+        path = self.write_csv("urunler.csv",
+                              "id,code,price,note\n"
+                              "1,007,10.5,ilk\n"
+                              "2,042,3,\n"
+                              "\n"
+                              "3,100,,son\n")
+        progress = []
+        success, summary = CSVHandler.import_csv_to_table(
+            self.conn, path, "urunler", progress_callback=lambda rows, ratio: progress.append((rows, ratio)))
+
+        self.assertTrue(success, summary)
+        self.assertEqual(summary['rows'], 3)
+        self.assertFalse(summary['cancelled'])
+        self.assertEqual(table_schema(self.conn, "urunler"),
+                         [("id", "INTEGER"), ("code", "TEXT"), ("price", "REAL"), ("note", "TEXT")])
+        self.assertEqual(self.conn.execute("SELECT * FROM urunler ORDER BY id").fetchall(),
+                         [(1, "007", 10.5, "ilk"), (2, "042", 3.0, None), (3, "100", None, "son")])
+        self.assertEqual(progress[-1], (3, 1.0))
+
+    def test_append_and_replace_modes(self):
+        first = self.write_csv("a.csv", "id,name\n1,a\n2,b\n")
+        second = self.write_csv("b.csv", "code;amount\nX1;1.5\n")
+
+        CSVHandler.import_csv_to_table(self.conn, first, "t")
+        success, summary = CSVHandler.import_csv_to_table(self.conn, first, "t", if_exists='append')
+        self.assertTrue(success, summary)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM t").fetchone(), (4,))
+
+        success, _ = CSVHandler.import_csv_to_table(self.conn, first, "t", if_exists='fail')
+        self.assertFalse(success)
+
+        success, summary = CSVHandler.import_csv_to_table(self.conn, second, "t", if_exists='replace')
+        self.assertTrue(success, summary)
+        self.assertEqual(table_schema(self.conn, "t"), [("code", "TEXT"), ("amount", "REAL")])
+        self.assertEqual(self.conn.execute("SELECT * FROM t").fetchall(), [("X1", 1.5)])
+
+    def test_encoding_and_delimiter_detection(self):
+        latin = self.write_csv("latin.csv",
+                               "ülke;nüfus\nTürkiye;85\nÖzbekistan;36\nFransa;68\n",
+                               encoding='latin1')
+        success, summary = CSVHandler.import_csv_to_table(self.conn, latin, "ulkeler")
+        self.assertTrue(success, summary)
+        self.assertEqual(summary['columns'], ["ülke", "nüfus"])
+        self.assertEqual(self.conn.execute("SELECT `ülke`, `nüfus` FROM ulkeler").fetchall(),
+                         [("Türkiye", 85), ("Özbekistan", 36), ("Fransa", 68)])
+
+        bom = self.write_csv("bom.csv", "id\tad\n1\tAyşe\n2\tCan\n", encoding='utf-8-sig')
+        success, summary = CSVHandler.import_csv_to_table(self.conn, bom, "kisiler")
+        self.assertTrue(success, summary)
+        self.assertEqual(summary['columns'], ["id", "ad"])  # BOM başlığa karışmaz
+        self.assertEqual(self.conn.execute("SELECT ad FROM kisiler WHERE id = 1").fetchone(), ("Ayşe",))
+
+        explicit = self.write_csv("pipe.csv", "a|b\n1|x,y\n")
+        success, _ = CSVHandler.import_csv_to_table(self.conn, explicit, "boru", encoding='utf-8',
+                                                    delimiter='|')
+        self.assertTrue(success)
+        self.assertEqual(self.conn.execute("SELECT * FROM boru").fetchall(), [(1, "x,y")])
+
+    def test_cancel_keeps_committed_chunks_and_replace_keeps_table(self):
+        path = self.write_csv("nums.csv", "n\n" + "".join(f"{i}\n" for i in range(20)))
+        calls = []
+
+        def cancel_after(count):
+            def check():
+                calls.append(1)
+                return len(calls) > count
+            return check
+
+        success, summary = CSVHandler.import_csv_to_table(
+            self.conn, path, "nums", chunk_size=5, commit_every=5, cancel_check=cancel_after(2))
+        self.assertTrue(success)
+        self.assertTrue(summary['cancelled'])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM nums").fetchone(), (10,))
+
+        calls.clear()
+        success, summary = CSVHandler.import_csv_to_table(
+            self.conn, path, "nums", if_exists='replace', chunk_size=5, commit_every=5,
+            cancel_check=cancel_after(2))
+        self.assertTrue(summary['cancelled'])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM nums").fetchone(), (10,))
+
+    def test_missing_and_empty_files(self):
+        success, message = CSVHandler.import_csv_to_table(
+            self.conn, os.path.join(self.temp_dir.name, "yok.csv"), "t")
+        self.assertFalse(success)
+        self.assertIn("bulunamadı", message)
+
+        success, message = CSVHandler.import_csv_to_table(self.conn, self.write_csv("bos.csv", ""), "t")
+        self.assertFalse(success)
+        self.assertIn("boş", message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from core.change_set_writer import ChangeSetWriter
+
+try:
+    from openpyxl import Workbook, load_workbook
+    from openpyxl.worksheet import _writer as openpyxl_writer
+
+    from utils import excel_handler
+    from utils.excel_handler import ExcelHandler
+except ImportError as e:  # pandas / openpyxl kurulu değil
+    ExcelHandler = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+
+def table_schema(conn, table):
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info(`{table}`)")]
+
+
+@unittest.skipIf(ExcelHandler is None, f"Excel bağımlılıkları yok: {IMPORT_ERROR}")
+class ImportExcelToTableTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir.name, "import.db"),
+                                    isolation_level=None)
+        self.path = os.path.join(self.temp_dir.name, "veri.xlsx")
+
+        workbook = Workbook()
+        summary = workbook.active
+        summary.title = "Özet"
+        summary.append(["not"])
+        summary.append(["ilk sayfa"])
+
+        sheet = workbook.create_sheet("Veri")
+        sheet.append(["id", "tarih", None, "ad", "ad", "tutar", "bos", None, None])
+        sheet.append([1.0, datetime(2024, 1, 2, 3, 4, 5), "x", "Ali", "Veli", 1.5, None, None, "kayıp"])
+        sheet.append([None] * 9)  # Boş satır atlanır
+        sheet.append([2, datetime(2024, 2, 29), 5, "Ayşe", 7, 2, None])
+        sheet.append([3.0, None, None, "", 8.0, None, None])
+        workbook.save(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        self.temp_dir.cleanup()
+
+    def test_types_values_and_headers(self):
+        with mock.patch.object(excel_handler, "load_workbook", wraps=load_workbook) as loader:
+            success, summary = ExcelHandler.import_excel_to_table(
+                self.conn, self.path, "veri", sheet_name="Veri")
+        self.assertTrue(success, summary)
+        self.assertTrue(loader.call_args.kwargs["read_only"])
+
+        self.assertEqual(summary['rows'], 3)
+        self.assertEqual(table_schema(self.conn, "veri"), [
+            ("id", "INTEGER"), ("tarih", "DATETIME"), ("column_3", "TEXT"), ("ad", "TEXT"),
+            ("ad_5", "TEXT"), ("tutar", "REAL"), ("bos", "TEXT"),
+        ])
+        self.assertEqual(self.conn.execute("SELECT * FROM veri ORDER BY id").fetchall(), [
+            (1, "2024-01-02 03:04:05", "x", "Ali", "Veli", 1.5, None),
+            (2, "2024-02-29 00:00:00", "5", "Ayşe", "7", 2.0, None),
+            (3, None, None, None, "8", None, None),
+        ])
+
+    def test_sheet_argument_defaults_to_first_sheet(self):
+        success, summary = ExcelHandler.import_excel_to_table(self.conn, self.path, "ozet")
+        self.assertTrue(success, summary)
+        self.assertEqual(self.conn.execute("SELECT * FROM ozet").fetchall(), [("ilk sayfa",)])
+
+        success, message = ExcelHandler.import_excel_to_table(self.conn, self.path, "t",
+                                                              sheet_name="Yok")
+        self.assertFalse(success)
+        self.assertIn("Excel import hatası", message)
+
+    def test_replace_progress_and_cancel(self):
+        progress = []
+        ExcelHandler.import_excel_to_table(self.conn, self.path, "veri", sheet_name="Veri")
+        success, summary = ExcelHandler.import_excel_to_table(
+            self.conn, self.path, "veri", sheet_name="Veri", if_exists='replace',
+            chunk_size=2, progress_callback=lambda rows, ratio: progress.append(rows))
+        self.assertTrue(success, summary)
+        self.assertEqual(progress, [2, 3])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM veri").fetchone(), (3,))
+
+        success, summary = ExcelHandler.import_excel_to_table(
+            self.conn, self.path, "veri", sheet_name="Veri", if_exists='replace',
+            chunk_size=1, cancel_check=lambda: True)
+        self.assertTrue(success)
+        self.assertTrue(summary['cancelled'])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM veri").fetchone(), (3,))
+
+    def test_row_iterator_feeds_bulk_update(self):
+        success, info = ExcelHandler.read_excel_header(self.path, "Veri")
+        self.assertTrue(success, info)
+        self.assertEqual(info['columns'][:2], ["id", "tarih"])
+        self.assertEqual(info['rows'], 4)  # Boş satır dahil tahmin
+
+        self.conn.execute("CREATE TABLE veri (id INTEGER PRIMARY KEY, tarih TEXT, tutar REAL)")
+        self.conn.executemany("INSERT INTO veri (id) VALUES (?)", [(1,), (2,), (4,)])
+        rows = ExcelHandler.iter_excel_rows(self.path, ["id", "tarih", "tutar"], sheet_name="Veri")
+        success, summary = ChangeSetWriter(self.conn, "veri").bulk_update("id", ["tarih", "tutar"], rows)
+
+        self.assertTrue(success, summary)
+        self.assertEqual((summary['matched'], summary['unmatched']), (2, 1))
+        self.assertEqual(self.conn.execute("SELECT * FROM veri ORDER BY id").fetchall(), [
+            (1, "2024-01-02 03:04:05", 1.5),
+            (2, "2024-02-29 00:00:00", 2.0),
+            (4, None, None),
+        ])
+
+    def test_empty_sheet(self):
+        workbook = Workbook()
+        workbook.save(self.path)
+        success, message = ExcelHandler.import_excel_to_table(self.conn, self.path, "t")
+        self.assertFalse(success)
+        self.assertIn("boş", message)
+
+
+@unittest.skipIf(ExcelHandler is None, f"Excel bağımlılıkları yok: {IMPORT_ERROR}")
+class ExportExcelTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "sonuc.xlsx")
+        self.rows = [(i, f"ad{i}", i * 1.5, None) for i in range(2500)]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def batches(self, size=700):
+        for start in range(0, len(self.rows), size):
+            yield self.rows[start:start + size]
+
+    def test_batches_round_trip_with_styled_header(self):
+        progress = []
+        success, message = ExcelHandler.export_stream(
+            self.batches(), ["id", "ad", "tutar", "bos"], self.path, sheet_name="Sonuç",
+            total_rows=len(self.rows), progress_callback=lambda rows, ratio: progress.append(rows))
+        self.assertTrue(success, message)
+        self.assertEqual(progress, [1000, 2000, 2500])
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+        workbook = load_workbook(self.path)
+        sheet = workbook["Sonuç"]
+        self.assertEqual(sheet.max_row, 2501)
+        self.assertEqual([cell.value for cell in sheet[1]], ["id", "ad", "tutar", "bos"])
+        header = sheet["A1"]
+        self.assertEqual(header.style, "sql_panel_header")
+        self.assertTrue(header.font.bold)
+        self.assertTrue(header.fill.start_color.rgb.endswith("4472C4"))
+        self.assertEqual([cell.value for cell in sheet[2501]], [2499, "ad2499", 3748.5, None])
+        self.assertEqual(len(sheet.conditional_formatting), 1)  # Zebra/kenarlık tek aralıkta
+        workbook.close()
+
+    def test_plain_export_from_list(self):
+        success, message = ExcelHandler.export_to_excel(self.rows[:3], ["id", "ad", "tutar", "bos"],
+                                                        self.path, styled=False)
+        self.assertTrue(success, message)
+        workbook = load_workbook(self.path, read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        workbook.close()
+        self.assertEqual(rows[0], ("id", "ad", "tutar", "bos"))
+        self.assertEqual(rows[1:], [(0, "ad0", 0), (1, "ad1", 1.5), (2, "ad2", 3)])  # Boş son hücre okunmaz
+
+    def test_row_limit_truncates_with_notice(self):
+        with mock.patch.object(excel_handler, "_EXCEL_MAX_DATA_ROWS", 5):
+            success, message = ExcelHandler.export_stream(self.batches(3), ["id", "ad", "tutar", "bos"],
+                                                          self.path)
+        self.assertTrue(success, message)
+        self.assertIn("ilk 5 satır", message)
+        workbook = load_workbook(self.path, read_only=True)
+        self.assertEqual(len(list(workbook.active.iter_rows(values_only=True))), 6)
+        workbook.close()
+
+    def test_cancel_removes_partial_output(self):
+        temp_files = list(openpyxl_writer.ALL_TEMP_FILES)
+        success, message = ExcelHandler.export_stream(self.batches(), ["id", "ad", "tutar", "bos"],
+                                                      self.path, cancel_check=lambda: True)
+        self.assertFalse(success)
+        self.assertIn("iptal", message)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        self.assertEqual(openpyxl_writer.ALL_TEMP_FILES, temp_files)
+
+    def test_failing_source_keeps_existing_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"eski")
+
+        def broken():
+            yield from self.rows[:10]
+            raise sqlite3.OperationalError("interrupted")
+
+        success, message = ExcelHandler.export_stream(broken(), ["id", "ad", "tutar", "bos"], self.path)
+        self.assertFalse(success)
+        self.assertIn("interrupted", message)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"eski")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import tkinter as tk
+import unittest
+from tkinter import ttk
+from types import SimpleNamespace
+
+from core.database_manager import DatabaseManager
+from core.query_executor import QueryExecutor
+from gui.widgets.virtual_grid import VirtualGrid
+from utils.metrics import MetricsRegistry
+from utils.performance_optimizer import PerformanceMonitor
+
+try:
+    from gui.tabs.query_tab import QueryTab
+except ImportError as e:  # pandas / openpyxl kurulu değil
+    QueryTab = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+
+@unittest.skipIf(QueryTab is None, f"GUI bağımlılıkları yok: {IMPORT_ERROR}")
+class QueryTabSmokeTests(unittest.TestCase):
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError as e:
+            self.skipTest(f"Ekran yok: {e}")
+        self.root.withdraw()
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = DatabaseManager()
+        self.manager.create_database(os.path.join(self.temp_dir.name, "gui.db"), "gui_db")
+        self.executor = QueryExecutor(self.manager)
+        self.main = SimpleNamespace(
+            root=self.root,
+            db_manager=self.manager,
+            query_executor=self.executor,
+            performance_monitor=PerformanceMonitor(),
+            metrics=MetricsRegistry(),
+            update_status=lambda *args, **kwargs: None,
+            refresh_all=lambda: None,
+        )
+
+    def tearDown(self):
+        self.executor.close()
+        self.manager.close_all()
+        self.temp_dir.cleanup()
+        self.root.destroy()
+
+    def test_builds_with_shared_monitor(self):
+        notebook = ttk.Notebook(self.root)
+        tab = QueryTab(notebook, self.main)
+        self.assertIs(tab.performance_monitor, self.main.performance_monitor)
+        self.root.update_idletasks()
+
+
+class VirtualGridTests(unittest.TestCase):
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError as e:
+            self.skipTest(f"Ekran yok: {e}")
+        self.root.withdraw()
+        self.grid = VirtualGrid(self.root)
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def test_buffer_is_shared_and_only_window_is_rendered(self):
+        rows = [(i, f"r{i}") for i in range(100)]
+        self.grid.set_columns(["id", "ad"])
+        self.grid.set_rows(rows)
+        self.grid.append_rows([(100, "r100")])
+
+        self.assertEqual(len(rows), 101)  # Liste kopyalanmaz, akış parçaları aynı tampona eklenir
+        self.assertEqual(self.grid.total_rows, 101)
+        self.assertEqual(len(self.grid.tree.get_children()), self.grid.visible_rows)
+
+        self.grid.update_row(0, (0, "yeni"))
+        self.assertEqual(self.grid.row_values(0), (0, "yeni"))
+        self.grid.clear()
+        self.assertEqual(self.grid.row_values(0), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
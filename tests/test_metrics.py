@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import unittest
+
+from utils.metrics import (MetricsExporter, MetricsRegistry, cache_collector,
+                           describe_default_metrics, monitor_collector, observe_import)
+from utils.performance_optimizer import PerformanceMonitor, SmartCache
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        describe_default_metrics(self.registry)
+
+    def test_prometheus_text_groups_summary_and_counters(self):
+        monitor = PerformanceMonitor()
+        monitor.record('query', 0.25)
+        cache = SmartCache(max_size_mb=1)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        self.registry.register_collector(monitor_collector(monitor))
+        self.registry.register_collector(cache_collector('pages', cache.get_stats))
+        self.registry.inc('app_rows_rendered_total', 100, tab='query')
+        self.registry.inc('app_rows_rendered_total', 50, tab='query')
+
+        text = self.registry.render_prometheus()
+        self.assertIn("# TYPE app_operation_seconds summary\n", text)
+        self.assertIn('app_operation_seconds{operation="query",quantile="0.95"} 0.25', text)
+        self.assertIn('app_operation_seconds_count{operation="query"} 1.0', text)
+        self.assertEqual(text.count("# TYPE app_operation_seconds"), 1)
+        self.assertIn('app_cache_hit_ratio{cache="pages"} 0.5', text)
+        self.assertIn('app_rows_rendered_total{tab="query"} 150.0', text)
+
+    def test_failing_collector_is_skipped(self):
+        def broken():
+            raise RuntimeError("kapalı")
+
+        self.registry.register_collector(broken)
+        self.registry.inc('app_imports_total', source='csv', status='done')
+        self.assertEqual(len(self.registry.collect()), 1)
+
+    def test_exporter_writes_prometheus_and_json_lines(self):
+        observe_import(self.registry, 'csv', {'rows': 1000, 'elapsed': 0.5, 'cancelled': False})
+        with tempfile.TemporaryDirectory() as directory:
+            exporter = MetricsExporter(self.registry, directory, interval=3600, max_jsonl_bytes=1)
+            exporter.start()
+            self.assertTrue(exporter.write_snapshot()[0])
+            exporter.stop()  # Son döküm; JSON dosyası sınırı aştığı için döndürülür
+
+            with open(exporter.prometheus_path, encoding='utf-8') as f:
+                self.assertIn('app_import_rows_total{source="csv"} 1000.0', f.read())
+            with open(exporter.jsonl_path, encoding='utf-8') as f:
+                snapshot = json.loads(f.readline())
+            self.assertTrue(os.path.exists(exporter.jsonl_path + ".1"))
+            self.assertIn({'name': 'app_import_seconds_total', 'labels': {'source': 'csv'},
+                           'value': 0.5}, snapshot['metrics'])
+
+
+if __name__ == "__main__":
+    unittest.main()
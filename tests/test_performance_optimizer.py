@@ -0,0 +1,264 @@
+import sqlite3
+import threading
+import unittest
+
+from utils.performance_optimizer import (DataPaginator, LatencyHistogram, PerformanceMonitor,
+                                         ProgressiveLoader, QueryOptimizer, SmartCache,
+                                         estimate_size)
+
+
+class DataPaginatorTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE items (name TEXT)")
+        self.conn.executemany("INSERT INTO items (name) VALUES (?)",
+                              [(f"item{i}",) for i in range(95)])
+        # Boşluklu rowid'ler: seek, OFFSET ile aynı sayfaları vermeli
+        self.conn.execute("DELETE FROM items WHERE rowid % 7 = 0")
+        self.rows = self.conn.execute("SELECT rowid, name FROM items ORDER BY rowid").fetchall()
+
+        self.paginator = DataPaginator(page_size=10)
+        self.paginator.set_total_rows(len(self.rows))
+
+    def tearDown(self):
+        self.conn.close()
+
+    def expected_page(self, page):
+        return self.rows[page * 10:(page + 1) * 10]
+
+    def test_sequential_pages_match_offset_order(self):
+        for page in range(self.paginator.total_pages):
+            data, _ = self.paginator.get_page_data(self.conn, "items", page, ["name"])
+            self.assertEqual(data, self.expected_page(page))
+
+    def test_last_and_previous_pages_use_reverse_seek(self):
+        last = self.paginator.total_pages - 1
+        data, _ = self.paginator.get_page_data(self.conn, "items", last, ["name"])
+        self.assertEqual(data, self.expected_page(last))
+
+        data, _ = self.paginator.get_page_data(self.conn, "items", last - 1, ["name"])
+        self.assertEqual(data, self.expected_page(last - 1))
+
+    def test_random_jump_after_checkpoints(self):
+        count = self.paginator.sample_checkpoints(self.conn, "items")
+        self.assertEqual(count, self.paginator.total_pages)
+        self.assertTrue(self.paginator.has_bound("items", 5))
+
+        data, _ = self.paginator.get_page_data(self.conn, "items", 5, ["name"])
+        self.assertEqual(data, self.expected_page(5))
+
+    def test_random_jump_without_checkpoints_falls_back_to_offset(self):
+        data, _ = self.paginator.get_page_data(self.conn, "items", 4, ["name"])
+        self.assertEqual(data, self.expected_page(4))
+
+    def test_version_change_invalidates_only_that_table(self):
+        self.conn.execute("CREATE TABLE other (v)")
+        self.conn.execute("INSERT INTO other VALUES (1)")
+        self.paginator.get_page_data(self.conn, "items", 0, ["name"], version=1)
+        self.paginator.get_page_data(self.conn, "other", 0, ["v"], version=1)
+
+        self.conn.execute("UPDATE items SET name = 'changed' WHERE rowid = 1")
+        data, _ = self.paginator.get_page_data(self.conn, "items", 0, ["name"], version=2)
+        self.assertEqual(data[0], (1, 'changed'))
+        self.assertIn(("other", 0), self.paginator.cache)
+
+    def test_without_rowid_table_seeks_on_primary_key(self):
+        self.conn.execute("CREATE TABLE codes (a INTEGER, b TEXT, v TEXT, "
+                          "PRIMARY KEY (a, b)) WITHOUT ROWID")
+        self.conn.executemany("INSERT INTO codes VALUES (?, ?, ?)",
+                              [(i // 3, f"k{i % 3}", f"v{i}") for i in range(25)])
+        expected = self.conn.execute("SELECT a, v FROM codes ORDER BY a, b").fetchall()
+
+        paginator = DataPaginator(page_size=10)
+        paginator.set_total_rows(25)
+        pages = [paginator.get_page_data(self.conn, "codes", p, ["v"])[0] for p in range(3)]
+        self.assertEqual(sum(pages, []), expected)
+
+
+class ProgressiveLoaderTests(unittest.TestCase):
+    def test_chunks_seek_from_previous_boundary(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(12)])
+        conn.execute("DELETE FROM t WHERE v IN (2, 3)")
+
+        loader = ProgressiveLoader(chunk_size=4)
+        chunks = [loader.load_chunk(conn, "t", i, ["v"]) for i in range(3)]
+        values = [row[1] for chunk in chunks for row in chunk]
+        self.assertEqual(values, [0, 1, 4, 5, 6, 7, 8, 9, 10, 11])
+        conn.close()
+
+
+class SmartCacheTests(unittest.TestCase):
+    def page(self, rows=100):
+        return [(i, f"name{i}", i * 1.5) for i in range(rows)]
+
+    def test_running_total_tracks_set_and_replace(self):
+        cache = SmartCache(max_size_mb=1)
+        cache.set("a", self.page())
+        cache.set("b", self.page(), size=1000)
+        self.assertEqual(cache.total_size, estimate_size(self.page()) + 1000)
+
+        cache.set("b", self.page(), size=10)
+        self.assertEqual(cache.total_size, estimate_size(self.page()) + 10)
+        self.assertTrue(cache.delete("a"))
+        self.assertEqual(cache.total_size, 10)
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = SmartCache(max_size_mb=1)
+        cache.max_size_bytes = 300
+        for key in ("a", "b", "c"):
+            cache.set(key, key, size=100)
+        cache.get("a")
+        cache.set("d", "d", size=100)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "a")
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    def test_lfu_evicts_least_frequently_used(self):
+        cache = SmartCache(max_size_mb=1, policy='lfu')
+        cache.max_size_bytes = 300
+        for key in ("a", "b", "c"):
+            cache.set(key, key, size=100)
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        cache.set("d", "d", size=100)
+
+        self.assertIsNone(cache.get("c"))
+        cache.set("e", "e", size=100)  # d (0 erişim) çıkar
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(cache.get("a"), "a")
+
+    def test_stats_count_hits_and_misses(self):
+        cache = SmartCache(max_size_mb=1)
+        cache.set("a", self.page())
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 50)
+
+    def test_version_mismatch_drops_only_stale_entry(self):
+        cache = SmartCache(max_size_mb=1)
+        cache.set("a", "a", size=10, version=1)
+        cache.set("b", "b", size=10, version=1)
+
+        self.assertIsNone(cache.get("a", version=2))
+        self.assertEqual(cache.get("b", version=1), "b")
+        self.assertEqual(cache.total_size, 10)
+        self.assertEqual(cache.get_stats()['stale'], 1)
+
+    def test_oversized_value_is_not_cached(self):
+        cache = SmartCache(max_size_mb=1)
+        cache.set("a", "a", size=100)
+        cache.set("big", "x", size=2 * 1024 * 1024)
+        self.assertIsNone(cache.get("big"))
+        self.assertEqual(cache.get("a"), "a")
+
+
+class PerformanceMonitorTests(unittest.TestCase):
+    def test_histogram_buckets_cover_values_with_bounded_error(self):
+        histogram = LatencyHistogram(max_seconds=60)
+        memory = len(histogram.counts)
+        for value in list(range(0, 5000)) + [2 ** 20 + 7, 59_999_999]:
+            low, high = histogram._bucket_bounds(histogram._index(value))
+            self.assertTrue(low <= value <= high, value)
+            self.assertLessEqual(high - low, max(value, 1) / 32)
+
+        for ms in range(1, 1001):
+            histogram.record_ns(ms * 1_000_000)
+        histogram.record_ns(10 ** 15)  # Üst sınırın ötesi son kovaya
+        self.assertEqual(len(histogram.counts), memory)
+        self.assertAlmostEqual(histogram.percentile(0.50), 0.5, delta=0.5 * 0.032)
+        self.assertAlmostEqual(histogram.percentile(0.99), 0.99, delta=0.99 * 0.032)
+        self.assertEqual(histogram.summary()['max'], 60.0)
+
+    def test_overlapping_spans_from_threads(self):
+        monitor = PerformanceMonitor()
+        outer = monitor.span('query')
+        with monitor.span('render') as inner:
+            pass
+        self.assertGreaterEqual(outer.stop(), inner.elapsed)
+        outer.stop()  # İkinci stop yeniden kaydetmez
+
+        def work():
+            for _ in range(500):
+                monitor.record('fetch', 0.002)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = monitor.get_stats()
+        self.assertEqual((stats['query']['count'], stats['render']['count']), (1, 1))
+        self.assertEqual(stats['fetch']['count'], 2000)
+        self.assertAlmostEqual(stats['fetch']['p95'], 0.002, delta=0.0001)
+        self.assertNotIn('export', stats)
+        self.assertIn("p99", monitor.format_percentiles('fetch'))
+
+    def test_timed_task_records_only_successful_runs(self):
+        monitor = PerformanceMonitor()
+        monitor.timed_task('export', lambda progress, cancel: (True, "ok"))(None, None)
+        monitor.timed_task('export', lambda progress, cancel: (False, "hata"))(None, None)
+        self.assertEqual(monitor.get_percentiles('export')['count'], 1)
+
+
+class QueryOptimizerEstimateTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.executescript("""
+            CREATE TABLE t (id INTEGER PRIMARY KEY, a INTEGER, c TEXT);
+            CREATE INDEX t_a ON t (a);
+            WITH RECURSIVE s(v) AS (SELECT 1 UNION ALL SELECT v + 1 FROM s WHERE v < 2000)
+            INSERT INTO t (a, c) SELECT v % 100, 'Şebeke işletmecisi' FROM s;
+        """)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_estimate_uses_plan_and_stats_without_running(self):
+        full = QueryOptimizer.estimate_query(self.conn, "SELECT * FROM t x", full_scan_rows=1000)
+        self.assertEqual(full['estimated_rows'], 2000)  # max(rowid), ANALYZE yok
+        self.assertTrue(full['full_scan'])
+        self.assertEqual(full['scans'][0]['table'], 't')  # takma ad çözüldü
+
+        self.conn.execute("ANALYZE")
+        indexed = QueryOptimizer.estimate_query(
+            self.conn, "SELECT * FROM t WHERE a = 5", full_scan_rows=1000)
+        self.assertEqual(indexed['estimated_rows'], 20)  # sqlite_stat1: 2000 satır / 100 değer
+        self.assertFalse(indexed['full_scan'])
+        self.assertEqual(QueryOptimizer.estimate_query(
+            self.conn, "SELECT * FROM t WHERE id = 3")['estimated_rows'], 1)
+        self.assertIsNone(QueryOptimizer.estimate_query(self.conn, "DELETE FROM t"))
+
+    def test_exact_count_keeps_literals(self):
+        query = "SELECT * FROM t WHERE c = 'Şebeke işletmecisi' AND a < 10;"
+        self.assertEqual(QueryOptimizer.estimate_result_size(self.conn, query, exact=True), 200)
+
+    def test_suggest_indexes_only_for_unindexed_foreign_keys(self):
+        self.conn.executescript("""
+            CREATE TABLE lines (id INTEGER PRIMARY KEY, t_id INTEGER REFERENCES t (id),
+                                qty INTEGER, label TEXT);
+        """)
+        self.assertEqual(QueryOptimizer.suggest_indexes(self.conn, "lines"),
+                         ["CREATE INDEX idx_lines_t_id ON `lines`(`t_id`);"])
+        self.conn.execute("CREATE INDEX lines_t ON lines (t_id, qty)")
+        self.assertEqual(QueryOptimizer.suggest_indexes(self.conn, "lines"), [])
+
+    def test_choose_strategy(self):
+        def estimate(rows, full_scan=False):
+            return {'estimated_rows': rows, 'full_scan': full_scan}
+
+        self.assertEqual(QueryOptimizer.choose_strategy(None), 'run')
+        self.assertEqual(QueryOptimizer.choose_strategy(estimate(50, True)), 'warn')
+        self.assertEqual(QueryOptimizer.choose_strategy(estimate(50), 100, 1000), 'run')
+        self.assertEqual(QueryOptimizer.choose_strategy(estimate(500), 100, 1000), 'stream')
+        self.assertEqual(QueryOptimizer.choose_strategy(estimate(5000), 100, 1000), 'paginate')
+
+
+if __name__ == "__main__":
+    unittest.main()
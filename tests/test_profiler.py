@@ -0,0 +1,63 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from utils import profiler
+from utils.profiler import StackSampler
+
+# Uygulamanın gerçek sıcak yolları yerine yalnızca bu testin sınıfı izlenir
+TEST_HOT_PATHS = (('busy', 'BusyImporter.'),)
+
+
+class BusyImporter:
+    @staticmethod
+    def run(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            sum(range(1000))
+
+
+class StackSamplerTests(unittest.TestCase):
+    def test_attributes_hot_path_share_across_threads(self):
+        stop = threading.Event()
+        idle = threading.Thread(target=stop.wait, name="idle")
+        sampler = StackSampler(interval=0.002)
+        sampler.start()
+        idle.start()
+        worker = threading.Thread(target=BusyImporter.run, args=(0.2,), name="importer")
+        worker.start()
+        worker.join()
+        stop.set()
+        idle.join()
+        sampler.stop()
+
+        with mock.patch.object(profiler, "HOT_PATHS", TEST_HOT_PATHS):
+            attribution = sampler.attribution()
+            report = sampler.format_report()
+        self.assertEqual(list(attribution), ["busy"])
+        self.assertIn("busy", report)
+
+        # Mutlak süre yerine pay: importer thread'inin süresinin çoğu sıcak yolda,
+        # aynı sürede örneklenen boştaki thread hiç sayılmaz
+        importer_total = sum(seconds for stack, seconds in sampler.stacks.items()
+                             if stack[0] == "importer")
+        idle_total = sum(seconds for stack, seconds in sampler.stacks.items() if stack[0] == "idle")
+        self.assertGreater(idle_total, 0)
+        self.assertGreater(attribution['busy']['total'] / importer_total, 0.5)
+        self.assertLessEqual(attribution['busy']['total'], importer_total + 1e-9)
+
+        with tempfile.TemporaryDirectory() as directory:
+            success, path = sampler.write_collapsed(os.path.join(directory, "out", "p.collapsed"))
+            self.assertTrue(success)
+            with open(path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        stack, _ = max((line.rsplit(" ", 1) for line in lines if line.startswith("importer;")),
+                       key=lambda item: int(item[1]))
+        self.assertTrue(stack.endswith("test_profiler:BusyImporter.run"))
+
+
+if __name__ == "__main__":
+    unittest.main()
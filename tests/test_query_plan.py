@@ -0,0 +1,54 @@
+import sqlite3
+import unittest
+
+from utils.performance_optimizer import QueryOptimizer
+
+
+class PlanHotspotTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.executescript("""
+            CREATE TABLE orders (id INTEGER PRIMARY KEY, customer INTEGER, month TEXT, total REAL);
+            CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT);
+            WITH RECURSIVE s(v) AS (SELECT 1 UNION ALL SELECT v + 1 FROM s WHERE v < 3000)
+            INSERT INTO orders (customer, month, total) SELECT v % 50, 'm' || (v % 12), v FROM s;
+            INSERT INTO customers (name) SELECT 'c' || id FROM orders WHERE id <= 50;
+        """)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def explain(self, query):
+        success, estimate = QueryOptimizer.explain_query(self.conn, query, full_scan_rows=1000)
+        self.assertTrue(success, estimate)
+        return estimate
+
+    def test_scan_and_sort_hotspots_carry_table_rows(self):
+        estimate = self.explain(
+            "SELECT month, sum(total) FROM orders o WHERE month = 'm1' GROUP BY month ORDER BY 2")
+        kinds = {h['kind'] for h in estimate['hotspots']}
+        self.assertIn('full_scan', kinds)
+        self.assertIn('temp_btree', kinds)
+        scan = next(h for h in estimate['hotspots'] if h['kind'] == 'full_scan')
+        self.assertEqual(scan['tables'], [('orders', 3000)])
+
+        node_ids = {node['id'] for node in estimate['plan']}
+        self.assertTrue(all(h['id'] in node_ids for h in estimate['hotspots']))
+
+    def test_automatic_index_and_dml_plans(self):
+        estimate = self.explain(
+            "SELECT * FROM customers c JOIN orders o ON o.customer = c.id")
+        self.assertTrue(any(h['kind'] in ('automatic_index', 'full_scan')
+                            for h in estimate['hotspots']))
+
+        self.conn.execute("CREATE INDEX orders_month ON orders (month)")
+        estimate = self.explain("DELETE FROM orders WHERE month = 'm3'")
+        self.assertEqual(estimate['hotspots'], [])
+
+    def test_multiple_statements_are_rejected(self):
+        success, message = QueryOptimizer.explain_query(self.conn, "SELECT 1; SELECT 2")
+        self.assertFalse(success)
+
+
+if __name__ == "__main__":
+    unittest.main()
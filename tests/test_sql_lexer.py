@@ -0,0 +1,85 @@
+import sqlite3
+import unittest
+
+from utils.performance_optimizer import QueryOptimizer
+from utils.sql_lexer import (fingerprint, has_outer_limit, normalize, split_statements, statement_at,
+                             statement_kind, wrap_with_limit)
+
+
+class StatementKindTests(unittest.TestCase):
+    def test_leading_comments_and_values(self):
+        self.assertEqual(statement_kind("-- not\n/* x */ SELECT 1"), 'select')
+        self.assertEqual(statement_kind("VALUES (1), (2)"), 'select')
+        self.assertEqual(statement_kind("REPLACE INTO t VALUES (1)"), 'modify')
+        self.assertEqual(statement_kind("  -- yalnızca yorum"), 'empty')
+
+    def test_with_uses_outer_verb(self):
+        self.assertEqual(statement_kind(
+            "WITH x AS (SELECT 1) INSERT INTO t SELECT * FROM x"), 'modify')
+        self.assertEqual(statement_kind(
+            "WITH d AS (DELETE FROM t RETURNING 1) SELECT 1"), 'select')
+
+
+class SplitStatementsTests(unittest.TestCase):
+    def test_semicolons_in_strings_comments_and_triggers(self):
+        script = (
+            "INSERT INTO t VALUES ('a;b'); -- c;d\n"
+            "CREATE TRIGGER tr AFTER INSERT ON t BEGIN\n"
+            "  UPDATE t SET v = CASE WHEN 1 THEN 'x' END; DELETE FROM t;\n"
+            "END;\n"
+            ";; SELECT \"x;y\" FROM t"
+        )
+        parts = split_statements(script)
+        self.assertEqual(len(parts), 3)
+        self.assertTrue(parts[1].startswith("-- c;d\nCREATE TRIGGER"))
+        self.assertTrue(parts[1].endswith("END"))
+        self.assertEqual(parts[2], 'SELECT "x;y" FROM t')
+
+    def test_statement_at_cursor(self):
+        script = "SELECT 1;\nSELECT 2; -- x\n\nSELECT 3"
+        self.assertEqual(statement_at(script, 9), "SELECT 1")   # ';' hemen sonrası
+        self.assertEqual(statement_at(script, 12), "SELECT 2")
+        self.assertTrue(statement_at(script, len(script)).endswith("SELECT 3"))
+
+
+class LimitTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE t (limit_date TEXT, v INTEGER)")
+        self.conn.executemany("INSERT INTO t VALUES (?, ?)", [("d", i) for i in range(20)])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_outer_limit_detection(self):
+        self.assertFalse(has_outer_limit("SELECT limit_date FROM t WHERE v = 'LIMIT'"))
+        self.assertFalse(has_outer_limit("SELECT * FROM (SELECT v FROM t LIMIT 3)"))
+        self.assertTrue(has_outer_limit("SELECT v FROM t ORDER BY v LIMIT 3"))
+
+    def test_wrapped_query_survives_trailing_comment_and_union(self):
+        query = "SELECT v FROM t UNION ALL SELECT v FROM t ORDER BY v; -- sonuna yorum"
+        rows = self.conn.execute(wrap_with_limit(query, 5)).fetchall()
+        self.assertEqual(rows, [(0,), (0,), (1,), (1,), (2,)])
+
+    def test_add_limit_if_missing(self):
+        optimized, changed = QueryOptimizer.add_limit_if_missing(
+            "SELECT limit_date FROM t", limit=4)
+        self.assertTrue(changed)
+        self.assertEqual(len(self.conn.execute(optimized).fetchall()), 4)
+
+        for query in ("SELECT v FROM t LIMIT 2", "UPDATE t SET v = 1",
+                      "SELECT 1; SELECT 2"):
+            self.assertEqual(QueryOptimizer.add_limit_if_missing(query), (query, False))
+
+    def test_normalize_keeps_literals(self):
+        self.assertEqual(normalize("SELECT  'a   b' -- x\n FROM\tt ;"), "SELECT 'a   b' FROM t")
+
+    def test_fingerprint_replaces_literals(self):
+        expected = "SELECT * FROM T WHERE ID IN ( ? ) AND X = ?"
+        self.assertEqual(fingerprint("select * from t where id in (1, 2, 3) and x = -4;"), expected)
+        self.assertEqual(fingerprint("SELECT *\nFROM t -- yorum\nWHERE id IN (:a) AND x = 'y'"), expected)
+        self.assertNotEqual(fingerprint("SELECT a - 1 FROM t"), fingerprint("SELECT a FROM t"))
+
+
+if __name__ == "__main__":
+    unittest.main()
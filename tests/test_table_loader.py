@@ -0,0 +1,93 @@
+import sqlite3
+import unittest
+
+from utils.table_loader import load_rows, unique_column_names
+
+
+class LoadRowsTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.rows = [(i, f"name{i}") for i in range(25)]
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_creates_table_and_inserts_in_chunks(self):
+        chunks = []
+        success, result = load_rows(self.conn, "t", ["id", "name"], ["INTEGER", "TEXT"],
+                                    iter(self.rows), chunk_size=10, commit_every=20,
+                                    on_chunk=chunks.append)
+
+        self.assertTrue(success)
+        self.assertEqual(result['rows'], 25)
+        self.assertGreaterEqual(result['elapsed'], 0)
+        self.assertEqual(chunks, [10, 20, 25])
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM t").fetchone(), (25,))
+
+    def test_replace_append_and_fail_modes(self):
+        load_rows(self.conn, "t", ["id", "name"], ["INTEGER", "TEXT"], self.rows)
+        load_rows(self.conn, "t", ["id", "name"], ["INTEGER", "TEXT"], self.rows, if_exists='append')
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM t").fetchone(), (50,))
+
+        load_rows(self.conn, "t", ["id", "name"], ["INTEGER", "TEXT"], self.rows[:3], if_exists='replace')
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM t").fetchone(), (3,))
+
+        success, _ = load_rows(self.conn, "t", ["id", "name"], ["INTEGER", "TEXT"], self.rows, if_exists='fail')
+        self.assertFalse(success)
+
+    def test_cancel_keeps_only_committed_rows(self):
+        calls = []
+
+        def cancel_check():
+            calls.append(1)
+            return len(calls) > 3
+
+        success, result = load_rows(self.conn, "t", ["id", "name"], ["INTEGER", "TEXT"],
+                                    self.rows, chunk_size=5, commit_every=10,
+                                    cancel_check=cancel_check)
+
+        self.assertTrue(success)
+        self.assertTrue(result['cancelled'])
+        self.assertEqual(result['rows'], 10)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM t").fetchone(), (10,))
+
+    def test_cancelled_replace_keeps_original_table(self):
+        load_rows(self.conn, "t", ["id", "name"], ["INTEGER", "TEXT"], self.rows)
+        calls = []
+
+        def cancel_check():
+            calls.append(1)
+            return len(calls) > 3  # İlk commit'ten (10 satır) sonra iptal
+
+        success, result = load_rows(self.conn, "t", ["code"], ["TEXT"],
+                                    [(f"c{i}",) for i in range(25)], if_exists='replace',
+                                    chunk_size=5, commit_every=10, cancel_check=cancel_check)
+
+        self.assertTrue(success)
+        self.assertTrue(result['cancelled'])
+        self.assertEqual(result['rows'], 0)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM t").fetchone(), (25,))
+        self.assertEqual([row[1] for row in self.conn.execute("PRAGMA table_info(t)")], ["id", "name"])
+        tables = [row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        self.assertEqual(tables, ["t"])
+
+    def test_failed_replace_keeps_original_table(self):
+        load_rows(self.conn, "t", ["id", "name"], ["INTEGER", "TEXT"], self.rows)
+        rows = [("a",)] * 12 + [("b", "fazla")]  # Son parça sütun sayısı yüzünden hata verir
+
+        success, _ = load_rows(self.conn, "t", ["code"], ["TEXT"], rows, if_exists='replace',
+                               chunk_size=6, commit_every=6)
+
+        self.assertFalse(success)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM t").fetchone(), (25,))
+        self.assertIsNone(self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 't__import'").fetchone())
+
+    def test_unique_column_names(self):
+        self.assertEqual(unique_column_names(["a", "", None, "a"]),
+                         ["a", "column_2", "column_3", "a_4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
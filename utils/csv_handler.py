@@ -6,7 +6,72 @@ CSV import/export ve dönüşüm işlemleri
 import pandas as pd
 import csv
 import os
-from typing import List, Dict, Tuple, Optional
+import sqlite3
+from itertools import islice, chain
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Callable, Any
+
+from utils.table_loader import load_rows, unique_column_names
+
+
+def _parse_int(value: str) -> int:
+    # '007' gibi baştaki sıfırlar kod/numara olabilir, tam sayı sayma
+    if '_' in value or (len(value) > 1 and value.lstrip('+-').startswith('0')):
+        raise ValueError(value)
+    return int(value)
+
+
+def _parse_real(value: str) -> float:
+    # float() 'nan', 'inf' ve '1_000' kabul eder; bunlar CSV'de metindir
+    digits = value.lstrip('+-')
+    if ('_' in value or not any(ch.isdigit() for ch in value)
+            or (len(digits) > 1 and digits[0] == '0' and digits[1].isdigit())):
+        raise ValueError(value)
+    return float(value)
+
+
+_TYPE_PARSERS = {'INTEGER': _parse_int, 'REAL': _parse_real}
+
+
+def infer_column_types(rows: List[List[str]], column_count: int) -> List[str]:
+    """
+    Örnek satırlardan SQLite sütun tiplerini çıkar
+    Boş olmayan tüm değerler tam sayıysa INTEGER, sayıysa REAL, aksi halde TEXT.
+    """
+    types = []
+    for index in range(column_count):
+        values = [row[index].strip() for row in rows
+                  if index < len(row) and row[index].strip()]
+        column_type = 'TEXT'
+        for candidate in ('INTEGER', 'REAL'):
+            try:
+                for value in values:
+                    _TYPE_PARSERS[candidate](value)
+            except ValueError:
+                continue
+            if values:
+                column_type = candidate
+            break
+        types.append(column_type)
+    return types
+
+
+def _convert_row(row: List[str], types: List[str]) -> tuple:
+    """CSV satırını tiplerine göre çevir (uymayan değer metin olarak kalır)"""
+    values = []
+    for index, column_type in enumerate(types):
+        value = row[index].strip() if index < len(row) else ''
+        if not value:
+            values.append(None)
+            continue
+        parser = _TYPE_PARSERS.get(column_type)
+        if parser is None:
+            values.append(value)
+            continue
+        try:
+            values.append(parser(value))
+        except ValueError:
+            values.append(value)
+    return tuple(values)
 
 
 class CSVHandler:
@@ -38,10 +103,10 @@ class CSVHandler:
             return False, f"CSV okuma hatası: {str(e)}"
 
     @staticmethod
-    def detect_delimiter(file_path: str, sample_size: int = 10) -> str:
+    def detect_delimiter(file_path: str, sample_size: int = 10, encoding: str = 'utf-8') -> str:
         """CSV delimiter'ını otomatik algıla"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(file_path, 'r', encoding=encoding) as f:
                 sample = ''.join([f.readline() for _ in range(sample_size)])
 
             # csv.Sniffer kullanarak delimiter'ı tahmin et
@@ -57,10 +122,10 @@ class CSVHandler:
     def detect_encoding(file_path: str) -> str:
         """Dosya encoding'ini algıla"""
         try:
-            # Önce UTF-8 dene
+            # Önce UTF-8 dene (Excel'in yazdığı BOM başlığa karışmasın)
             with open(file_path, 'r', encoding='utf-8') as f:
-                f.read(1000)
-            return 'utf-8'
+                head = f.read(1000)
+            return 'utf-8-sig' if head.startswith('\ufeff') else 'utf-8'
         except UnicodeDecodeError:
             # UTF-8 değilse latin1 dene
             try:
@@ -71,25 +136,102 @@ class CSVHandler:
                 return 'cp1252'  # Windows default
 
     @staticmethod
-    def export_to_csv(data: List[List], columns: List[str], file_path: str,
+    def export_to_csv(data: Iterable, columns: List[str], file_path: str,
                       encoding: str = 'utf-8', delimiter: str = ',') -> Tuple[bool, str]:
-        """Veriyi CSV'ye aktar"""
+        """
+        Veriyi CSV'ye aktar
+        data: satır listesi ya da akış (StreamingResult / satır iterator'ı);
+        akışlar DataFrame'e çevrilmeden satır satır yazılır.
+        """
         try:
-            df = pd.DataFrame(data, columns=columns)
-            df.to_csv(file_path, index=False, encoding=encoding, sep=delimiter)
+            if isinstance(data, list):
+                df = pd.DataFrame(data, columns=columns)
+                df.to_csv(file_path, index=False, encoding=encoding, sep=delimiter)
+            else:
+                rows = data.iter_rows() if hasattr(data, 'iter_rows') else data
+                with open(file_path, 'w', encoding=encoding, newline='') as f:
+                    writer = csv.writer(f, delimiter=delimiter)
+                    writer.writerow(columns)
+                    writer.writerows(rows)
 
             return True, f"CSV'ye aktarıldı: {os.path.basename(file_path)}"
 
         except Exception as e:
             return False, f"CSV export hatası: {str(e)}"
 
+    @staticmethod
+    def import_csv_to_table(conn: sqlite3.Connection, file_path: str, table_name: str,
+                            if_exists: str = 'append', encoding: Optional[str] = None,
+                            delimiter: Optional[str] = None, chunk_size: int = 5000,
+                            commit_every: int = 50000, sample_rows: int = 1000,
+                            progress_callback: Optional[Callable[[int, float], None]] = None,
+                            cancel_check: Optional[Callable[[], bool]] = None) -> Tuple[bool, Any]:
+        """
+        CSV dosyasını parça parça doğrudan SQLite tablosuna aktar
+
+        Dosya csv modülüyle satır satır okunur; bellek kullanımı dosya boyutuna
+        değil chunk_size'a bağlıdır. Sütun tipleri ilk sample_rows satırdan
+        çıkarılır, tablo yoksa (ya da if_exists='replace' ise) oluşturulur.
+        Her parça executemany ile yazılır ve commit_every satırda bir commit edilir.
+
+        Args:
+            if_exists: 'append' (varsa altına ekle), 'replace' (sil ve yeniden oluştur), 'fail'
+            progress_callback: (aktarılan_satır, oran 0..1) ile her parçada çağrılır
+            cancel_check: True dönerse aktarım durur; commit edilmemiş parça geri alınır
+
+        Returns:
+            (başarılı_mı, {'rows', 'columns', 'types', 'cancelled'} veya hata_mesajı)
+        """
+        if not os.path.exists(file_path):
+            return False, "Dosya bulunamadı!"
+
+        encoding = encoding or CSVHandler.detect_encoding(file_path)
+        delimiter = delimiter or CSVHandler.detect_delimiter(file_path, encoding=encoding)
+        file_size = max(1, os.path.getsize(file_path))
+        position = [0]
+
+        def counted_lines(f) -> Iterator[str]:
+            # Satır uzunluklarından yaklaşık ilerleme (csv okuyucu tell()'i kapatır)
+            for line in f:
+                position[0] += len(line)
+                yield line
+
+        try:
+            with open(file_path, 'r', encoding=encoding, newline='') as f:
+                reader = csv.reader(counted_lines(f), delimiter=delimiter)
+                header = next(reader, None)
+                if not header:
+                    return False, "CSV dosyası boş!"
+
+                columns = unique_column_names(header)
+                sample = list(islice(reader, sample_rows))
+                types = infer_column_types(sample, len(columns))
+
+                rows = (_convert_row(row, types) for row in chain(sample, reader) if row)
+
+                def on_chunk(imported: int):
+                    if progress_callback:
+                        progress_callback(imported, min(1.0, position[0] / file_size))
+
+                success, result = load_rows(conn, table_name, columns, types, rows,
+                                            if_exists=if_exists, chunk_size=chunk_size,
+                                            commit_every=commit_every, on_chunk=on_chunk,
+                                            cancel_check=cancel_check)
+
+            if not success:
+                return False, f"CSV import hatası: {result}"
+            return True, result
+
+        except Exception as e:
+            return False, f"CSV import hatası: {str(e)}"
+
     @staticmethod
     def get_csv_info(file_path: str) -> Dict:
         """CSV dosyası hakkında bilgi al"""
         try:
             # Encoding'i algıla
             encoding = CSVHandler.detect_encoding(file_path)
-            delimiter = CSVHandler.detect_delimiter(file_path)
+            delimiter = CSVHandler.detect_delimiter(file_path, encoding=encoding)
 
             # İlk 5 satırı oku
             df_sample = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter, nrows=5)
@@ -179,7 +321,7 @@ class CSVHandler:
         try:
             # CSV'yi oku
             encoding = CSVHandler.detect_encoding(csv_path)
-            delimiter = CSVHandler.detect_delimiter(csv_path)
+            delimiter = CSVHandler.detect_delimiter(csv_path, encoding=encoding)
             df = pd.read_csv(csv_path, encoding=encoding, delimiter=delimiter)
 
             # Temizle
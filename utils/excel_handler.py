@@ -5,9 +5,136 @@ Import/Export ve formatlama işlemleri
 
 import pandas as pd
 from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from typing import List, Dict, Tuple, Optional
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.utils import get_column_letter
+from itertools import chain, islice
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Callable, Any
 import os
+import sqlite3
+from datetime import date, datetime, time
+
+from utils.table_loader import load_rows, unique_column_names
+
+# Paylaşılan stiller
+_HEADER_STYLE = "sql_panel_header"
+_THIN_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
+                      top=Side(style='thin'), bottom=Side(style='thin'))
+_ZEBRA_FILL = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
+
+_EXCEL_MAX_DATA_ROWS = 1048575  # Başlık hariç
+_PROGRESS_EVERY = 1000
+
+
+def _flatten_batches(rows: Iterable) -> Iterator:
+    """Satır ya da satır listesi (fetchmany batch'i) üreten kaynağı satırlara aç"""
+    for item in rows:
+        if isinstance(item, list) and (not item or isinstance(item[0], (list, tuple))):
+            yield from item
+        else:
+            yield item
+
+
+def _infer_excel_types(rows: List[tuple], column_count: int) -> List[str]:
+    """
+    Örnek satırlardaki hücre tiplerinden SQLite sütun tiplerini çıkar
+    Hepsi tam sayıysa INTEGER, sayıysa REAL, tarih/saatse DATETIME, aksi halde TEXT.
+    """
+    types = []
+    for index in range(column_count):
+        kinds = set()
+        for row in rows:
+            value = row[index] if index < len(row) else None
+            if value is None or value == '':
+                continue
+            if isinstance(value, bool):
+                kinds.add('INTEGER')
+            elif isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+                kinds.add('INTEGER')
+            elif isinstance(value, float):
+                kinds.add('REAL')
+            elif isinstance(value, (datetime, date, time)):
+                kinds.add('DATETIME')
+            else:
+                kinds.add('TEXT')
+
+        if kinds == {'INTEGER'}:
+            types.append('INTEGER')
+        elif kinds and kinds <= {'INTEGER', 'REAL'}:
+            types.append('REAL')
+        elif kinds == {'DATETIME'}:
+            types.append('DATETIME')
+        else:
+            types.append('TEXT')
+    return types
+
+
+def _coerce_excel_value(value: Any, column_type: str) -> Any:
+    """Hücre değerini sütun tipine göre çevir (uymayan değer olduğu gibi kalır)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if column_type == 'INTEGER' and isinstance(value, float) and value.is_integer():
+        return int(value)
+    if column_type == 'REAL' and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if column_type == 'TEXT' and not isinstance(value, str):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value)
+    return value
+
+
+def _coerce_excel_row(row: tuple, types: List[str]) -> tuple:
+    return tuple(_coerce_excel_value(row[index] if index < len(row) else None, column_type)
+                 for index, column_type in enumerate(types))
+
+
+def _sheet_rows(worksheet) -> Tuple[List[str], Iterator[tuple]]:
+    """
+    read_only sayfanın sütun adları ve veri satırları (tembel)
+    Sağdaki boş başlık sütunları ve tamamen boş satırlar atlanır.
+    Returns: (sütun_adları, satır iterator'ı); başlık yoksa sütun listesi boştur
+    """
+    row_iter = worksheet.iter_rows(values_only=True)
+    header = next(row_iter, None)
+    if not header:
+        return [], iter(())
+
+    width = len(header)
+    while width and header[width - 1] in (None, ''):
+        width -= 1
+    data_rows = (row[:width] for row in row_iter
+                 if any(value not in (None, '') for value in row[:width]))
+    return unique_column_names(header[:width]), data_rows
+
+
+def _discard_workbook(workbook: Workbook):
+    """
+    Kaydedilmeyen write_only çalışma kitabının geçici sayfa dosyalarını sil
+    (openpyxl bunları ancak save() ya da süreç kapanışında temizler)
+    """
+    for worksheet in workbook.worksheets:
+        writer = getattr(worksheet, '_writer', None)
+        if writer is None or not os.path.exists(writer.out):
+            continue  # Hiç satır yazılmadı ya da save() temizledi
+        if not worksheet.closed:
+            worksheet.close()
+        writer.cleanup()
+
+
+def _excel_value(value: Any) -> Any:
+    """SQLite değerini openpyxl'in yazabileceği biçime getir"""
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
 
 
 class ExcelHandler:
@@ -34,6 +161,103 @@ class ExcelHandler:
         except Exception as e:
             return False, f"Excel okuma hatası: {str(e)}"
 
+    @staticmethod
+    def import_excel_to_table(conn: sqlite3.Connection, file_path: str, table_name: str,
+                              sheet_name: Optional[str] = None, if_exists: str = 'append',
+                              chunk_size: int = 5000, commit_every: int = 50000,
+                              sample_rows: int = 1000,
+                              progress_callback: Optional[Callable[[int, float], None]] = None,
+                              cancel_check: Optional[Callable[[], bool]] = None) -> Tuple[bool, Any]:
+        """
+        Excel sayfasını openpyxl read_only modunda satır satır tabloya aktar
+
+        Çalışma kitabı belleğe alınmaz; satırlar tembel okunur, sütun tipleri
+        ilk sample_rows satırdan çıkarılır ve her değer o tipe göre çevrilir
+        (tarihler 'YYYY-MM-DD HH:MM:SS' metni olur). Yazma ortak tablo
+        yükleyicisiyle executemany parçaları halinde yapılır.
+
+        Returns:
+            (başarılı_mı, {'rows', 'columns', 'types', 'cancelled'} veya hata_mesajı)
+        """
+        if not os.path.exists(file_path):
+            return False, "Dosya bulunamadı!"
+
+        workbook = None
+        try:
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+
+            columns, data_rows = _sheet_rows(worksheet)
+            if not columns:
+                return False, "Excel sayfası boş!"
+
+            sample = list(islice(data_rows, sample_rows))
+            types = _infer_excel_types(sample, len(columns))
+
+            rows = (_coerce_excel_row(row, types) for row in chain(sample, data_rows))
+            total_rows = max(1, (worksheet.max_row or 1) - 1)
+
+            def on_chunk(imported: int):
+                if progress_callback:
+                    progress_callback(imported, min(1.0, imported / total_rows))
+
+            success, result = load_rows(conn, table_name, columns, types, rows,
+                                        if_exists=if_exists, chunk_size=chunk_size,
+                                        commit_every=commit_every, on_chunk=on_chunk,
+                                        cancel_check=cancel_check)
+            if not success:
+                return False, f"Excel import hatası: {result}"
+            return True, result
+
+        except Exception as e:
+            return False, f"Excel import hatası: {str(e)}"
+        finally:
+            if workbook is not None:
+                workbook.close()
+
+    @staticmethod
+    def read_excel_header(file_path: str, sheet_name: Optional[str] = None) -> Tuple[bool, Any]:
+        """
+        Sayfanın sütun adlarını ve tahmini satır sayısını oku (read_only, yalnızca ilk satır)
+        Returns: (başarılı_mı, {'columns', 'rows'} veya hata_mesajı)
+        """
+        if not os.path.exists(file_path):
+            return False, "Dosya bulunamadı!"
+
+        workbook = None
+        try:
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            columns, _ = _sheet_rows(worksheet)
+            if not columns:
+                return False, "Excel sayfası boş!"
+            return True, {'columns': columns, 'rows': max(0, (worksheet.max_row or 1) - 1)}
+
+        except Exception as e:
+            return False, f"Excel okuma hatası: {str(e)}"
+        finally:
+            if workbook is not None:
+                workbook.close()
+
+    @staticmethod
+    def iter_excel_rows(file_path: str, columns: List[str],
+                        sheet_name: Optional[str] = None) -> Iterator[tuple]:
+        """
+        Seçili sütunları read_only modda satır satır üret (DataFrame oluşturulmaz)
+        Tarih/saat hücreleri metne, boş hücreler None'a çevrilir; çalışma kitabı
+        iterator tükenince ya da kapatılınca kapanır. Sütun yoksa ValueError.
+        """
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            header, data_rows = _sheet_rows(worksheet)
+            indexes = [header.index(column) for column in columns]
+            for row in data_rows:
+                yield tuple(_coerce_excel_value(row[index] if index < len(row) else None, '')
+                            for index in indexes)
+        finally:
+            workbook.close()
+
     @staticmethod
     def get_sheet_names(file_path: str) -> Tuple[bool, any]:
         """
@@ -41,94 +265,150 @@ class ExcelHandler:
         Returns: (başarılı_mı, sayfa_listesi veya hata_mesajı)
         """
         try:
-            xl_file = pd.ExcelFile(file_path)
-            return True, xl_file.sheet_names
+            # read_only: sadece çalışma kitabı kataloğu okunur
+            workbook = load_workbook(file_path, read_only=True)
+            sheet_names = workbook.sheetnames
+            workbook.close()
+            return True, sheet_names
 
         except Exception as e:
             return False, f"Sayfa isimleri okunamadı: {str(e)}"
 
     @staticmethod
-    def export_to_excel(data: List[List], columns: List[str], file_path: str,
-                        sheet_name: str = "Veri", styled: bool = True) -> Tuple[bool, str]:
+    def export_to_excel(data: Iterable, columns: List[str], file_path: str,
+                        sheet_name: str = "Veri", styled: bool = True,
+                        progress_callback: Optional[Callable[[int, float], None]] = None,
+                        cancel_check: Optional[Callable[[], bool]] = None) -> Tuple[bool, str]:
         """
         Veriyi Excel'e aktar
+        data: satır listesi ya da akış (StreamingResult / satır iterator'ı / batch iterator'ı);
+        satırlar write_only çalışma kitabına akıtılır, DataFrame oluşturulmaz.
         """
         try:
-            # DataFrame oluştur
-            df = pd.DataFrame(data, columns=columns)
-
-            if styled:
-                # Styled Excel export
-                return ExcelHandler._export_styled(df, file_path, sheet_name)
+            if hasattr(data, 'iter_rows'):
+                rows = data.iter_rows()
             else:
-                # Basit export
-                df.to_excel(file_path, sheet_name=sheet_name, index=False)
-                return True, f"Excel'e aktarıldı: {file_path}"
+                rows = data
+            total = len(data) if isinstance(data, (list, tuple)) else None
+
+            return ExcelHandler.export_stream(rows, columns, file_path, sheet_name, styled,
+                                              total_rows=total,
+                                              progress_callback=progress_callback,
+                                              cancel_check=cancel_check)
 
         except Exception as e:
             return False, f"Excel'e aktarma hatası: {str(e)}"
 
     @staticmethod
-    def _export_styled(df: pd.DataFrame, file_path: str, sheet_name: str) -> Tuple[bool, str]:
-        """Stillendirilmiş Excel export"""
+    def _register_styles(workbook: Workbook):
+        """Başlık stilini paylaşılan named style olarak ekle"""
+        header = NamedStyle(name=_HEADER_STYLE)
+        header.font = Font(bold=True, color="FFFFFF", size=11)
+        header.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        header.alignment = Alignment(horizontal='center', vertical='center')
+        header.border = _THIN_BORDER
+        workbook.add_named_style(header)
+
+    @staticmethod
+    def _add_row_styles(worksheet, column_count: int, row_count: int):
+        """
+        Veri satırlarına kenarlık ve zebra rengi ver
+        Hücre başına stil yerine tüm aralığa tek bir paylaşılan koşullu
+        biçim kuralı eklenir; satır sayısı yazma maliyetini değiştirmez.
+        """
+        if not column_count or not row_count:
+            return
+        cell_range = f"A2:{get_column_letter(column_count)}{row_count + 1}"
+        worksheet.conditional_formatting.add(
+            cell_range, FormulaRule(formula=['TRUE()'], border=_THIN_BORDER))
+        worksheet.conditional_formatting.add(
+            cell_range, FormulaRule(formula=['MOD(ROW(),2)=0'], fill=_ZEBRA_FILL))
+
+    @staticmethod
+    def export_stream(rows: Iterable, columns: List[str], file_path: str,
+                      sheet_name: str = "Veri", styled: bool = True,
+                      total_rows: Optional[int] = None, sample_size: int = 200,
+                      progress_callback: Optional[Callable[[int, float], None]] = None,
+                      cancel_check: Optional[Callable[[], bool]] = None) -> Tuple[bool, str]:
+        """
+        Satırları openpyxl write_only çalışma kitabına akıtarak yaz
+
+        Bellek kullanımı satır sayısından bağımsızdır. Sütun genişlikleri ilk
+        sample_size satırdan hesaplanır (write_only modda satırlardan önce
+        ayarlanmalıdır). Başlık paylaşılan named style ile, veri satırlarının
+        zebra/kenarlık stili tek bir koşullu biçim kuralıyla verilir; veri
+        hücreleri stil nesnesi taşımaz. rows, satır ya da satır listesi
+        (batch) üretebilir. İptal ya da hata durumunda yarım çıktı (geçici
+        sayfa dosyaları, yarım .xlsx) silinir; hedef dosyaya dokunulmaz.
+        """
+        workbook = None
+        temp_path = file_path + ".tmp"
         try:
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-                workbook = writer.book
-                worksheet = writer.sheets[sheet_name]
-
-                # Header stilleri
-                header_font = Font(bold=True, color="FFFFFF", size=11)
-                header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-                header_alignment = Alignment(horizontal='center', vertical='center')
-
-                # Border
-                thin_border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-
-                # Header formatla
-                for col_num, column_title in enumerate(df.columns, 1):
-                    cell = worksheet.cell(row=1, column=col_num)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                    cell.border = thin_border
-
-                # Sütun genişliklerini ayarla
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-
-                    adjusted_width = min((max_length + 2) * 1.2, 50)  # Max 50
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-
-                # Veri satırlarını formatla (zebra pattern)
-                for row_num in range(2, len(df) + 2):
-                    for col_num in range(1, len(df.columns) + 1):
-                        cell = worksheet.cell(row=row_num, column=col_num)
-                        cell.border = thin_border
-                        cell.alignment = Alignment(horizontal='left')
-
-                        # Zebra pattern
-                        if row_num % 2 == 0:
-                            cell.fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
-
-            return True, f"Stillendirilmiş Excel oluşturuldu: {os.path.basename(file_path)}"
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet(title=sheet_name[:31] or "Veri")
+            if styled:
+                ExcelHandler._register_styles(workbook)
+
+            iterator = _flatten_batches(rows)
+            sample = list(islice(iterator, sample_size))
+
+            # Sütun genişliklerini örnekten ayarla
+            for index, column in enumerate(columns):
+                max_length = len(str(column))
+                for row in sample:
+                    if index < len(row) and row[index] is not None:
+                        max_length = max(max_length, len(str(row[index])))
+                width = min((max_length + 2) * 1.2, 50)  # Max 50
+                worksheet.column_dimensions[get_column_letter(index + 1)].width = width
+
+            if styled:
+                header = []
+                for column in columns:
+                    cell = WriteOnlyCell(worksheet, value=str(column))
+                    cell.style = _HEADER_STYLE
+                    header.append(cell)
+                worksheet.append(header)
+            else:
+                worksheet.append([str(column) for column in columns])
+
+            written = 0
+            truncated = False
+            for row in chain(sample, iterator):
+                if written >= _EXCEL_MAX_DATA_ROWS:
+                    truncated = True
+                    break
+
+                worksheet.append([_excel_value(value) for value in row])
+                written += 1
+
+                if written % _PROGRESS_EVERY == 0:
+                    if cancel_check and cancel_check():
+                        _discard_workbook(workbook)
+                        return False, "⛔ Excel aktarımı iptal edildi"
+                    if progress_callback:
+                        fraction = written / total_rows if total_rows else 0.0
+                        progress_callback(written, min(1.0, fraction))
+
+            if styled:
+                ExcelHandler._add_row_styles(worksheet, len(columns), written)
+            # Yarım dosya hedefin üzerine yazılmasın: önce geçici ada kaydet
+            workbook.save(temp_path)
+            os.replace(temp_path, file_path)
+            if progress_callback:
+                progress_callback(written, 1.0)
+
+            message = f"Stillendirilmiş Excel oluşturuldu: {os.path.basename(file_path)}" if styled \
+                else f"Excel'e aktarıldı: {os.path.basename(file_path)}"
+            if truncated:
+                message += f"\n⚠️ Excel satır sınırı nedeniyle ilk {written:,} satır yazıldı"
+            return True, message
 
         except Exception as e:
-            return False, f"Styled export hatası: {str(e)}"
+            if workbook is not None:
+                _discard_workbook(workbook)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False, f"Styled export hatası: {str(e)}" if styled else f"Excel'e aktarma hatası: {str(e)}"
 
     @staticmethod
     def export_multiple_tables(tables_data: Dict[str, pd.DataFrame],
@@ -0,0 +1,260 @@
+"""
+Metrik Kaydı ve Dışa Aktarma
+Uygulama sayaçları + toplayıcılardan (PerformanceMonitor, önbellekler, sorgu geçmişi)
+Prometheus metin biçimi ve JSON satırları (JSON lines) anlık görüntüleri
+"""
+
+import hashlib
+import json
+import os
+import time
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# (ad, etiketler, değer)
+Sample = Tuple[str, Dict[str, str], float]
+
+_QUANTILES = (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99'))
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+class MetricsRegistry:
+    """
+    Sayaç/gösterge kaydı
+
+    inc()/set() sıcak yolda çağrılır: tek kilit + sözlük güncellemesi, metin
+    üretimi yok. Pahalı değerler (önbellek, geçmiş istatistikleri) yalnızca
+    anlık görüntü alınırken toplayıcılardan (collector) okunur; toplayıcı
+    hata verirse o toplayıcı atlanır, diğer metrikler yazılır.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._values: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._meta: Dict[str, Tuple[str, str]] = {}  # ad -> (tip, açıklama)
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, kind: str, help_text: str):
+        """Metrik tipi ('counter', 'gauge', 'summary') ve açıklaması"""
+        self._meta[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Sayacı artır"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Göstergeyi ayarla"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]):
+        self._collectors.append(collector)
+
+    def collect(self) -> List[Sample]:
+        """Tüm örnekler (kayıtlı değerler + toplayıcılar)"""
+        with self._lock:
+            samples = [(name, dict(labels), value) for (name, labels), value in self._values.items()]
+        for collector in list(self._collectors):
+            try:
+                samples.extend(collector())
+            except Exception:
+                continue  # Ör. kapanmış bağlantı: anlık görüntü yine yazılır
+        return samples
+
+    def _family(self, name: str) -> str:
+        """Örnek adının ait olduğu aile (summary için _count/_sum son ekleri)"""
+        for suffix in ('_count', '_sum'):
+            if name.endswith(suffix) and name[:-len(suffix)] in self._meta:
+                return name[:-len(suffix)]
+        return name
+
+    def render_prometheus(self, samples: Optional[List[Sample]] = None) -> str:
+        """Prometheus metin biçimi (exposition format 0.0.4)"""
+        if samples is None:
+            samples = self.collect()
+        families: Dict[str, List[Sample]] = {}
+        for sample in samples:
+            families.setdefault(self._family(sample[0]), []).append(sample)
+
+        lines = []
+        for family in sorted(families):
+            kind, help_text = self._meta.get(family, ('untyped', ''))
+            if help_text:
+                lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            for name, labels, value in families[family]:
+                lines.append(f"{name}{_format_labels(labels)} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self, samples: Optional[List[Sample]] = None) -> Dict:
+        """JSON satırı için anlık görüntü"""
+        if samples is None:
+            samples = self.collect()
+        return {
+            'timestamp': time.time(),
+            'metrics': [{'name': name, 'labels': labels, 'value': value}
+                        for name, labels, value in samples],
+        }
+
+
+# ---------- Toplayıcılar (duck typing: utils core'a bağımlı olmaz)
+def monitor_collector(monitor) -> Callable[[], List[Sample]]:
+    """PerformanceMonitor histogramları -> app_operation_seconds (summary)"""
+    def collect() -> List[Sample]:
+        samples = []
+        for operation, stats in monitor.get_stats().items():
+            labels = {'operation': operation}
+            for quantile, key in _QUANTILES:
+                samples.append(('app_operation_seconds', {**labels, 'quantile': quantile}, stats[key]))
+            samples.append(('app_operation_seconds_count', labels, stats['count']))
+            samples.append(('app_operation_seconds_sum', labels, stats['avg'] * stats['count']))
+        return samples
+    return collect
+
+
+def cache_collector(name: str, get_stats: Callable[[], Dict]) -> Callable[[], List[Sample]]:
+    """SmartCache.get_stats() -> isabet/ıska/tahliye sayaçları ve doluluk"""
+    def collect() -> List[Sample]:
+        stats = get_stats()
+        labels = {'cache': name}
+        lookups = stats['hits'] + stats['misses']
+        return [
+            ('app_cache_hits_total', labels, stats['hits']),
+            ('app_cache_misses_total', labels, stats['misses']),
+            ('app_cache_evictions_total', labels, stats['evictions']),
+            ('app_cache_items', labels, stats['items']),
+            ('app_cache_size_bytes', labels, stats['size_mb'] * 1024 * 1024),
+            ('app_cache_hit_ratio', labels, stats['hits'] / lookups if lookups else 0.0),
+        ]
+    return collect
+
+
+def query_collector(executor, slow_queries: int = 5) -> Callable[[], List[Sample]]:
+    """
+    QueryExecutor.get_query_statistics() ve en yavaş sorgu kalıpları
+    Sorgu metni etiket olmaz; kalıp parmak izinin kısa özetiyle (query_id) etiketlenir.
+    """
+    def collect() -> List[Sample]:
+        stats = executor.get_query_statistics()
+        samples = [
+            ('app_queries_total', {'status': 'success'}, stats['successful']),
+            ('app_queries_total', {'status': 'failed'}, stats['failed']),
+            ('app_query_cache_hits_total', {}, stats['cache_hits']),
+            ('app_query_seconds_total', {}, stats.get('total_execution_time', 0.0)),
+        ]
+        for entry in executor.get_slowest_queries(slow_queries):
+            if entry['count'] <= entry['failures']:
+                continue  # Hiç başarılı çalışmamış kalıbın süresi yok
+            query_id = hashlib.sha1(entry['fingerprint'].encode('utf-8')).hexdigest()[:12]
+            labels = {'query_id': query_id, 'database': entry['database'] or ''}
+            samples.append(('app_slow_query_p95_seconds', labels, entry['p95']))
+            samples.append(('app_slow_query_runs', labels, entry['count']))
+        return samples
+    return collect
+
+
+def describe_default_metrics(registry: MetricsRegistry):
+    """Uygulamanın yayımladığı metriklerin tip/açıklamaları"""
+    for name, kind, help_text in (
+        ('app_operation_seconds', 'summary', "İşlem süresi (query, fetch, render, page_load, export, import)"),
+        ('app_cache_hits_total', 'counter', "Önbellek isabetleri"),
+        ('app_cache_misses_total', 'counter', "Önbellek ıskaları"),
+        ('app_cache_evictions_total', 'counter', "Önbellekten tahliye edilen girdiler"),
+        ('app_cache_items', 'gauge', "Önbellekteki girdi sayısı"),
+        ('app_cache_size_bytes', 'gauge', "Önbelleğin tahmini boyutu"),
+        ('app_cache_hit_ratio', 'gauge', "Önbellek isabet oranı (0..1)"),
+        ('app_queries_total', 'counter', "Çalıştırılan sorgular (kalıcı geçmişten)"),
+        ('app_query_cache_hits_total', 'counter', "Sonuç önbelleğinden dönen sorgular"),
+        ('app_query_seconds_total', 'counter', "Başarılı sorguların toplam süresi"),
+        ('app_slow_query_p95_seconds', 'gauge', "En yavaş sorgu kalıplarının p95 süresi"),
+        ('app_slow_query_runs', 'gauge', "En yavaş sorgu kalıplarının çalışma sayısı"),
+        ('app_rows_rendered_total', 'counter', "Tablolara çizilmek üzere verilen satırlar"),
+        ('app_import_rows_total', 'counter', "İçe aktarılan satırlar"),
+        ('app_import_seconds_total', 'counter', "İçe aktarmalarda geçen süre"),
+        ('app_imports_total', 'counter', "Tamamlanan içe aktarmalar"),
+    ):
+        registry.describe(name, kind, help_text)
+
+
+def observe_import(registry: MetricsRegistry, source: str, summary: Dict):
+    """load_rows özeti ({'rows', 'elapsed', 'cancelled'}) -> içe aktarma sayaçları"""
+    status = 'cancelled' if summary.get('cancelled') else 'done'
+    registry.inc('app_imports_total', source=source, status=status)
+    registry.inc('app_import_rows_total', summary['rows'], source=source)
+    registry.inc('app_import_seconds_total', summary.get('elapsed', 0.0), source=source)
+
+
+class MetricsExporter:
+    """
+    Periyodik metrik dökümü (arka plan thread'i)
+
+    Her aralıkta prometheus_file atomik olarak yeniden yazılır (node_exporter
+    textfile collector ile okunabilir) ve jsonl_file'a bir satır eklenir;
+    JSON dosyası max_jsonl_bytes'ı aşınca '.1' uzantısıyla bir kez döndürülür.
+    stop() son bir anlık görüntü yazar.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str, interval: float = 60.0,
+                 prometheus_file: str = 'metrics.prom', jsonl_file: str = 'metrics.jsonl',
+                 max_jsonl_bytes: int = 10 * 1024 * 1024):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.prometheus_path = os.path.join(directory, prometheus_file)
+        self.jsonl_path = os.path.join(directory, jsonl_file)
+        self.max_jsonl_bytes = max_jsonl_bytes
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._write_lock = Lock()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write_snapshot()
+
+    def stop(self, timeout: float = 5.0):
+        """Thread'i durdur ve son anlık görüntüyü yaz"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self.write_snapshot()
+
+    def write_snapshot(self) -> Tuple[bool, str]:
+        """Prometheus ve JSON lines dosyalarını güncelle"""
+        samples = self.registry.collect()
+        try:
+            with self._write_lock:
+                os.makedirs(self.directory, exist_ok=True)
+                temp_path = self.prometheus_path + ".tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(self.registry.render_prometheus(samples))
+                os.replace(temp_path, self.prometheus_path)
+
+                if (os.path.exists(self.jsonl_path)
+                        and os.path.getsize(self.jsonl_path) >= self.max_jsonl_bytes):
+                    os.replace(self.jsonl_path, self.jsonl_path + ".1")
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(self.registry.snapshot(samples), ensure_ascii=False) + "\n")
+            return True, self.prometheus_path
+        except OSError as e:
+            return False, f"Metrik yazma hatası: {str(e)}"
@@ -4,39 +4,196 @@ Büyük veri setleri için pagination, lazy loading ve caching
 """
 
 import sqlite3
-from typing import List, Dict, Tuple, Optional, Any
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional, Any, Callable
 from threading import Thread, Lock
 import time
 
+from utils.query_plan import PlanEstimator
+from utils.sql_lexer import (has_outer_limit, split_statements, statement_kind,
+                             strip_terminator, wrap_with_limit)
+
+
+def get_seek_key_columns(conn: sqlite3.Connection, table_name: str) -> List[str]:
+    """
+    Keyset (seek) sayfalama anahtarı
+    rowid varsa ['rowid'], WITHOUT ROWID tablolarda PRIMARY KEY sütunları,
+    hiçbiri yoksa (ör. view) boş liste döner.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT rowid FROM `{table_name}` LIMIT 0")
+        return ['rowid']
+    except sqlite3.OperationalError:
+        pass
+
+    cursor.execute(f"PRAGMA table_info(`{table_name}`)")
+    pk_columns = sorted((col for col in cursor.fetchall() if col[5]), key=lambda col: col[5])
+    return [f'`{col[1]}`' for col in pk_columns]
+
+
+def _build_seek_query(table_name: str, keys: List[str], columns: Optional[List[str]],
+                      op: Optional[str] = None, descending: bool = False,
+                      with_offset: bool = False) -> str:
+    """Anahtar sütunları + veri sütunları için seek sorgusu oluştur"""
+    cols = ', '.join([f'`{col}`' for col in columns]) if columns else '*'
+    key_list = ', '.join(keys)
+    query = f"SELECT {key_list}, {cols} FROM `{table_name}`"
+
+    if op:
+        if len(keys) == 1:
+            query += f" WHERE {keys[0]} {op} ?"
+        else:
+            placeholders = ', '.join(['?'] * len(keys))
+            query += f" WHERE ({key_list}) {op} ({placeholders})"
+
+    direction = " DESC" if descending else ""
+    query += " ORDER BY " + ', '.join(f"{key}{direction}" for key in keys)
+    query += " LIMIT ? OFFSET ?" if with_offset else " LIMIT ?"
+    return query
+
 
 class DataPaginator:
-    """Veri sayfalama ve cache yönetimi"""
+    """Veri sayfalama ve cache yönetimi
+
+    Sayfalar LIMIT/OFFSET yerine anahtar (rowid ya da PRIMARY KEY) üzerinden
+    seek ile okunur. Ziyaret edilen her sayfanın sınır anahtarları saklanır,
+    böylece N. sayfa da 1. sayfa kadar ucuzdur. Bilinmeyen sayfalara atlamak
+    için sample_checkpoints() tek geçişte tüm sayfa başlangıçlarını çıkarır;
+    checkpoint yoksa en yakın bilinen sınırdan göreli OFFSET kullanılır.
+    """
 
     def __init__(self, page_size: int = 100):
         self.page_size = page_size
         self.current_page = 0
         self.total_rows = 0
         self.total_pages = 0
+        self.total_approximate = False  # total_rows bir tahmin mi (RowCountService)
         self.cache = {}
         self.cache_lock = Lock()
         self.max_cache_pages = 10  # Maksimum 10 sayfa cache'le
 
-    def set_total_rows(self, total: int):
-        """Toplam satır sayısını ayarla"""
+        # Keyset sınırları: {tablo: {sayfa: (operatör, anahtar)}}
+        # ('>=', k) -> sayfa k ile başlar, ('>', k) -> sayfa k'dan sonra başlar
+        self.page_bounds: Dict[str, Dict[int, Tuple[str, tuple]]] = {}
+        self.key_columns: Dict[str, List[str]] = {}
+
+        # Tablo başına son görülen sürüm (DatabaseManager.get_table_version)
+        self.table_versions: Dict[str, Any] = {}
+
+    def set_total_rows(self, total: int, approximate: bool = False):
+        """
+        Toplam satır sayısını ayarla
+        approximate=True ise son sayfa sondan geriye okunmaz (satır sayısı kesin değil).
+        """
         self.total_rows = total
+        self.total_approximate = approximate
         self.total_pages = (total + self.page_size - 1) // self.page_size
 
     def get_page_data(self, conn: sqlite3.Connection, table_name: str,
-                     page: int, columns: Optional[List[str]] = None) -> Tuple[List, int]:
-        """Belirli bir sayfanın verilerini getir (cache'li)"""
-
+                     page: int, columns: Optional[List[str]] = None,
+                     version: Any = None) -> Tuple[List, int]:
+        """
+        Belirli bir sayfanın verilerini getir (cache'li, keyset seek)
+        version verilirse önce validate_table ile karşılaştırılır.
+        """
+        if version is not None:
+            self.validate_table(table_name, version)
+        return self._read_page(conn, table_name, page, columns, version)
+
+    def _read_page(self, conn: sqlite3.Connection, table_name: str, page: int,
+                   columns: Optional[List[str]], version: Any) -> Tuple[List, int]:
+        """Sayfayı cache'ten ya da veritabanından oku (sürüm doğrulaması yapmaz)"""
         # Cache kontrolü
-        cache_key = f"{table_name}_{page}"
+        cache_key = (table_name, page)
         with self.cache_lock:
             if cache_key in self.cache:
                 return self.cache[cache_key], page
 
-        # Veritabanından çek
+        keys = self._get_key_columns(conn, table_name)
+        if keys:
+            data = self._fetch_page_by_seek(conn, table_name, page, columns, keys)
+        else:
+            data = self._fetch_page_by_offset(conn, table_name, page, columns)
+
+        # Cache'e ekle
+        with self.cache_lock:
+            # Okuma sırasında sürüm değiştiyse (arka plan okuması) eski veriyi saklama
+            if version is not None and self.table_versions.get(table_name) != version:
+                return data, page
+
+            # Cache boyutu kontrolü
+            if len(self.cache) >= self.max_cache_pages:
+                # En eski sayfayı çıkar (FIFO)
+                oldest_key = next(iter(self.cache))
+                del self.cache[oldest_key]
+
+            self.cache[cache_key] = data
+
+        return data, page
+
+    def _get_key_columns(self, conn: sqlite3.Connection, table_name: str) -> List[str]:
+        """Tablonun seek anahtarını (cache'li) getir"""
+        if table_name not in self.key_columns:
+            self.key_columns[table_name] = get_seek_key_columns(conn, table_name)
+        return self.key_columns[table_name]
+
+    def _fetch_page_by_seek(self, conn: sqlite3.Connection, table_name: str, page: int,
+                            columns: Optional[List[str]], keys: List[str]) -> List:
+        """Sayfayı bilinen sınırlardan seek ederek oku"""
+        key_count = len(keys)
+        with self.cache_lock:
+            bounds = dict(self.page_bounds.get(table_name, {}))
+
+        cursor = conn.cursor()
+        reverse = False
+
+        if page == 0:
+            cursor.execute(_build_seek_query(table_name, keys, columns), (self.page_size,))
+        elif page in bounds:
+            op, key = bounds[page]
+            cursor.execute(_build_seek_query(table_name, keys, columns, op),
+                           (*key, self.page_size))
+        elif page + 1 in bounds and bounds[page + 1][0] == '>=':
+            # Sonraki sayfanın başından geriye doğru oku (Önceki butonu)
+            reverse = True
+            cursor.execute(_build_seek_query(table_name, keys, columns, '<', descending=True),
+                           (*bounds[page + 1][1], self.page_size))
+        elif self.total_pages and page == self.total_pages - 1 and not self.total_approximate:
+            # Son sayfa: tablonun sonundan geriye oku
+            reverse = True
+            last_page_rows = self.total_rows - page * self.page_size
+            cursor.execute(_build_seek_query(table_name, keys, columns, descending=True),
+                           (last_page_rows,))
+        else:
+            # En yakın bilinen sınırdan göreli OFFSET
+            known = [p for p in bounds if p < page]
+            if known:
+                base = max(known)
+                op, key = bounds[base]
+                cursor.execute(_build_seek_query(table_name, keys, columns, op, with_offset=True),
+                               (*key, self.page_size, (page - base) * self.page_size))
+            else:
+                cursor.execute(_build_seek_query(table_name, keys, columns, with_offset=True),
+                               (self.page_size, page * self.page_size))
+
+        raw = cursor.fetchall()
+        if reverse:
+            raw.reverse()
+
+        if raw:
+            with self.cache_lock:
+                table_bounds = self.page_bounds.setdefault(table_name, {})
+                table_bounds[page] = ('>=', tuple(raw[0][:key_count]))
+                if page + 1 not in table_bounds:
+                    table_bounds[page + 1] = ('>', tuple(raw[-1][:key_count]))
+
+        # Dışarıya (ilk_anahtar, sütunlar...) biçiminde ver
+        return [(row[0],) + tuple(row[key_count:]) for row in raw]
+
+    def _fetch_page_by_offset(self, conn: sqlite3.Connection, table_name: str, page: int,
+                              columns: Optional[List[str]]) -> List:
+        """Anahtarı olmayan kaynaklar (view vb.) için LIMIT/OFFSET"""
         offset = page * self.page_size
 
         if columns:
@@ -47,37 +204,97 @@ class DataPaginator:
 
         cursor = conn.cursor()
         cursor.execute(query, (self.page_size, offset))
-        data = cursor.fetchall()
+        return cursor.fetchall()
+
+    def sample_checkpoints(self, conn: sqlite3.Connection, table_name: str) -> int:
+        """
+        Tüm sayfa başlangıç anahtarlarını tek geçişte çıkar
+        Sadece anahtar sütunları okunur; sonrasında her sayfaya doğrudan seek yapılır.
+        Returns: kaydedilen checkpoint sayısı
+        """
+        keys = self._get_key_columns(conn, table_name)
+        if not keys:
+            return 0
+
+        key_list = ', '.join(keys)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {key_list} FROM `{table_name}` ORDER BY {key_list}")
+
+        checkpoints = {}
+        page = 0
+        while True:
+            # Her sayfanın ilk satırını al, kalanını atla
+            row = cursor.fetchone()
+            if row is None:
+                break
+            checkpoints[page] = ('>=', tuple(row))
+            page += 1
+            if self.page_size > 1:
+                cursor.fetchmany(self.page_size - 1)
 
-        # Cache'e ekle
         with self.cache_lock:
-            # Cache boyutu kontrolü
-            if len(self.cache) >= self.max_cache_pages:
-                # En eski sayfayı çıkar (FIFO)
-                oldest_key = next(iter(self.cache))
-                del self.cache[oldest_key]
+            self.page_bounds.setdefault(table_name, {}).update(checkpoints)
+        return len(checkpoints)
 
-            self.cache[cache_key] = data
+    def has_bound(self, table_name: str, page: int) -> bool:
+        """Sayfa için bilinen bir seek sınırı var mı?"""
+        with self.cache_lock:
+            return page == 0 or page in self.page_bounds.get(table_name, {})
 
-        return data, page
+    def validate_table(self, table_name: str, version: Any) -> bool:
+        """
+        Tablonun sürümü değiştiyse yalnızca o tablonun sayfa ve sınırlarını sil
+        Returns: önbellek geçerliyse True
+        """
+        with self.cache_lock:
+            previous = self.table_versions.get(table_name)
+            self.table_versions[table_name] = version
+        if previous == version:
+            return True
+        self.invalidate_table(table_name)
+        return False
+
+    def invalidate_table(self, table_name: str):
+        """Tabloya ait cache ve sınırları sil (yazma sonrası)"""
+        with self.cache_lock:
+            for key in [k for k in self.cache if k[0] == table_name]:
+                del self.cache[key]
+            self.page_bounds.pop(table_name, None)
+            self.key_columns.pop(table_name, None)
+
+    def prefetch_next_page(self, pool, table_name: str, current_page: int,
+                           columns: Optional[List[str]] = None, version: Any = None):
+        """
+        Sonraki sayfayı arka planda önceden yükle
+        UI bağlantısı paylaşılmaz; thread havuzdan (ConnectionPool) kendi okuyucusunu alır.
+        Havuz yoksa (ör. :memory:) önden yükleme yapılmaz.
+        """
+        if pool is None:
+            return
 
-    def prefetch_next_page(self, conn: sqlite3.Connection, table_name: str,
-                          current_page: int, columns: Optional[List[str]] = None):
-        """Sonraki sayfayı arka planda önceden yükle"""
         next_page = current_page + 1
         if next_page < self.total_pages:
-            cache_key = f"{table_name}_{next_page}"
+            cache_key = (table_name, next_page)
             with self.cache_lock:
-                if cache_key not in self.cache:
-                    # Arka planda yükle
-                    Thread(target=self.get_page_data,
-                          args=(conn, table_name, next_page, columns),
-                          daemon=True).start()
+                if cache_key in self.cache:
+                    return
+
+            def load():
+                try:
+                    with pool.reader() as conn:
+                        self._read_page(conn, table_name, next_page, columns, version)
+                except sqlite3.Error:
+                    pass  # Önden yükleme başarısızsa sayfa gerektiğinde normal yolla okunur
+
+            # Arka planda yükle
+            Thread(target=load, daemon=True).start()
 
     def clear_cache(self):
         """Cache'i temizle"""
         with self.cache_lock:
             self.cache.clear()
+            self.page_bounds.clear()
+            self.table_versions.clear()
 
     def get_page_info(self) -> Dict:
         """Sayfa bilgilerini getir"""
@@ -86,6 +303,7 @@ class DataPaginator:
             'total_pages': self.total_pages,
             'page_size': self.page_size,
             'total_rows': self.total_rows,
+            'approximate': self.total_approximate,
             'start_row': self.current_page * self.page_size + 1,
             'end_row': min((self.current_page + 1) * self.page_size, self.total_rows)
         }
@@ -121,86 +339,145 @@ class QueryOptimizer:
 
     @staticmethod
     def add_limit_if_missing(query: str, limit: int = 1000) -> Tuple[str, bool]:
-        """Sorguya LIMIT ekle (yoksa)"""
-        query_upper = query.upper().strip()
-
-        # Zaten LIMIT var mı?
-        if 'LIMIT' in query_upper:
+        """
+        Sorguya LIMIT ekle (yoksa)
+        Sorgu SELECT * FROM (...) LIMIT n ile sarılır; ORDER BY, UNION ve sondaki
+        yorumlar bozulmaz. Dış seviyede LIMIT varsa ya da metin tek bir okuma
+        sorgusu değilse dokunulmaz.
+        """
+        if statement_kind(query) != 'select' or has_outer_limit(query):
+            return query, False
+        if len(split_statements(query)) != 1:
             return query, False
+        return wrap_with_limit(query, limit), True
 
-        # SELECT sorgusu mu?
-        if query_upper.startswith('SELECT'):
-            # Noktalı virgül varsa önüne ekle
-            if query.rstrip().endswith(';'):
-                optimized = query.rstrip()[:-1] + f' LIMIT {limit};'
-            else:
-                optimized = query + f' LIMIT {limit}'
-            return optimized, True
+    @staticmethod
+    def estimate_query(conn: sqlite3.Connection, query: str, catalog=None,
+                       full_scan_rows: int = 100000) -> Optional[Dict[str, Any]]:
+        """
+        Sorguyu çalıştırmadan tahmin (EXPLAIN QUERY PLAN + sqlite_stat1)
+        Okuma sorgusu değilse ya da plan alınamazsa None.
+        Returns: PlanEstimator.estimate() sözlüğü
+        """
+        if statement_kind(query) != 'select' or len(split_statements(query)) != 1:
+            return None
+        try:
+            return PlanEstimator(conn, catalog, full_scan_rows).estimate(query)
+        except sqlite3.Error:
+            return None
 
-        return query, False
+    @staticmethod
+    def explain_query(conn: sqlite3.Connection, query: str, catalog=None,
+                      full_scan_rows: int = 100000) -> Tuple[bool, Any]:
+        """
+        Tek bir ifadenin planı (UPDATE/DELETE dahil; sorgu çalışmaz)
+        Returns: (başarılı_mı, PlanEstimator.estimate() sözlüğü ya da hata mesajı)
+        """
+        statements = split_statements(query)
+        if len(statements) != 1:
+            return False, "Plan için tek bir ifade seçin."
+        try:
+            return True, PlanEstimator(conn, catalog, full_scan_rows).estimate(statements[0])
+        except sqlite3.Error as e:
+            return False, f"❌ Plan alınamadı: {str(e)}"
 
     @staticmethod
-    def estimate_result_size(conn: sqlite3.Connection, query: str) -> Optional[int]:
-        """Sorgu sonuç boyutunu tahmin et (EXPLAIN QUERY PLAN)"""
+    def estimate_result_size(conn: sqlite3.Connection, query: str, exact: bool = False,
+                             catalog=None) -> Optional[int]:
+        """
+        Sorgu sonuç boyutu
+        Varsayılan olarak plandan tahmin edilir (sorgu çalışmaz); exact=True ise
+        alt sorguda COUNT(*) yapılır - maliyeti sorgunun kendisi kadardır.
+        """
+        if not exact:
+            estimate = QueryOptimizer.estimate_query(conn, query, catalog)
+            return estimate['estimated_rows'] if estimate else None
+
+        if statement_kind(query) != 'select' or len(split_statements(query)) != 1:
+            return None
         try:
-            # COUNT(*) ile tahmin
-            if 'SELECT' in query.upper():
-                # SELECT'i COUNT'a çevir
-                count_query = query.upper().replace('SELECT', 'SELECT COUNT(*) FROM (SELECT', 1)
-                count_query = count_query.rstrip(';') + ') AS count_table;'
-
-                cursor = conn.cursor()
-                cursor.execute(count_query)
-                result = cursor.fetchone()
-                return result[0] if result else None
-        except:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM (\n{strip_terminator(query)}\n)")
+            result = cursor.fetchone()
+            return result[0] if result else None
+        except sqlite3.Error:
             return None
 
+    @staticmethod
+    def choose_strategy(estimate: Optional[Dict[str, Any]], stream_rows: int = 10000,
+                        paginate_rows: int = 100000) -> str:
+        """
+        Tahmine göre çalıştırma şekli:
+            'warn'     - büyük tabloda tam tarama (kullanıcıya sorulmalı)
+            'paginate' - sonuç paginate_rows'tan büyük olabilir (LIMIT ile ilk sayfa)
+            'stream'   - sonuç stream_rows'tan büyük (parça parça getir)
+            'run'      - küçük sonuç, okuma dışı ya da tahmin yok
+        """
+        if not estimate:
+            return 'run'
+        if estimate['full_scan']:
+            return 'warn'
+        rows = estimate['estimated_rows']
+        if rows is None:
+            return 'run'
+        if rows > paginate_rows:
+            return 'paginate'
+        if rows > stream_rows:
+            return 'stream'
+        return 'run'
+
     @staticmethod
     def suggest_indexes(conn: sqlite3.Connection, table_name: str) -> List[str]:
-        """Index önerileri"""
+        """
+        İş yükü bilinmeden yapılabilecek tek güvenli öneri: indeksi olmayan foreign key'ler
+        (JOIN ve ON DELETE/UPDATE kontrolleri bu sütunlarda arama yapar).
+        Sorgulara göre öneri için core.index_advisor.IndexAdvisor kullanılır.
+        """
         suggestions = []
 
         try:
             cursor = conn.cursor()
 
-            # Mevcut indexleri al
-            cursor.execute(f"PRAGMA index_list(`{table_name}`)")
-            existing_indexes = {row[1] for row in cursor.fetchall()}
-
-            # Tablo yapısını al
-            cursor.execute(f"PRAGMA table_info(`{table_name}`)")
-            columns = cursor.fetchall()
-
-            # Foreign key ve sık kullanılan sütunlar için index öner
-            for col in columns:
-                col_name = col[1]
-                col_type = col[2]
-
-                # Zaten index varsa atla
-                index_name = f"idx_{table_name}_{col_name}"
-                if index_name in existing_indexes:
+            # Mevcut indekslerin sütun dizileri
+            prefixes = []
+            for (index_name,) in cursor.execute(
+                    "SELECT name FROM pragma_index_list(?)", (table_name,)).fetchall():
+                prefixes.append([row[0] for row in cursor.execute(
+                    "SELECT name FROM pragma_index_info(?) ORDER BY seqno", (index_name,))])
+
+            foreign_keys: Dict[int, List[str]] = {}
+            for fk_id, _, _, from_col, *_ in cursor.execute(
+                    "SELECT id, seq, \"table\", \"from\" FROM pragma_foreign_key_list(?) "
+                    "ORDER BY id, seq", (table_name,)).fetchall():
+                foreign_keys.setdefault(fk_id, []).append(from_col)
+
+            for columns in foreign_keys.values():
+                # Zaten bu sütunlarla başlayan bir indeks varsa atla
+                if any(prefix[:len(columns)] == columns for prefix in prefixes):
                     continue
+                index_name = f"idx_{table_name}_{'_'.join(columns)}"
+                cols = ", ".join(f"`{c}`" for c in columns)
+                suggestions.append(f"CREATE INDEX {index_name} ON `{table_name}`({cols});")
 
-                # Numeric ve text sütunlar için öner
-                if col_type.upper() in ['INTEGER', 'TEXT', 'VARCHAR', 'CHAR']:
-                    suggestions.append(
-                        f"CREATE INDEX {index_name} ON `{table_name}`(`{col_name}`);"
-                    )
-
-        except Exception:
+        except sqlite3.Error:
             pass
 
         return suggestions
 
 
 class ProgressiveLoader:
-    """Aşamalı veri yükleme"""
+    """Aşamalı veri yükleme
+
+    Ardışık chunk'lar bir önceki chunk'ın son anahtarından seek edilerek
+    okunur; önceki sınır bilinmiyorsa LIMIT/OFFSET'e düşülür.
+    """
 
     def __init__(self, chunk_size: int = 50):
         self.chunk_size = chunk_size
         self.loaded_chunks = set()
         self.loading = False
+        self.chunk_bounds: Dict[Tuple[str, int], tuple] = {}  # (tablo, chunk) -> son anahtar
+        self.key_columns: Dict[str, List[str]] = {}
 
     def load_chunk(self, conn: sqlite3.Connection, table_name: str,
                   chunk_index: int, columns: Optional[List[str]] = None,
@@ -210,17 +487,35 @@ class ProgressiveLoader:
         if chunk_index in self.loaded_chunks:
             return []
 
-        offset = chunk_index * self.chunk_size
-
-        if columns:
-            cols = ', '.join([f'`{col}`' for col in columns])
-            query = f"SELECT rowid, {cols} FROM `{table_name}` LIMIT ? OFFSET ?"
-        else:
-            query = f"SELECT rowid, * FROM `{table_name}` LIMIT ? OFFSET ?"
+        if table_name not in self.key_columns:
+            self.key_columns[table_name] = get_seek_key_columns(conn, table_name)
+        keys = self.key_columns[table_name]
 
         cursor = conn.cursor()
-        cursor.execute(query, (self.chunk_size, offset))
-        data = cursor.fetchall()
+        previous_bound = self.chunk_bounds.get((table_name, chunk_index - 1))
+
+        if keys and (chunk_index == 0 or previous_bound is not None):
+            if chunk_index == 0:
+                cursor.execute(_build_seek_query(table_name, keys, columns), (self.chunk_size,))
+            else:
+                cursor.execute(_build_seek_query(table_name, keys, columns, '>'),
+                               (*previous_bound, self.chunk_size))
+        elif keys:
+            cursor.execute(_build_seek_query(table_name, keys, columns, with_offset=True),
+                           (self.chunk_size, chunk_index * self.chunk_size))
+        else:
+            cols = ', '.join([f'`{col}`' for col in columns]) if columns else '*'
+            cursor.execute(f"SELECT rowid, {cols} FROM `{table_name}` LIMIT ? OFFSET ?",
+                           (self.chunk_size, chunk_index * self.chunk_size))
+
+        raw = cursor.fetchall()
+        if keys:
+            key_count = len(keys)
+            if raw:
+                self.chunk_bounds[(table_name, chunk_index)] = tuple(raw[-1][:key_count])
+            data = [(row[0],) + tuple(row[key_count:]) for row in raw]
+        else:
+            data = raw
 
         self.loaded_chunks.add(chunk_index)
 
@@ -232,111 +527,401 @@ class ProgressiveLoader:
     def reset(self):
         """Yüklenmiş chunk'ları sıfırla"""
         self.loaded_chunks.clear()
-
-
-class PerformanceMonitor:
-    """Performans izleme"""
-
-    def __init__(self):
-        self.metrics = {
-            'query_times': [],
-            'load_times': [],
-            'render_times': []
+        self.chunk_bounds.clear()
+
+
+class LatencyHistogram:
+    """
+    Sabit bellekli gecikme histogramı (HDR tarzı log-lineer kovalar)
+
+    Değerler mikrosaniyeye yuvarlanır. İlk 2^sub_bits kova birebir, sonrası
+    her ikinin kuvveti aralığı 2^(sub_bits-1) eşit kovaya bölünür; bu yüzden
+    yüzdelik hatası en fazla 1/2^(sub_bits-1) (varsayılan %3.1). max_seconds
+    üstü son kovaya yazılır. Kova sayısı baştan sabittir (~900 int), örnek
+    sayısıyla büyümez. Thread-safe değildir; PerformanceMonitor kilitler.
+    """
+
+    def __init__(self, max_seconds: float = 3600.0, sub_bits: int = 6):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.half_count = self.sub_count >> 1
+        self.max_value = int(max_seconds * 1_000_000)
+        self.counts = [0] * (self._index(self.max_value) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half_count + (value >> shift) - self.half_count
+
+    def _bucket_bounds(self, index: int) -> Tuple[int, int]:
+        """Kovanın [alt, üst] değer aralığı (mikrosaniye)"""
+        if index < self.sub_count:
+            return index, index
+        shift = (index - self.sub_count) // self.half_count + 1
+        mantissa = (index - self.sub_count) % self.half_count + self.half_count
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record_ns(self, elapsed_ns: int):
+        value = min(max(elapsed_ns // 1000, 0), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> float:
+        """Yüzdelik (saniye); kovanın orta değeri, gözlenen min/max ile sınırlı"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(fraction * self.count + 0.999999))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                low, high = self._bucket_bounds(index)
+                value = min(max((low + high) / 2, self.min), self.max)
+                return value / 1_000_000
+        return self.max / 1_000_000
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'avg': self.total / self.count / 1_000_000,
+            'min': self.min / 1_000_000,
+            'max': self.max / 1_000_000,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
         }
-        self.start_time = None
 
-    def start_timer(self):
-        """Zamanlayıcı başlat"""
-        self.start_time = time.time()
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+
+class TimingSpan:
+    """
+    Tek bir ölçüm (perf_counter_ns); oluşturulduğu anda başlar
+    'with' bloğu ya da stop() ile biter; stop() birden çok çağrılsa da bir kez
+    kaydeder. discard() ölçümü kaydetmeden bırakır (ör. iptal edilen sorgu).
+    """
+
+    def __init__(self, monitor: 'PerformanceMonitor', operation: str):
+        self.monitor = monitor
+        self.operation = operation
+        self.started_ns = time.perf_counter_ns()
+        self.elapsed_ns: Optional[int] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Saniye (bitmediyse şu ana kadar geçen)"""
+        elapsed_ns = self.elapsed_ns
+        if elapsed_ns is None:
+            elapsed_ns = time.perf_counter_ns() - self.started_ns
+        return elapsed_ns / 1e9
+
+    def stop(self) -> float:
+        if self.elapsed_ns is None:
+            self.elapsed_ns = time.perf_counter_ns() - self.started_ns
+            self.monitor.record_ns(self.operation, self.elapsed_ns)
+        return self.elapsed_ns / 1e9
+
+    def discard(self):
+        if self.elapsed_ns is None:
+            self.elapsed_ns = time.perf_counter_ns() - self.started_ns
+
+    def __enter__(self) -> 'TimingSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
 
-    def stop_timer(self, operation: str) -> float:
-        """Zamanlayıcı durdur ve kaydet"""
-        if self.start_time is None:
-            return 0.0
 
-        elapsed = time.time() - self.start_time
+class PerformanceMonitor:
+    """
+    Performans izleme (thread-safe)
+    İşlem başına sabit bellekli histogram; ölçümler birbirinden bağımsız span'lerdir:
+
+        with monitor.span('render'):
+            ...
+        span = monitor.span('query')   # geri çağrıda: span.stop()
+    """
+
+    OPERATIONS = ('query', 'fetch', 'render', 'page_load', 'export', 'import')
+
+    def __init__(self, operations: Tuple[str, ...] = OPERATIONS):
+        self._lock = Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {op: LatencyHistogram() for op in operations}
+
+    def span(self, operation: str) -> TimingSpan:
+        """Ölçüm başlat (context manager ya da stop() ile bitir)"""
+        return TimingSpan(self, operation)
+
+    def timed_task(self, operation: str, task: Callable[..., Tuple[bool, Any]]) -> Callable[..., Tuple[bool, Any]]:
+        """
+        ProgressDialog görevini ölçen sarmalayıcı
+        Yalnızca başarılı (True, ...) sonuçların süresi kaydedilir.
+        """
+        def run(*args, **kwargs):
+            span = self.span(operation)
+            result = task(*args, **kwargs)
+            if result and result[0]:
+                span.stop()
+            else:
+                span.discard()
+            return result
+        return run
 
-        if operation in self.metrics:
-            self.metrics[operation].append(elapsed)
+    def record(self, operation: str, seconds: float):
+        """Dışarıda ölçülmüş süreyi ekle (ör. akış sonucunun toplam süresi)"""
+        self.record_ns(operation, int(seconds * 1e9))
 
-        self.start_time = None
-        return elapsed
+    def record_ns(self, operation: str, elapsed_ns: int):
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = LatencyHistogram()
+            histogram.record_ns(elapsed_ns)
 
     def get_average(self, operation: str) -> float:
         """Ortalama süre"""
-        if operation in self.metrics and self.metrics[operation]:
-            return sum(self.metrics[operation]) / len(self.metrics[operation])
-        return 0.0
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None or not histogram.count:
+                return 0.0
+            return histogram.total / histogram.count / 1_000_000
+
+    def get_percentiles(self, operation: str) -> Dict[str, float]:
+        """p50/p95/p99 (saniye) ve örnek sayısı"""
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                return {'count': 0}
+            return histogram.summary()
 
     def get_stats(self) -> Dict:
-        """İstatistikleri getir"""
-        stats = {}
-        for op, times in self.metrics.items():
-            if times:
-                stats[op] = {
-                    'avg': sum(times) / len(times),
-                    'min': min(times),
-                    'max': max(times),
-                    'count': len(times)
-                }
-        return stats
+        """İstatistikleri getir (count, avg, min, max, p50, p95, p99)"""
+        with self._lock:
+            return {op: histogram.summary() for op, histogram in self.histograms.items()
+                    if histogram.count}
+
+    def format_percentiles(self, operation: str) -> str:
+        """Durum çubukları için kısa metin: 'p50 12ms · p95 40ms · p99 80ms (n=34)'"""
+        stats = self.get_percentiles(operation)
+        if not stats['count']:
+            return ""
+        parts = " · ".join(f"{key} {_format_duration(stats[key])}" for key in ('p50', 'p95', 'p99'))
+        return f"{parts} (n={stats['count']})"
 
     def reset(self):
         """Metrikleri sıfırla"""
-        for key in self.metrics:
-            self.metrics[key].clear()
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.reset()
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms" if seconds >= 0.01 else f"{seconds * 1000:.1f}ms"
+    return f"{seconds:.2f}s"
+
+
+# Boyut tahmini için yaklaşık CPython nesne maliyetleri (byte)
+_VALUE_SIZES = {int: 28, float: 24, bool: 28, type(None): 16}
+_STR_OVERHEAD = 49
+_BYTES_OVERHEAD = 33
+_TUPLE_OVERHEAD = 40
+_POINTER_SIZE = 8
+_SIZE_SAMPLE_ROWS = 5
+
+
+def _estimate_value_size(value: Any) -> int:
+    """Tek bir hücre değerinin yaklaşık boyutu"""
+    size = _VALUE_SIZES.get(type(value))
+    if size is not None:
+        return size
+    if isinstance(value, str):
+        return _STR_OVERHEAD + len(value)
+    if isinstance(value, (bytes, bytearray)):
+        return _BYTES_OVERHEAD + len(value)
+    return 64
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Önbellek değerinin yaklaşık bellek boyutu
+    Satır listelerinde yalnızca birkaç satır örneklenir ve satır sayısıyla
+    çarpılır; str() ile büyük metin üretilmez.
+    """
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return _TUPLE_OVERHEAD
+        sample = value[:_SIZE_SAMPLE_ROWS]
+        sample_size = 0
+        for row in sample:
+            if isinstance(row, (list, tuple)):
+                sample_size += _TUPLE_OVERHEAD + _POINTER_SIZE * len(row)
+                sample_size += sum(_estimate_value_size(item) for item in row)
+            else:
+                sample_size += _POINTER_SIZE + _estimate_value_size(row)
+        per_row = sample_size / len(sample)
+        return int(_TUPLE_OVERHEAD + len(value) * (per_row + _POINTER_SIZE))
+    return _estimate_value_size(value)
 
 
 class SmartCache:
-    """Akıllı veri önbellekleme"""
+    """
+    Akıllı veri önbellekleme
+    Toplam boyut her ekleme/çıkarmada güncellenir; tahliye O(1):
+        - 'lru': en uzun süredir kullanılmayan (OrderedDict sırası)
+        - 'lfu': en az kullanılan; eşitlikte en eski (frekans kovaları)
+    """
+
+    def __init__(self, max_size_mb: int = 100, policy: str = 'lru'):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f"Geçersiz önbellek politikası: {policy}")
 
-    def __init__(self, max_size_mb: int = 100):
         self.max_size_bytes = max_size_mb * 1024 * 1024
-        self.cache = {}
-        self.access_count = {}
+        self.policy = policy
+        self.cache = OrderedDict()        # key -> değer (LRU sırası)
+        self.sizes: Dict[str, int] = {}
+        self.versions: Dict[str, Any] = {}  # key -> sürüm (doğrulama için)
+        self.total_size = 0
         self.cache_lock = Lock()
 
-    def get(self, key: str) -> Optional[Any]:
-        """Cache'den veri al"""
+        # LFU: key -> sayaç, sayaç -> anahtarlar (eklenme sırasıyla)
+        self.access_count: Dict[str, int] = {}
+        self.frequency_buckets: Dict[int, OrderedDict] = {}
+        self.min_frequency = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+
+    def get(self, key: str, version: Any = None) -> Optional[Any]:
+        """
+        Cache'den veri al
+        version verilirse kayıttaki sürümle karşılaştırılır; farklıysa
+        girdi bayattır, silinir ve miss sayılır.
+        """
         with self.cache_lock:
-            if key in self.cache:
-                self.access_count[key] = self.access_count.get(key, 0) + 1
-                return self.cache[key]
-        return None
+            if key not in self.cache:
+                self.misses += 1
+                return None
+
+            if version is not None and self.versions.get(key) != version:
+                self._remove(key)
+                self.stale += 1
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            if self.policy == 'lru':
+                self.cache.move_to_end(key)
+            else:
+                self._touch_frequency(key)
+            return self.cache[key]
+
+    def set(self, key: str, value: Any, size: Optional[int] = None, version: Any = None):
+        """Cache'e veri ekle (size verilmezse tahmin edilir)"""
+        size = estimate_size(value) if size is None else size
 
-    def set(self, key: str, value: Any):
-        """Cache'e veri ekle"""
         with self.cache_lock:
-            # Boyut kontrolü (basit tahmin)
-            estimated_size = len(str(value))
+            if key in self.cache:
+                self._remove(key)
 
-            # Cache doluysa en az kullanılanı çıkar
-            while len(self.cache) > 0:
-                current_size = sum(len(str(v)) for v in self.cache.values())
-                if current_size + estimated_size <= self.max_size_bytes:
-                    break
+            # Sınırdan büyük tek değer önbelleğe alınmaz
+            if size > self.max_size_bytes:
+                return
 
-                # En az kullanılanı bul
-                lfu_key = min(self.access_count, key=self.access_count.get)
-                del self.cache[lfu_key]
-                del self.access_count[lfu_key]
+            while self.cache and self.total_size + size > self.max_size_bytes:
+                self._remove(self._eviction_candidate())
+                self.evictions += 1
 
             self.cache[key] = value
-            self.access_count[key] = 0
+            self.sizes[key] = size
+            self.versions[key] = version
+            self.total_size += size
+            if self.policy == 'lfu':
+                self.access_count[key] = 0
+                self.frequency_buckets.setdefault(0, OrderedDict())[key] = None
+                self.min_frequency = 0
+
+    def delete(self, key: str) -> bool:
+        """Tek bir girdiyi çıkar"""
+        with self.cache_lock:
+            if key not in self.cache:
+                return False
+            self._remove(key)
+            return True
+
+    def _eviction_candidate(self) -> str:
+        if self.policy == 'lru':
+            return next(iter(self.cache))
+        return next(iter(self.frequency_buckets[self.min_frequency]))
+
+    def _touch_frequency(self, key: str):
+        """LFU sayacını artır ve anahtarı bir üst kovaya taşı"""
+        count = self.access_count[key]
+        bucket = self.frequency_buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.frequency_buckets[count]
+            if self.min_frequency == count:
+                self.min_frequency = count + 1
+        self.access_count[key] = count + 1
+        self.frequency_buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def _remove(self, key: str):
+        del self.cache[key]
+        self.total_size -= self.sizes.pop(key)
+        self.versions.pop(key, None)
+        if self.policy == 'lfu':
+            count = self.access_count.pop(key)
+            bucket = self.frequency_buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self.frequency_buckets[count]
+                if self.min_frequency == count and self.frequency_buckets:
+                    # Farklı sayaç değerleri kadar adım (pratikte çok az)
+                    self.min_frequency = min(self.frequency_buckets)
 
     def clear(self):
         """Cache'i temizle"""
         with self.cache_lock:
             self.cache.clear()
+            self.sizes.clear()
+            self.versions.clear()
+            self.total_size = 0
             self.access_count.clear()
+            self.frequency_buckets.clear()
+            self.min_frequency = 0
 
     def get_stats(self) -> Dict:
         """Cache istatistikleri"""
         with self.cache_lock:
-            total_size = sum(len(str(v)) for v in self.cache.values())
+            lookups = self.hits + self.misses
             return {
                 'items': len(self.cache),
-                'size_mb': total_size / (1024 * 1024),
+                'size_mb': self.total_size / (1024 * 1024),
                 'max_size_mb': self.max_size_bytes / (1024 * 1024),
-                'usage_percent': (total_size / self.max_size_bytes) * 100
-            }
\ No newline at end of file
+                'usage_percent': (self.total_size / self.max_size_bytes) * 100,
+                'policy': self.policy,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'stale': self.stale,
+                'hit_rate': (self.hits / lookups * 100) if lookups else 0
+            }
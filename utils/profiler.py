@@ -0,0 +1,181 @@
+"""
+Örnekleyici Profil Aracı
+sys._current_frames ile belirli aralıklarla tüm thread'lerin yığınını örnekler;
+sonuç flamegraph.pl / speedscope ile açılabilen 'collapsed stack' dosyasıdır
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Süresi ayrıca raporlanan sıcak yollar: (etiket, yığın çerçevesinde aranan nitelikli ad öneki)
+HOT_PATHS: Tuple[Tuple[str, str], ...] = (
+    ('QueryExecutor.execute', 'QueryExecutor.execute'),
+    ('display_results', 'QueryTab.display_results'),
+    ('_load_page', 'EditorTab._load_page'),
+    ('ExcelHandler', 'ExcelHandler.'),
+    ('CSVHandler', 'CSVHandler.'),
+)
+
+# Yaprak çerçevenin dosya yoluna göre katman (zaman Tk'da mı, pandas'ta mı...)
+# C fonksiyonları çerçeve üretmez: sqlite3 execute/fetch süresi onu çağıran
+# uygulama çerçevesine, yani 'app' katmanına yazılır.
+LAYERS: Tuple[Tuple[str, str], ...] = (
+    ('tkinter', 'tk'),
+    ('pandas', 'pandas'),
+    ('numpy', 'pandas'),
+    ('openpyxl', 'openpyxl'),
+    ('sqlite3', 'sqlite'),
+    ('csv.py', 'csv'),
+)
+
+
+class StackSampler:
+    """
+    Düşük maliyetli yığın örnekleyici
+
+    Arka plandaki thread her interval saniyede bir sys._current_frames()
+    ile diğer thread'lerin çerçevelerini okur; çalışan koda dokunulmaz
+    (settrace/setprofile yok), maliyet örnek başına yığın derinliğiyle
+    sınırlıdır. Örnekleyici GIL'i beklediğinde örnekler seyrekleşir; bu
+    yüzden her yığına sabit interval değil, önceki örnekten beri geçen
+    gerçek süre yazılır (stacks: yığın -> saniye). Kod nesnesi -> etiket
+    dönüşümü önbelleklenir. Örnekleyicinin kendi thread'i sayılmaz.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()  # yığın -> saniye
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._labels: Dict[object, str] = {}
+        self._layers: Dict[str, str] = {}  # etiket -> katman
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.stacks.clear()
+        self.samples = 0
+        self.started_at = time.perf_counter()
+        self.stopped_at = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.stopped_at = time.perf_counter()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            weight, last = now - last, now
+            if len(names) != len(frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id != own_id:
+                    self.stacks[self._collapse(names.get(thread_id, str(thread_id)), frame)] += weight
+            self.samples += 1
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            parts = code.co_filename.replace('\\', '/').split('/')
+            module = os.path.splitext(parts[-1])[0]
+            if module == '__init__' and len(parts) > 1:
+                module = parts[-2]
+            label = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+            self._labels[code] = label
+            self._layers[label] = next(
+                (layer for marker, layer in LAYERS if marker in parts), 'app')
+        return label
+
+    def _collapse(self, thread_name: str, frame) -> Tuple[str, ...]:
+        """Yığını kökten yaprağa etiket dizisine çevir"""
+        labels: List[str] = []
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.append(thread_name)
+        labels.reverse()
+        return tuple(labels)
+
+    # ---------- Rapor
+    def attribution(self) -> Dict[str, Dict[str, float]]:
+        """
+        Sıcak yol başına süre (saniye) ve yaprak katmanına göre dağılımı
+        Returns: {'QueryExecutor.execute': {'total': s, 'app': s1, 'tk': s2, ...}, ...}
+        Bir yığın birden çok sıcak yoldan geçiyorsa en dıştakine yazılır.
+        """
+        report: Dict[str, Dict[str, float]] = {label: {'total': 0.0} for label, _ in HOT_PATHS}
+        for stack, seconds in self.stacks.items():
+            owner = None
+            for frame_label in stack[1:]:
+                qualname = frame_label.split(':', 1)[-1]
+                owner = next((label for label, prefix in HOT_PATHS if qualname.startswith(prefix)), None)
+                if owner:
+                    break
+            if owner is None:
+                continue
+            entry = report[owner]
+            entry['total'] += seconds
+            layer = self._layers.get(stack[-1], 'app')
+            entry[layer] = entry.get(layer, 0.0) + seconds
+        return report
+
+    def format_report(self) -> str:
+        """Kullanıcıya gösterilecek kısa özet"""
+        duration = (self.stopped_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        lines = [f"⏱️ Süre: {duration:.1f}s | Örnek: {self.samples:,}"]
+        for label, entry in self.attribution().items():
+            if not entry['total']:
+                continue
+            layers = ", ".join(f"{layer} {seconds:.2f}s"
+                               for layer, seconds in sorted(entry.items(), key=lambda item: -item[1])
+                               if layer != 'total')
+            lines.append(f"• {label}: ~{entry['total']:.2f}s ({layers})")
+        if len(lines) == 1:
+            lines.append("• İzlenen sıcak yollarda örnek yok")
+        return "\n".join(lines)
+
+    def write_collapsed(self, path: str) -> Tuple[bool, str]:
+        """
+        'kök;...;yaprak ağırlık' satırları (flamegraph.pl / speedscope girdisi)
+        Ağırlık mikrosaniyedir (flamegraph tam sayı bekler).
+        """
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, seconds in self.stacks.most_common():
+                    weight = int(round(seconds * 1_000_000))
+                    if weight:
+                        f.write(";".join(label.replace(';', ',') for label in stack) + f" {weight}\n")
+            return True, path
+        except OSError as e:
+            return False, f"Profil yazma hatası: {str(e)}"
+
+
+def default_profile_path(directory: str) -> str:
+    return os.path.join(directory, f"profile-{datetime.now():%Y%m%d-%H%M%S}.collapsed")
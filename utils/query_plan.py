@@ -0,0 +1,343 @@
+"""
+Sorgu Planı Çözümleyici
+EXPLAIN QUERY PLAN + sqlite_stat1 ile sorguyu çalıştırmadan satır tahmini ve tam tarama tespiti
+"""
+
+import re
+import sqlite3
+from collections import defaultdict
+from typing import Dict, List, Tuple, Optional, Any
+
+from utils.sql_lexer import iter_tokens, strip_terminator
+
+# SCAN/SEARCH satırları: "SEARCH main.t AS x USING COVERING INDEX ia (a=? AND b>?)"
+# (eski sürümlerdeki "SCAN TABLE t" yazımı da kabul edilir)
+_LOOP_RE = re.compile(
+    r"^(?P<op>SCAN|SEARCH)(?: TABLE)? (?P<table>[^\s()]+)(?: AS (?P<alias>\S+))?"
+    r"(?: USING (?P<using>(?:AUTOMATIC )?(?:PARTIAL )?(?:COVERING )?INDEX(?: (?!\()\S+)?"
+    r"|INTEGER PRIMARY KEY|PRIMARY KEY))?"
+    r"(?: \((?P<constraints>[^()]*)\))?")
+
+# Satır sayısını etkilemeyen alt sorgular (yalnızca maliyet)
+_SUBQUERY_PREFIXES = ('LIST SUBQUERY', 'SCALAR SUBQUERY', 'CORRELATED', 'EXISTS')
+
+# SQLite'ın istatistik yokken kullandığı varsayımlar
+_DEFAULT_EQ_ROWS = 10      # Eşitlik başına kalan satır
+_RANGE_DIVISOR = 4         # Her aralık sınırı satırları ~4'e böler
+
+# FROM/JOIN sonrası takma ad sanılmaması gereken kelimeler
+_NOT_ALIAS = {'WHERE', 'JOIN', 'ON', 'USING', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'CROSS',
+              'NATURAL', 'OUTER', 'GROUP', 'ORDER', 'LIMIT', 'UNION', 'EXCEPT', 'INTERSECT',
+              'WINDOW', 'HAVING', 'INDEXED', 'NOT', 'SET', 'VALUES', 'RETURNING', 'AS'}
+
+
+def read_sqlite_stats(cursor: sqlite3.Cursor,
+                      schema: str = 'main') -> Tuple[Dict[str, int], Dict[str, List[int]]]:
+    """
+    sqlite_stat1'i oku (ANALYZE yapılmadıysa boş)
+    Returns: ({tablo: satır}, {indeks: [satır, ilk_k_sütun_eşitliğinde_satır...]})
+    """
+    has_stats = cursor.execute(
+        f"SELECT 1 FROM \"{schema}\".sqlite_master "
+        f"WHERE type = 'table' AND name = 'sqlite_stat1'").fetchone()
+    if not has_stats:
+        return {}, {}
+
+    row_estimates: Dict[str, int] = {}
+    index_stats: Dict[str, List[int]] = {}
+    for table, index, stat in cursor.execute(f'SELECT tbl, idx, stat FROM "{schema}".sqlite_stat1'):
+        values = []
+        for part in str(stat).split():
+            if not part.isdigit():
+                break  # "unordered", "sz=..." gibi ekler
+            values.append(int(part))
+        if not values:
+            continue
+        row_estimates[table] = max(row_estimates.get(table, 0), values[0])
+        if index:
+            index_stats[index] = values
+    return row_estimates, index_stats
+
+
+def explain(conn: sqlite3.Connection, query: str) -> List[Dict[str, Any]]:
+    """
+    EXPLAIN QUERY PLAN çıktısını düğüm listesine çevir (sorgu çalıştırılmaz)
+    Düğüm: id, parent, detail; döngü düğümlerinde ayrıca op (SCAN/SEARCH),
+    schema, table, alias, index, covering, automatic, constraints
+    """
+    nodes = []
+    for node_id, parent, _, detail in conn.execute(
+            f"EXPLAIN QUERY PLAN {strip_terminator(query)}").fetchall():
+        node: Dict[str, Any] = {'id': node_id, 'parent': parent, 'detail': detail, 'op': None}
+        match = _LOOP_RE.match(detail)
+        if match:
+            schema, _, table = match.group('table').rpartition('.')
+            using = match.group('using') or ''
+            index = None
+            if using == 'INTEGER PRIMARY KEY':
+                index = 'rowid'
+            elif using == 'PRIMARY KEY':
+                index = 'pk'
+            elif 'INDEX' in using and not using.endswith('INDEX'):
+                index = using.rsplit(' ', 1)[1]
+            constraints = match.group('constraints')
+            node.update({
+                'op': match.group('op'),
+                'schema': schema or None,
+                'table': table,
+                'alias': match.group('alias'),
+                'index': index,
+                'covering': 'COVERING' in using,
+                'automatic': using.startswith('AUTOMATIC'),
+                'constraints': constraints.split(' AND ') if constraints else [],
+            })
+        nodes.append(node)
+    return nodes
+
+
+def table_aliases(query: str) -> Dict[str, str]:
+    """
+    Takma ad -> tablo eşlemesi (yeni SQLite sürümleri planda takma adı yazar)
+    "FROM t x", "JOIN main.t AS x" biçimleri tanınır.
+    """
+    aliases: Dict[str, str] = {}
+    tokens = list(iter_tokens(query))
+    expecting_table = False
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        upper = token.upper if token.kind == 'word' else ''
+        if upper in ('FROM', 'JOIN') or (expecting_table and token.text == ','):
+            expecting_table = True
+            i += 1
+            if i < len(tokens) and tokens[i].kind in ('word', 'ident'):
+                name = _unquote(tokens[i].text)
+                # schema.tablo
+                if i + 2 < len(tokens) and tokens[i + 1].text == '.':
+                    i += 2
+                    name = _unquote(tokens[i].text)
+                j = i + 1
+                if j < len(tokens) and tokens[j].kind == 'word' and tokens[j].upper == 'AS':
+                    j += 1
+                if (j < len(tokens) and tokens[j].kind in ('word', 'ident')
+                        and tokens[j].upper not in _NOT_ALIAS):
+                    aliases[_unquote(tokens[j].text)] = name
+            continue
+        if upper in ('WHERE', 'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'ON', 'USING') or token.text in ('(', ')'):
+            expecting_table = False
+        i += 1
+    return aliases
+
+
+def _unquote(name: str) -> str:
+    if len(name) >= 2 and name[0] in '"`[' and name[-1] in '"`]':
+        return name[1:-1]
+    return name
+
+
+def _outer_limit(query: str) -> Optional[int]:
+    """Dış seviyedeki LIMIT sabit bir sayıysa değeri"""
+    depth = 0
+    tokens = list(iter_tokens(query))
+    for i, token in enumerate(tokens):
+        if token.text == '(':
+            depth += 1
+        elif token.text == ')':
+            depth -= 1
+        elif depth == 0 and token.kind == 'word' and token.upper == 'LIMIT':
+            following = tokens[i + 1] if i + 1 < len(tokens) else None
+            if following is not None and following.kind == 'number' and following.text.isdigit():
+                return int(following.text)
+    return None
+
+
+class PlanEstimator:
+    """
+    Sorguyu çalıştırmadan sonuç boyutu ve tarama riski tahmini
+
+    Her döngü (SCAN/SEARCH) için satır sayısı:
+      - SCAN: tablonun satır sayısı (catalog/sqlite_stat1, yoksa max(rowid))
+      - SEARCH rowid=?: 1; indeksli eşitlik: sqlite_stat1'deki "ilk k sütun
+        eşitken ortalama satır" değeri; istatistik yoksa SQLite'ın varsayımı (10)
+      - Her aralık sınırı (<, >) satırları ~4'e böler
+    İç içe döngülerin çarpımı sonuç için üst sınırdır (WHERE süzmesi ve
+    GROUP BY hesaba katılmaz); dış seviyedeki sabit LIMIT ile kırpılır.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, catalog=None, full_scan_rows: int = 100000):
+        """
+        Args:
+            catalog: SchemaCatalog (varsa istatistikler oradan okunur)
+            full_scan_rows: bu kadar ya da daha büyük tablodaki SCAN riskli sayılır
+        """
+        self.conn = conn
+        self.catalog = catalog
+        self.full_scan_rows = full_scan_rows
+        self._stats: Dict[str, Tuple[Dict[str, int], Dict[str, List[int]]]] = {}
+        self._rowid_counts: Dict[Tuple[str, str], Optional[int]] = {}
+
+    def _schema_stats(self, schema: str) -> Tuple[Dict[str, int], Dict[str, List[int]]]:
+        if schema not in self._stats:
+            try:
+                self._stats[schema] = read_sqlite_stats(self.conn.cursor(), schema)
+            except sqlite3.Error:
+                self._stats[schema] = ({}, {})
+        return self._stats[schema]
+
+    def table_rows(self, table: str, schema: Optional[str] = None) -> Optional[int]:
+        """Tablonun (tahmini) satır sayısı; bilinmiyorsa None"""
+        schema = schema or 'main'
+        estimate = None
+        if self.catalog is not None:
+            try:
+                estimate = self.catalog.row_estimate(table, schema)
+            except sqlite3.Error:
+                estimate = None
+        else:
+            estimate = self._schema_stats(schema)[0].get(table)
+        if estimate is not None:
+            return estimate
+
+        key = (schema, table)
+        if key not in self._rowid_counts:
+            try:
+                value = self.conn.execute(
+                    f'SELECT max(rowid) FROM "{schema}"."{table}"').fetchone()[0]
+                self._rowid_counts[key] = value or 0
+            except sqlite3.Error:
+                self._rowid_counts[key] = None  # WITHOUT ROWID, view, CTE
+        return self._rowid_counts[key]
+
+    def index_stat(self, index: str, schema: Optional[str] = None) -> Optional[List[int]]:
+        schema = schema or 'main'
+        if self.catalog is not None:
+            try:
+                return self.catalog.index_stat(index, schema)
+            except sqlite3.Error:
+                return None
+        return self._schema_stats(schema)[1].get(index)
+
+    def loop_rows(self, node: Dict[str, Any], table_rows: Optional[int]) -> Optional[int]:
+        """Bir döngünün (her dış satır için) döndüreceği tahmini satır"""
+        if node['op'] == 'SCAN':
+            return table_rows
+
+        equalities = sum(1 for c in node['constraints'] if c.endswith('=?'))
+        ranges = sum(1 for c in node['constraints'] if '<' in c or '>' in c)
+        if node['index'] == 'rowid' and equalities:
+            return 1
+
+        rows: Optional[float]
+        stat = self.index_stat(node['index'], node['schema']) if node['index'] else None
+        if node['automatic']:
+            rows = _DEFAULT_EQ_ROWS
+        elif stat and equalities < len(stat):
+            rows = stat[equalities] if equalities else stat[0]
+        elif table_rows is None:
+            return None
+        elif equalities:
+            rows = min(table_rows, _DEFAULT_EQ_ROWS)
+        else:
+            rows = table_rows
+        rows = rows / (_RANGE_DIVISOR ** ranges)
+        return max(1, int(rows)) if rows else 0
+
+    def estimate(self, query: str) -> Dict[str, Any]:
+        """
+        Returns: {
+            'estimated_rows': sonuç satırı üst sınırı (bilinmiyorsa None),
+            'full_scan': büyük tabloda tam tarama var mı,
+            'scans': [{'table', 'rows', 'detail'}]  (tüm SCAN döngüleri),
+            'temp_btrees': ORDER BY/GROUP BY/DISTINCT için geçici B-ağaçları,
+            'automatic_indexes': sorgu için anlık kurulan indeksler,
+            'hotspots': [{'id', 'kind', 'tables': [(tablo, satır)], 'rows', 'detail'}]
+                kind: 'full_scan' (büyük tabloda SCAN), 'temp_btree' (ORDER BY/
+                GROUP BY/DISTINCT sıralaması; rows = sıralanacak satır),
+                'automatic_index' (her çalıştırmada kurulan geçici indeks),
+            'cost': okunacak/sıralanacak toplam satır tahmini (planları karşılaştırmak için),
+            'plan': explain() düğümleri (her döngüye 'rows' ve 'table_rows' eklenir)
+        }
+        """
+        nodes = explain(self.conn, query)
+        aliases = table_aliases(query)
+        children: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for node in nodes:
+            children[node['parent']].append(node)
+
+        derived: Dict[str, Optional[int]] = {}  # CO-ROUTINE/MATERIALIZE adı -> satır
+        result: Dict[str, Any] = {'full_scan': False, 'scans': [], 'temp_btrees': [],
+                                  'automatic_indexes': [], 'hotspots': [], 'cost': 0,
+                                  'plan': nodes}
+
+        def visit(parent_id: int) -> Optional[int]:
+            """Alt ağacın iç içe döngülerinin çarpımı"""
+            total: Optional[int] = 1
+            loops = []
+            sorts = []
+            for node in children.get(parent_id, []):
+                detail = node['detail']
+                if node['op']:
+                    rows = self._annotate(node, aliases, derived, result)
+                    if rows is not None:
+                        # İç döngü dıştaki her satır için bir kez çalışır
+                        result['cost'] += (total if total is not None else 1) * rows
+                    total = None if total is None or rows is None else total * rows
+                    loops.append(node)
+                elif detail.startswith(('CO-ROUTINE', 'MATERIALIZE')):
+                    derived[detail.split(' ', 1)[-1]] = visit(node['id'])
+                elif detail.startswith('COMPOUND'):
+                    parts = [visit(member['id']) for member in children.get(node['id'], [])]
+                    compound = None if None in parts else sum(parts)
+                    total = None if total is None or compound is None else total * compound
+                elif detail.startswith(_SUBQUERY_PREFIXES):
+                    visit(node['id'])  # Sonuç boyutunu değil yalnızca maliyeti etkiler
+                elif detail.startswith('USE TEMP B-TREE'):
+                    result['temp_btrees'].append(detail)
+                    sorts.append(node)
+                else:
+                    # "SCAN CONSTANT ROW", "MULTI-INDEX OR" vb.
+                    visit(node['id'])
+
+            # Sıralama aynı seviyedeki döngülerin ürettiği tüm satırları bekler
+            for node in sorts:
+                node['rows'] = total
+                result['cost'] += total or 0
+                result['hotspots'].append({
+                    'id': node['id'], 'kind': 'temp_btree', 'detail': node['detail'], 'rows': total,
+                    'tables': [(loop['table'], loop['table_rows']) for loop in loops]})
+            return total
+
+        estimated = visit(0)
+        limit = _outer_limit(query)
+        if estimated is not None and limit is not None:
+            estimated = min(estimated, limit)
+        result['estimated_rows'] = estimated
+        return result
+
+    def _annotate(self, node: Dict[str, Any], aliases: Dict[str, str],
+                  derived: Dict[str, Optional[int]], result: Dict[str, Any]) -> Optional[int]:
+        """Döngü düğümüne tablo ve satır tahmini ekle, riskleri kaydet"""
+        name = node['table']
+        if name in derived:
+            table_rows = derived[name]
+        else:
+            if name in aliases:
+                node['alias'], name = name, aliases[name]
+            table_rows = self.table_rows(name, node['schema'])
+        node['table'] = name
+        node['table_rows'] = table_rows
+        node['rows'] = self.loop_rows(node, table_rows)
+
+        hotspot = None
+        if node['op'] == 'SCAN':
+            result['scans'].append({'table': name, 'rows': table_rows, 'detail': node['detail']})
+            if table_rows is not None and table_rows >= self.full_scan_rows:
+                result['full_scan'] = True
+                hotspot = 'full_scan'
+        if node['automatic']:
+            result['automatic_indexes'].append(node['detail'])
+            hotspot = 'automatic_index'
+        if hotspot:
+            result['hotspots'].append({'id': node['id'], 'kind': hotspot, 'detail': node['detail'],
+                                       'rows': table_rows, 'tables': [(name, table_rows)]})
+        return node['rows']
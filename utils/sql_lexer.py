@@ -0,0 +1,256 @@
+"""
+SQL Sözcük Çözümleyici
+Yorum, dizgi ve tanımlayıcıları tanıyan küçük lexer: ifade türü, script bölme, LIMIT tespiti
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# Tek regex, tek geçiş: her eşleşmenin türü lastgroup'tan okunur
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^']|'')*(?:'|\Z))
+  | (?P<ident>"(?:[^"]|"")*(?:"|\Z)|`(?:[^`]|``)*(?:`|\Z)|\[[^\]]*(?:\]|\Z))
+  | (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?|0[xX][0-9a-fA-F]+)
+  | (?P<word>[^\W\d][\w$]*)
+  | (?P<param>[?:@$][\w$]*)
+  | (?P<punct>.)
+""", re.VERBOSE | re.DOTALL)
+
+_SKIP = ('ws', 'comment')
+
+_MODIFY = {'INSERT', 'UPDATE', 'DELETE', 'REPLACE'}
+_DDL = {'CREATE', 'DROP', 'ALTER'}
+_TRANSACTION = {'BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'SAVEPOINT', 'RELEASE'}
+
+
+class Token(NamedTuple):
+    kind: str   # 'word', 'string', 'ident', 'number', 'param', 'punct' (+ 'ws', 'comment')
+    text: str
+    start: int
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper()
+
+
+def iter_tokens(sql: str, keep_trivia: bool = False) -> Iterator[Token]:
+    """Token'ları sırayla üret (varsayılan olarak boşluk ve yorumlar atlanır)"""
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        if keep_trivia or kind not in _SKIP:
+            yield Token(kind, match.group(), match.start())
+
+
+def tokenize(sql: str, keep_trivia: bool = False) -> List[Token]:
+    return list(iter_tokens(sql, keep_trivia))
+
+
+def first_keyword(sql: str) -> str:
+    """Yorumlardan sonraki ilk anahtar kelime (büyük harf; yoksa '')"""
+    for token in iter_tokens(sql):
+        return token.upper if token.kind == 'word' else ''
+    return ''
+
+
+def _main_verb(tokens: List[Token]) -> str:
+    """WITH ... bloğundan sonra gelen asıl ifade (CTE gövdeleri parantez içindedir)"""
+    depth = 0
+    for token in tokens[1:]:
+        if token.kind == 'punct':
+            if token.text == '(':
+                depth += 1
+            elif token.text == ')':
+                depth -= 1
+        elif depth == 0 and token.kind == 'word' and token.upper in _MODIFY | {'SELECT', 'VALUES'}:
+            return token.upper
+    return ''
+
+
+def statement_kind(sql: str) -> str:
+    """
+    İfadenin türü:
+        'select'      - SELECT, VALUES, WITH ... SELECT
+        'modify'      - INSERT/UPDATE/DELETE/REPLACE (WITH ... ile başlayanlar dahil)
+        'ddl'         - CREATE/DROP/ALTER
+        'transaction' - BEGIN/COMMIT/ROLLBACK/SAVEPOINT/RELEASE
+        'pragma', 'explain', 'other' (ANALYZE, VACUUM, ATTACH...), 'empty'
+    """
+    keyword = first_keyword(sql)
+    if not keyword:
+        return 'empty'
+    if keyword in ('SELECT', 'VALUES'):
+        return 'select'
+    if keyword == 'WITH':
+        verb = _main_verb(tokenize(sql))
+        return 'modify' if verb in _MODIFY else 'select'
+    if keyword in _MODIFY:
+        return 'modify'
+    if keyword in _DDL:
+        return 'ddl'
+    if keyword in _TRANSACTION:
+        return 'transaction'
+    if keyword == 'PRAGMA':
+        return 'pragma'
+    if keyword == 'EXPLAIN':
+        return 'explain'
+    return 'other'
+
+
+def returns_rows(sql: str) -> bool:
+    """Satır döndürmesi beklenen ifade mi? (RETURNING'li DML hariç)"""
+    return statement_kind(sql) in ('select', 'pragma', 'explain')
+
+
+def is_read_only(sql: str) -> bool:
+    """Veritabanını değiştirmeyen sorgu mu? (PRAGMA atama yapabildiği için hariç)"""
+    return statement_kind(sql) in ('select', 'explain')
+
+
+def statement_spans(sql: str) -> List[Tuple[int, int]]:
+    """
+    Script'teki ifadelerin (başlangıç, bitiş) konumları
+    Dizgi/yorum içindeki ve CREATE TRIGGER ... BEGIN ... END gövdesindeki
+    noktalı virgüller bölmez. Boş ya da yalnızca yorumdan oluşan parçalar atlanır.
+    """
+    spans = []
+    start = 0
+    words: List[str] = []   # İfadenin ilk birkaç kelimesi (TRIGGER tespiti)
+    block_depth = 0         # Trigger gövdesinde BEGIN/CASE ... END derinliği
+    has_content = False
+
+    for token in iter_tokens(sql):
+        if token.kind == 'word':
+            upper = token.upper
+            if len(words) < 4:
+                words.append(upper)
+            if 'TRIGGER' in words:
+                if upper in ('BEGIN', 'CASE'):
+                    block_depth += 1
+                elif upper == 'END' and block_depth:
+                    block_depth -= 1
+        if token.kind == 'punct' and token.text == ';' and block_depth == 0:
+            if has_content:
+                spans.append((start, token.start))
+            start = token.start + 1
+            words = []
+            has_content = False
+            continue
+        has_content = True
+
+    if has_content:
+        spans.append((start, len(sql)))
+    return spans
+
+
+def split_statements(sql: str) -> List[str]:
+    """Script'i ifadelere böl (bkz. statement_spans)"""
+    return [sql[start:end].strip() for start, end in statement_spans(sql)]
+
+
+def statement_at(sql: str, position: int) -> str:
+    """
+    İmlecin bulunduğu ifade
+    İmleç iki ifade arasındaysa (ör. ';' sonrası) bir önceki ifade seçilir.
+    """
+    spans = statement_spans(sql)
+    chosen = ''
+    for start, end in spans:
+        segment = sql[start:end]
+        content_start = start + len(segment) - len(segment.lstrip())
+        if content_start <= position or not chosen:
+            chosen = segment.strip()
+        if position <= end:
+            break
+    return chosen
+
+
+def has_outer_limit(sql: str) -> bool:
+    """Dış seviyede (parantez dışında) LIMIT var mı? 'limit_date' gibi adlar sayılmaz"""
+    depth = 0
+    for token in iter_tokens(sql):
+        if token.kind == 'punct':
+            if token.text == '(':
+                depth += 1
+            elif token.text == ')':
+                depth -= 1
+        elif depth == 0 and token.kind == 'word' and token.upper == 'LIMIT':
+            return True
+    return False
+
+
+def strip_terminator(sql: str) -> str:
+    """Sondaki noktalı virgül(ler)i ve boşlukları at"""
+    end = None
+    for token in iter_tokens(sql):
+        if not (token.kind == 'punct' and token.text == ';'):
+            end = token.start + len(token.text)
+    return sql[:end].strip() if end is not None else ''
+
+
+def wrap_with_limit(sql: str, limit: int) -> str:
+    """
+    Sorguyu SELECT * FROM (...) LIMIT n ile sar
+    Satır sonları sayesinde sondaki '--' yorumu kapanış parantezini yutmaz.
+    """
+    return f"SELECT * FROM (\n{strip_terminator(sql)}\n) LIMIT {int(limit)}"
+
+
+def normalize(sql: str) -> str:
+    """
+    Karşılaştırma/önbellek anahtarı için sadeleştir
+    Yorumlar atılır, token arası boşluklar tek boşluğa iner, sondaki ';' silinir;
+    dizgi ve tanımlayıcıların içi ile harf büyüklüğü korunur.
+    """
+    parts: List[str] = []
+    pending_space = False
+    for token in iter_tokens(sql, keep_trivia=True):
+        if token.kind in _SKIP:
+            pending_space = bool(parts)
+            continue
+        if pending_space:
+            parts.append(' ')
+            pending_space = False
+        parts.append(token.text)
+    return strip_terminator(''.join(parts))
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Sorgu parmak izi: literaller '?' olur, IN (...) listeleri tek '?'e iner,
+    yorumlar atılır ve anahtar kelimeler büyük harfe çevrilir
+    Aynı biçimdeki sorgular (ör. farklı id'lerle) aynı parmak izini verir.
+    """
+    parts: List[str] = []
+    for token in iter_tokens(sql):
+        if token.kind in ('string', 'number', 'param'):
+            # Negatif sayının '-' işareti de literalin parçası
+            if parts and parts[-1] == '-' and (len(parts) < 2 or parts[-2] in ('(', ',', '=', '<', '>')):
+                parts.pop()
+            parts.append('?')
+        elif token.kind == 'word':
+            parts.append(token.upper)
+        elif token.text == ')' and parts and parts[-1] == '?':
+            # Parantez içi yalnızca '?' ve ',' ise tek '?'e indir: IN (?, ?, ?) -> IN (?)
+            j = len(parts) - 1
+            while j >= 0 and parts[j] in ('?', ','):
+                j -= 1
+            if j >= 0 and parts[j] == '(':
+                del parts[j + 1:]
+                parts.append('?')
+            parts.append(')')
+        else:
+            parts.append(token.text)
+
+    while parts and parts[-1] == ';':
+        parts.pop()
+    return ' '.join(parts)
+
+
+def find_keywords(sql: str, keywords: set) -> Optional[str]:
+    """Dizgi/yorum dışında geçen ilk anahtar kelime (yoksa None)"""
+    for token in iter_tokens(sql):
+        if token.kind == 'word' and token.upper in keywords:
+            return token.upper
+    return None
@@ -0,0 +1,132 @@
+"""
+Tablo Yükleyici
+İçe aktarılan satırları parça parça SQLite tablosuna yazan ortak motor (CSV / Excel)
+"""
+
+import sqlite3
+import time
+from itertools import islice
+from typing import List, Tuple, Optional, Iterable, Callable, Any
+
+
+def unique_column_names(header: Iterable[Any]) -> List[str]:
+    """Başlık satırından boş ve tekrarlı olmayan sütun adları üret"""
+    columns = []
+    for index, name in enumerate(header):
+        name = str(name).strip() if name is not None else ''
+        name = name or f"column_{index + 1}"
+        while name in columns:
+            name = f"{name}_{index + 1}"
+        columns.append(name)
+    return columns
+
+
+def load_rows(conn: sqlite3.Connection, table_name: str, columns: List[str], types: List[str],
+              rows: Iterable[tuple], if_exists: str = 'append', chunk_size: int = 5000,
+              commit_every: int = 50000,
+              on_chunk: Optional[Callable[[int], None]] = None,
+              cancel_check: Optional[Callable[[], bool]] = None) -> Tuple[bool, Any]:
+    """
+    Satırları tabloya executemany parçalarıyla yaz
+
+    Tablo yoksa (ya da if_exists='replace' ise) columns/types ile oluşturulur.
+    Her commit_every satırda bir commit edilir; iptal ya da hata durumunda
+    yalnızca commit edilmemiş parça geri alınır.
+
+    'replace' modunda mevcut tablo yükleme bitene kadar korunur: satırlar
+    geçici bir yükleme tablosuna yazılır, eski tablonun silinmesi ve yenisinin
+    adlandırılması tek son transaction'da yapılır. İptal ya da hata durumunda
+    yükleme tablosu silinir, tablo eski haliyle kalır.
+
+    Args:
+        if_exists: 'append' (varsa altına ekle), 'replace' (sil ve yeniden oluştur), 'fail'
+        on_chunk: her parçadan sonra toplam satır sayısı ile çağrılır
+        cancel_check: True dönerse yükleme durur
+
+    Returns:
+        (başarılı_mı, {'rows', 'columns', 'types', 'cancelled', 'elapsed'} veya hata_mesajı)
+        elapsed: yazmada geçen süre (saniye)
+    """
+    if if_exists not in ('append', 'replace', 'fail'):
+        return False, f"Geçersiz mod: {if_exists}"
+
+    cursor = conn.cursor()
+    staging = None
+    imported = 0
+    pending = 0
+    started = time.perf_counter()
+
+    try:
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (table_name,)).fetchone() is not None
+        if exists and if_exists == 'fail':
+            return False, f"'{table_name}' tablosu zaten var!"
+
+        if not conn.in_transaction:
+            cursor.execute("BEGIN")
+        if exists and if_exists == 'replace':
+            staging = f"{table_name}__import"
+            cursor.execute(f"DROP TABLE IF EXISTS `{staging}`")  # Yarım kalmış önceki yükleme
+            target = staging
+        else:
+            target = table_name
+        if not exists or staging:
+            columns_def = ', '.join(f'`{col}` {col_type}' for col, col_type in zip(columns, types))
+            cursor.execute(f"CREATE TABLE `{target}` ({columns_def})")
+
+        cols_str = ', '.join(f'`{col}`' for col in columns)
+        placeholders = ', '.join(['?'] * len(columns))
+        insert_sql = f"INSERT INTO `{target}` ({cols_str}) VALUES ({placeholders})"
+
+        iterator = iter(rows)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+
+            if cancel_check and cancel_check():
+                conn.rollback()
+                if staging:
+                    _drop_staging(conn, staging)
+                    imported = pending = 0  # Tablo değişmedi
+                return True, {'rows': imported - pending, 'columns': columns, 'types': types,
+                              'cancelled': True, 'elapsed': time.perf_counter() - started}
+
+            cursor.executemany(insert_sql, chunk)
+            imported += len(chunk)
+            pending += len(chunk)
+
+            if pending >= commit_every:
+                conn.commit()
+                pending = 0
+                cursor.execute("BEGIN")
+
+            if on_chunk:
+                on_chunk(imported)
+
+        if staging:
+            if not conn.in_transaction:
+                cursor.execute("BEGIN")
+            cursor.execute(f"DROP TABLE `{table_name}`")
+            cursor.execute(f"ALTER TABLE `{staging}` RENAME TO `{table_name}`")
+        conn.commit()
+        return True, {'rows': imported, 'columns': columns, 'types': types, 'cancelled': False,
+                      'elapsed': time.perf_counter() - started}
+
+    except Exception as e:
+        if conn.in_transaction:
+            conn.rollback()
+        if staging:
+            _drop_staging(conn, staging)
+        return False, str(e)
+
+
+def _drop_staging(conn: sqlite3.Connection, staging: str):
+    """Commit edilmiş parçaları içeren yükleme tablosunu sil"""
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS `{staging}`")
+        if conn.in_transaction:
+            conn.commit()
+    except sqlite3.Error:
+        pass